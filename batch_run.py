@@ -0,0 +1,130 @@
+import argparse
+import glob
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from tracker import main, read_measurements
+from tracklog import configure_from_env
+
+# Headless batch runner: tracks many recordings in parallel worker processes,
+# each into its own output directory, and prints a JSON throughput summary.
+
+
+def expand_inputs(patterns):
+    paths = []
+    for pattern in patterns:
+        matches = sorted(glob.glob(pattern)) if glob.has_magic(pattern) else [pattern]
+        paths.extend(path for path in matches if path not in paths)
+    return paths
+
+
+def output_dirs(paths, out_dir):
+    # One directory per recording, named after it; repeated names get a numeric suffix
+    dirs = []
+    used = set()
+    for path in paths:
+        name = os.path.splitext(os.path.basename(path))[0]
+        candidate, n = name, 1
+        while candidate in used:
+            n += 1
+            candidate = f'{name}_{n}'
+        used.add(candidate)
+        dirs.append(os.path.join(out_dir, candidate))
+    return dirs
+
+
+def run_recording(path, output_dir, track_mode, filter_option, association_type, start_time=None, end_time=None,
+                  cluster_workers=0):
+    configure_from_env()
+    os.makedirs(output_dir, exist_ok=True)
+    result = {'file': path, 'output_dir': output_dir, 'pid': os.getpid()}
+    start = time.perf_counter()
+    cpu_start = time.process_time()
+    try:
+        measurements = read_measurements(path, start_time, end_time)
+        loaded = time.perf_counter()
+        tracks = main(measurements, track_mode, filter_option, association_type, output_dir=output_dir,
+                      cluster_workers=cluster_workers)
+    except Exception as e:
+        result.update({'status': 'error', 'error': f'{type(e).__name__}: {e}',
+                       'elapsed_s': time.perf_counter() - start, 'cpu_s': time.process_time() - cpu_start})
+        return result
+    elapsed = time.perf_counter() - start
+    result.update({
+        'status': 'ok',
+        'measurements': len(measurements),
+        'tracks': len(tracks),
+        'load_s': loaded - start,
+        'elapsed_s': elapsed,
+        'cpu_s': time.process_time() - cpu_start,
+        'measurements_per_s': len(measurements) / elapsed if elapsed > 0 else 0.0,
+    })
+    return result
+
+
+def run_batch(paths, out_dir, track_mode='3-state', filter_option='CV', association_type='JPDA',
+              start_time=None, end_time=None, workers=None, cluster_workers=0):
+    """Track every recording in a worker pool; returns the summary dict."""
+    workers = workers or os.cpu_count() or 1
+    start = time.perf_counter()
+    results = []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [
+            pool.submit(run_recording, path, output_dir, track_mode, filter_option, association_type,
+                        start_time, end_time, cluster_workers)
+            for path, output_dir in zip(paths, output_dirs(paths, out_dir))
+        ]
+        for future in as_completed(futures):
+            result = future.result()
+            results.append(result)
+            print(f"{result['status']:5s} {result['file']} ({result['elapsed_s']:.2f} s)", file=sys.stderr)
+    wall = time.perf_counter() - start
+
+    order = {path: i for i, path in enumerate(paths)}
+    results.sort(key=lambda result: order[result['file']])
+    measurements = sum(result.get('measurements', 0) for result in results)
+    return {
+        'files': len(paths),
+        'failed': sum(result['status'] != 'ok' for result in results),
+        'workers': workers,
+        'cluster_workers': cluster_workers,
+        'wall_s': wall,
+        'cpu_s': sum(result['cpu_s'] for result in results),
+        'measurements': measurements,
+        'measurements_per_s': measurements / wall if wall > 0 else 0.0,
+        'track_mode': track_mode,
+        'filter': filter_option,
+        'association': association_type,
+        'results': results,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the tracker headless over many recordings.")
+    parser.add_argument('inputs', nargs='+', help="Recordings (CSV or .npy) or glob patterns, e.g. 'data/*.csv'")
+    parser.add_argument('--out-dir', default='batch_output', help="Each recording gets <out-dir>/<name>/")
+    parser.add_argument('--workers', type=int, default=None, help="Worker processes (default: all cores)")
+    parser.add_argument('--track-mode', choices=['3-state', '5-state', '7-state'], default='3-state')
+    parser.add_argument('--filter', choices=['CV'], default='CV')
+    parser.add_argument('--association', choices=['JPDA', 'Munkres'], default='JPDA')
+    parser.add_argument('--cluster-workers', type=int, default=0,
+                        help="Processes per recording for large JPDA clusters (default: solve inline)")
+    parser.add_argument('--start', type=float, default=None, help="Start of the time window (s)")
+    parser.add_argument('--end', type=float, default=None, help="End of the time window (s)")
+    parser.add_argument('--summary', default=None, help="Also write the JSON summary to this file")
+    args = parser.parse_args()
+
+    paths = expand_inputs(args.inputs)
+    if not paths:
+        parser.error("no recordings matched")
+    summary = run_batch(paths, args.out_dir, args.track_mode, args.filter, args.association,
+                        args.start, args.end, args.workers, args.cluster_workers)
+    text = json.dumps(summary, indent=2)
+    if args.summary:
+        with open(args.summary, 'w') as f:
+            f.write(text + '\n')
+    print(text)
+    sys.exit(1 if summary['failed'] else 0)
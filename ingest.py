@@ -0,0 +1,184 @@
+import collections
+import heapq
+import time
+import numpy as np
+
+from recording import MEASUREMENT_DTYPE, scan_boundaries
+from tracklog import get_logger
+from udp_receiver import UdpReceiver
+
+log = get_logger('ingest')
+
+
+class ReorderBuffer:
+    """Merges per-sensor measurement streams into one time-ordered stream of scans.
+
+    Each sensor keeps its own time-sorted queue and a heap holds the head time of
+    every non-empty queue, so releasing costs O(log k) per run of measurements
+    for k sensors. Measurements are held until the newest time seen from any
+    sensor is `max_lateness` seconds past them; anything arriving behind what has
+    already been released is counted as late and dropped. Released measurements
+    are cut into scans with the tracker's grouping rule (max_time_diff) and a
+    scan is only handed out once no more measurements can join it.
+    """
+
+    def __init__(self, max_lateness=0.2, max_time_diff=0.050, max_buffered=100000):
+        self.max_lateness = max_lateness
+        self.max_time_diff = max_time_diff
+        self.max_buffered = max_buffered
+
+        self._queues = {}  # sensor_id -> deque of time-sorted record arrays
+        self._heap = []  # (head time, sensor_id)
+        self._released_until = -np.inf
+        self._newest = -np.inf
+        self._scan = []  # (sensor_ids, records) of released measurements not yet handed out
+        self._scan_start = None
+
+        self.buffered = 0
+        self.received = collections.Counter()
+        self.late = collections.Counter()
+        self.released = 0
+        self.forced_releases = 0
+
+    def add(self, sensor_id, records):
+        records = np.asarray(records, dtype=MEASUREMENT_DTYPE)
+        self.received[sensor_id] += len(records)
+        late = records['mt'] < self._released_until
+        if late.any():
+            self.late[sensor_id] += int(late.sum())
+            log.debug("Dropped %d late measurements from sensor %d", int(late.sum()), sensor_id)
+            records = records[~late]
+        if not len(records):
+            return
+        records = records[np.argsort(records['mt'], kind='stable')]
+        self._newest = max(self._newest, float(records['mt'][-1]))
+
+        q = self._queues.setdefault(sensor_id, collections.deque())
+        old_head = q[0]['mt'][0] if q else None
+        if q and records['mt'][0] < q[-1]['mt'][-1]:
+            # Out of order within the sensor itself: re-sort what it has buffered
+            merged = np.concatenate(list(q) + [records])
+            q.clear()
+            q.append(merged[np.argsort(merged['mt'], kind='stable')])
+        else:
+            q.append(records)
+        if q[0]['mt'][0] != old_head:
+            heapq.heappush(self._heap, (float(q[0]['mt'][0]), sensor_id))
+        self.buffered += len(records)
+
+        while self.buffered > self.max_buffered:
+            # Buffer full: release the oldest measurements early
+            self.forced_releases += 1
+            self._release(self._heap[0][0])
+
+    def pop_scans(self):
+        """Release what is old enough and return the complete scans as (sensor_ids, records), or None."""
+        self._release(self._newest - self.max_lateness)
+        return self._take_scans(self._released_until)
+
+    def flush(self):
+        """Release everything, including the scan still being assembled."""
+        self._release(np.inf)
+        return self._take_scans(np.inf)
+
+    def has_pending(self):
+        return bool(self.buffered or self._scan)
+
+    def stats(self):
+        return {
+            'buffered_measurements': self.buffered,
+            'released_measurements': self.released,
+            'late_measurements': sum(self.late.values()),
+            'late_by_sensor': dict(self.late),
+            'received_by_sensor': dict(self.received),
+            'forced_releases': self.forced_releases,
+        }
+
+    def _release(self, limit):
+        # k-way merge of the sensor queues up to `limit`, a run of one sensor at a time
+        heap = self._heap
+        while heap and heap[0][0] <= limit:
+            head, sensor_id = heapq.heappop(heap)
+            q = self._queues[sensor_id]
+            if not q or q[0]['mt'][0] != head:
+                continue  # Stale entry, the queue head changed since
+            bound = min(limit, heap[0][0]) if heap else limit
+            chunk = q[0]
+            n = max(int(np.searchsorted(chunk['mt'], bound, side='right')), 1)
+            self._append_released(sensor_id, chunk[:n])
+            if n == len(chunk):
+                q.popleft()
+            else:
+                q[0] = chunk[n:]
+            if q:
+                heapq.heappush(heap, (float(q[0]['mt'][0]), sensor_id))
+        # Anything older than this is late from now on; never past what has been seen,
+        # so a flush does not turn the next measurements into late ones
+        self._released_until = max(self._released_until, min(limit, self._newest))
+
+    def _append_released(self, sensor_id, records):
+        self.buffered -= len(records)
+        self.released += len(records)
+        self._scan.append((np.full(len(records), sensor_id, dtype=np.int32), records))
+
+    def _take_scans(self, limit):
+        if not self._scan:
+            return None
+        sensor_ids = np.concatenate([ids for ids, _ in self._scan])
+        records = np.concatenate([chunk for _, chunk in self._scan])
+
+        # Same grouping as the tracker; everything before the last scan start is complete
+        starts = scan_boundaries(records['mt'], self.max_time_diff, self._scan_start)
+        cut = starts[-1] if starts else 0
+        start = float(records['mt'][cut]) if starts else self._scan_start
+        if start + self.max_time_diff < limit:
+            cut = len(records)  # The last scan can no longer grow either
+            start = None
+
+        self._scan_start = start
+        self._scan = [(sensor_ids[cut:], records[cut:])] if cut < len(records) else []
+        if not cut:
+            return None
+        return sensor_ids[:cut], records[:cut]
+
+
+class MultiSensorIngest:
+    """Listens on one UDP port per sensor and delivers merged, time-ordered scans.
+
+    `sensors` maps port to sensor id. Call get_scans() from the consumer thread;
+    when no data has arrived for `idle_flush` seconds the buffered scan is
+    flushed so the tail of a recording is not held back.
+    """
+
+    def __init__(self, sensors, host='0.0.0.0', max_lateness=0.2, max_time_diff=0.050, max_buffered=100000,
+                 idle_flush=1.0, **receiver_options):
+        self.receiver = UdpReceiver(host=host, port=next(iter(sensors)), sensors=sensors, **receiver_options)
+        self.buffer = ReorderBuffer(max_lateness, max_time_diff, max_buffered)
+        self.idle_flush = idle_flush
+        self._last_data = time.monotonic()
+
+    def start(self):
+        self.receiver.start()
+
+    def stop(self):
+        self.receiver.stop()
+
+    def get_scans(self, timeout=None):
+        """Return (sensor_ids, records) for the scans ready to track, or None."""
+        item = self.receiver.get_sensor_batch(timeout)
+        if item is not None:
+            # Take whatever else is already queued, but no more, so a busy sender cannot starve the tracker
+            items = [item] + [self.receiver.get_sensor_batch(0) for _ in range(self.receiver.batches.qsize())]
+            for item in items:
+                if item is not None:
+                    self.buffer.add(*item)
+            self._last_data = time.monotonic()
+        scans = self.buffer.pop_scans()
+        if scans is None and self.buffer.has_pending() and time.monotonic() - self._last_data > self.idle_flush:
+            scans = self.buffer.flush()
+        return scans
+
+    def stats(self):
+        stats = self.receiver.stats()
+        stats.update(self.buffer.stats())
+        return stats
@@ -0,0 +1,99 @@
+import csv
+import queue
+import threading
+
+_FLUSH = object()
+_CLOSE = object()
+
+
+class CsvLogSink:
+    """CSV row sink that is opened once per run and written by a background thread.
+
+    Rows are collected in a locked buffer, so write() and flush() may be called
+    from different threads, and handed to the writer thread in batches of
+    `batch_size` through a bounded queue of `queue_size` batches. When
+    the writer falls behind, write() blocks on the full queue instead of dropping
+    rows. flush() returns once everything written so far is on disk; close() also
+    stops the writer thread. Errors raised by the writer are re-raised there.
+    """
+
+    def __init__(self, file_path, fieldnames, batch_size=512, queue_size=64):
+        self.file_path = file_path
+        self.fieldnames = list(fieldnames)
+        self.batch_size = batch_size
+        self.rows_written = 0
+        self._buffer = []
+        self._lock = threading.Lock()
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._error = None
+        self._closed = False
+        self._file = open(file_path, 'w', newline='')
+        self._writer = csv.DictWriter(self._file, fieldnames=self.fieldnames, restval='', extrasaction='ignore')
+        self._writer.writeheader()
+        self._thread = threading.Thread(target=self._run, name='CsvLogSink', daemon=True)
+        self._thread.start()
+
+    def write(self, row):
+        with self._lock:
+            self._buffer.append(row)
+            if len(self._buffer) >= self.batch_size:
+                self._queue.put(self._buffer)
+                self._buffer = []
+
+    def flush(self):
+        if self._closed:
+            return
+        done = threading.Event()
+        with self._lock:
+            if self._buffer:
+                self._queue.put(self._buffer)
+                self._buffer = []
+            self._queue.put((_FLUSH, done))
+        done.wait()
+        self._raise_error()
+
+    def close(self):
+        if self._closed:
+            return
+        try:
+            self.flush()
+        finally:
+            # Shut down even if the flush re-raised a writer error
+            self._closed = True
+            self._queue.put((_CLOSE, None))
+            self._thread.join()
+            self._file.close()
+        self._raise_error()
+
+    def _raise_error(self):
+        if self._error is not None:
+            error, self._error = self._error, None
+            raise error
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if isinstance(item, tuple):
+                marker, done = item
+                if marker is _CLOSE:
+                    return
+                if self._error is None:
+                    try:
+                        self._file.flush()
+                    except Exception as e:
+                        self._error = e
+                done.set()
+                continue
+            if self._error is not None:
+                continue  # Keep draining so producers never block on a dead writer
+            try:
+                self._writer.writerows(item)
+                self.rows_written += len(item)
+            except Exception as e:
+                self._error = e
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
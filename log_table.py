@@ -0,0 +1,178 @@
+import collections
+import csv
+import os
+import numpy as np
+from PyQt5.QtCore import QAbstractTableModel, QModelIndex, Qt
+
+INDEX_CHUNK = 1 << 22  # Bytes of the file indexed per fetchMore()
+ROW_CACHE = 4096  # Parsed rows kept for repainting
+
+
+def _sort_key(values):
+    # Numeric columns sort as numbers (blanks last), anything else as text
+    try:
+        return np.array([float(value) if value else np.nan for value in values])
+    except ValueError:
+        return np.array(values)
+
+
+class CsvRowIndex:
+    """Byte offsets of the lines of a CSV file, built incrementally.
+
+    Rows are read by offset and parsed one at a time, so the cost of opening a
+    file is one chunk, not the whole file. Records must not contain newlines,
+    which holds for the tracker's logs. The file is read with seek/read rather
+    than memory-mapped so the tracker can still rewrite it while it is shown.
+    """
+
+    def __init__(self, file_path):
+        self.file_path = file_path
+        self._file = open(file_path, 'rb')
+        self.size = os.fstat(self._file.fileno()).st_size  # Rows appended later are not shown
+        self.starts = np.zeros(1, dtype=np.int64)  # Line starts, the header's first
+        self.scanned = 0
+        self._columns = {}
+        self.header = next(csv.reader([self._file.readline().decode('utf-8', 'replace')]), [])
+
+    @property
+    def done(self):
+        return self.scanned >= self.size
+
+    @property
+    def rows(self):
+        """Data rows whose extent is known so far."""
+        if not self.size:
+            return 0
+        return len(self.starts) - 1 if self.done else len(self.starts) - 2
+
+    def scan(self, limit=INDEX_CHUNK):
+        """Index the next `limit` bytes; returns the row count."""
+        count = min(limit, self.size - self.scanned)
+        if count > 0:
+            self._file.seek(self.scanned)
+            chunk = np.frombuffer(self._file.read(count), dtype=np.uint8)
+            starts = np.flatnonzero(chunk == 10) + (self.scanned + 1)
+            self.starts = np.concatenate((self.starts, starts[starts < self.size]))
+            self.scanned += len(chunk)
+        return self.rows
+
+    def scan_all(self):
+        while not self.done:
+            self.scan()
+        return self.rows
+
+    def row(self, row):
+        start = self.starts[row + 1]
+        end = self.starts[row + 2] if row + 2 < len(self.starts) else self.size
+        self._file.seek(start)
+        text = self._file.read(end - start).decode('utf-8', 'replace').rstrip('\r\n')
+        return next(csv.reader([text]), [])
+
+    def column_key(self, column):
+        """Sort key of every row's value in `column`, read in one pass over the file and cached."""
+        key = self._columns.get(column)
+        if key is None:
+            rows = self.scan_all()
+            with open(self.file_path, newline='') as f:
+                reader = csv.reader(f)
+                next(reader, None)
+                values = [record[column] if column < len(record) else '' for record, _ in zip(reader, range(rows))]
+            key = self._columns[column] = _sort_key(values)
+        return key
+
+    def close(self):
+        self._file.close()
+
+
+class CsvTableModel(QAbstractTableModel):
+    """Read-only table over a CSV file that fetches only the rows the view asks for.
+
+    Rows are indexed a chunk at a time as the view scrolls (canFetchMore /
+    fetchMore). Sorting and the track id filter work on a row-number
+    permutation built from one column, so they never load the other cells.
+    """
+
+    def __init__(self, file_path, parent=None):
+        super().__init__(parent)
+        self.rows = CsvRowIndex(file_path)
+        self.headers = self.rows.header
+        self.track_column = next((i for i, header in enumerate(self.headers) if header.endswith('Track ID')), None)
+        self._count = self.rows.scan()
+        self._view = None  # View row -> file row, while sorted or filtered
+        self._sort = None
+        self._track_ids = None
+        self._cache = collections.OrderedDict()
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return self._count if self._view is None else len(self._view)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.headers)
+
+    def _file_row(self, row):
+        return row if self._view is None else int(self._view[row])
+
+    def _record(self, file_row):
+        record = self._cache.get(file_row)
+        if record is None:
+            record = self._cache[file_row] = self.rows.row(file_row)
+            if len(self._cache) > ROW_CACHE:
+                self._cache.popitem(last=False)
+        return record
+
+    def data(self, index, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole or not index.isValid():
+            return None
+        record = self._record(self._file_row(index.row()))
+        return record[index.column()] if index.column() < len(record) else ''
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole:
+            return None
+        if orientation == Qt.Horizontal:
+            return self.headers[section] if section < len(self.headers) else None
+        return str(self._file_row(section) + 1)
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and self._view is None and not self.rows.done
+
+    def fetchMore(self, parent=QModelIndex()):
+        count = self.rows.scan()
+        if count > self._count:
+            self.beginInsertRows(QModelIndex(), self._count, count - 1)
+            self._count = count
+            self.endInsertRows()
+
+    def sort(self, column, order=Qt.AscendingOrder):
+        self._sort = None if column < 0 else (column, order)  # -1 restores file order
+        self._apply()
+
+    def set_track_filter(self, track_ids):
+        """Show only rows whose track id is in `track_ids`; None shows every row."""
+        if self.track_column is None:
+            return
+        self._track_ids = None if track_ids is None else set(track_ids)
+        self._apply()
+
+    def _apply(self):
+        self.beginResetModel()
+        if self._sort is None and self._track_ids is None:
+            self._view = None
+        else:
+            self._count = self.rows.scan_all()
+            view = np.arange(self._count)
+            if self._track_ids is not None:
+                key = self.rows.column_key(self.track_column)
+                view = view[np.isin(key, list(self._track_ids))]
+            if self._sort is not None:
+                column, order = self._sort
+                view = view[np.argsort(self.rows.column_key(column)[view], kind='stable')]
+                if order == Qt.DescendingOrder:
+                    view = view[::-1]
+            self._view = view
+        self.endResetModel()
+
+    def close(self):
+        self.rows.close()
@@ -1,720 +1,176 @@
 import sys
-import numpy as np
-import math
-import csv
 import matplotlib.pyplot as plt
-import mplcursors
-from scipy.stats import chi2
-from scipy.optimize import linear_sum_assignment
-from PyQt5.QtWidgets import (QApplication, QWidget, QTableWidget, QVBoxLayout, QPushButton, QFileDialog, QLabel, QComboBox, QTextEdit,
+from PyQt5.QtWidgets import (QApplication, QWidget, QTableView, QVBoxLayout, QPushButton, QFileDialog, QLabel, QComboBox, QTextEdit,
                              QHBoxLayout, QSplitter, QCheckBox, QLineEdit, QDialog, QGridLayout, QGroupBox, QRadioButton,
-                             QFrame, QSizePolicy, QToolButton, QTabWidget, QMenu, QAction, QTableWidgetItem, QScrollArea)
-from PyQt5.QtGui import QFont, QIcon, QColor
-from PyQt5.QtCore import Qt, QSize, pyqtSignal, QObject
-import socket
+                             QFrame, QSizePolicy, QToolButton, QTabWidget, QMenu, QAction, QHeaderView, QScrollArea,
+                             QSpinBox, QProgressBar)
+from PyQt5.QtGui import QFont, QIcon, QColor, QTextCursor
+from PyQt5.QtCore import Qt, QSize, pyqtSignal, QObject, QThread, QTimer
 import threading
+import time
+import logging
+import collections
+
+from log_table import CsvTableModel
+from shm_ring import RingIngestProcess
+from shm_snapshot import SnapshotReader, SnapshotWriter, tracks_from_snapshot
+from track_stream import TrackPublisher
+from tracker import Tracker, main, read_measurements
+from track_plot import TrackPlotRenderer
+from tracklog import configure_from_env, dump_ring, get_logger, set_console_level, set_console_sink
 
 from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
 from matplotlib.backends.backend_qt5agg import NavigationToolbar2QT
 
 
-# Custom stream class to redirect stdout
-class OutputStream:
-    def __init__(self, text_edit):
-        self.text_edit = text_edit
-
-    def write(self, text):
-        self.text_edit.append(text)
-
-    def flush(self): 
-        pass  # No need to implement flush for QTextEdit
-
-
-class CVFilter:
-    def __init__(self):
-        self.Sf = np.zeros((6, 1))  # Filter state vector
-        self.Pf = np.eye(6)  # Filter state covariance matrix
-        self.Sp = np.zeros((6, 1))  # Predicted state vector
-        self.Pp = np.eye(6)  # Predicted state covariance matrix
-        self.plant_noise = 20  # Plant noise covariance
-        self.H = np.eye(3, 6)  # Measurement matrix
-        self.R = np.eye(3)  # Measurement noise covariance
-        self.Meas_Time = 0  # Measured time
-        self.prev_Time = 0
-        self.Q = np.eye(6)
-        self.Phi = np.eye(6)
-        self.Z = np.zeros((3, 1))
-        self.Z1 = np.zeros((3, 1))  # Measurement vector
-        self.Z2 = np.zeros((3, 1))
-        self.first_rep_flag = False
-        self.second_rep_flag = False
-        self.gate_threshold = 900.21  # 95% confidence interval for Chi-squared distribution with 3 degrees of freedom
-
-    def initialize_filter_state(self, x, y, z, vx, vy, vz, time):
-        print(f"Initializing filter state with x: {x}, y: {y}, z: {z}, vx: {vx}, vy: {vy}, vz: {vz}, time: {time}")
-        if not self.first_rep_flag:
-            self.Z1 = np.array([[x], [y], [z]])
-            self.Sf[0] = x
-            self.Sf[1] = y
-            self.Sf[2] = z
-            print("check sfffffffffffffff",self.Sf[0])
-            self.Meas_Time = time
-            self.prev_Time = self.Meas_Time
-            self.first_rep_flag = True
-        elif self.first_rep_flag and not self.second_rep_flag:
-            self.Z2 = np.array([[x], [y], [z]])
-            self.prev_Time = self.Meas_Time
-            self.Meas_Time = time
-            dt = self.Meas_Time - self.prev_Time
-            self.Sf[3] = (self.Z2[0] - self.Z1[0]) / dt
-            self.Sf[4] = (self.Z2[1] - self.Z1[1]) / dt
-            self.Sf[5] = (self.Z2[2] - self.Z1[2]) / dt
-            self.second_rep_flag = True
-        else:
-            self.Z = np.array([[x], [y], [z]])
-            self.prev_Time = self.Meas_Time
-            self.Meas_Time = time
-
-    def predict_step(self, current_time):
-        dt = current_time - self.prev_Time
-        print(f"Predict step with dt: {dt}")
-        T_2 = (dt * dt) / 2.0
-        T_3 = (dt * dt * dt) / 3.0
-        self.Phi[0, 3] = dt
-        self.Phi[1, 4] = dt
-        self.Phi[2, 5] = dt
-        self.Q[0, 0] = T_3
-        self.Q[1, 1] = T_3
-        self.Q[2, 2] = T_3
-        self.Q[0, 3] = T_2
-        self.Q[1, 4] = T_2
-        self.Q[2, 5] = T_2
-        self.Q[3, 0] = T_2
-        self.Q[4, 1] = T_2
-        self.Q[5, 2] = T_2
-        self.Q[3, 3] = dt
-        self.Q[4, 4] = dt
-        self.Q[5, 5] = dt
-        self.Q = self.Q * self.plant_noise
-        self.Sp = np.dot(self.Phi, self.Sf)
-        self.Pp = np.dot(np.dot(self.Phi, self.Pf), self.Phi.T) + self.Q
-        self.Meas_Time = current_time
-
-    def update_step(self, Z):
-        print(f"Update step with measurement Z: {Z}")
-        Inn = Z - np.dot(self.H, self.Sp)
-        S = np.dot(self.H, np.dot(self.Pp, self.H.T)) + self.R
-        K = np.dot(np.dot(self.Pp, self.H.T), np.linalg.inv(S))
-        self.Sf = self.Sp + np.dot(K, Inn)
-        self.Pf = np.dot(np.eye(6) - np.dot(K, self.H), self.Pp)
-
-
-def read_measurements_from_csv(file_path):
-    measurements = []
-    with open(file_path, 'r') as file:
-        reader = csv.reader(file)
-        next(reader)  # Skip header if exists
-        for row in reader:
-            mr = float(row[10])  # MR column
-            ma = float(row[11])  # MA column
-            me = float(row[12])  # ME column
-            mt = float(row[13])  # MT column
-            md = float(row[14])
-            x, y, z = sph2cart(ma, me, mr)  # Convert spherical to Cartesian coordinates
-            print(f"Converted spherical to Cartesian: azimuth={ma}, elevation={me}, range={mr} -> x={x}, y={y}, z={z}")
-            measurements.append((mr, ma, me, mt, md, x, y, z))
-    return measurements
-
-def sph2cart(az, el, r):
-    x = r * np.cos(el * np.pi / 180) * np.sin(az * np.pi / 180)
-    y = r * np.cos(el * np.pi / 180) * np.cos(az * np.pi / 180)
-    z = r * np.sin(el * np.pi / 180)
-    return x, y, z
-
-
-def cart2sph(x, y, z):
-    r = np.sqrt(x**2 + y**2 + z**2)
-    el = math.atan2(z, np.sqrt(x**2 + y**2)) * 180 / np.pi
-    az = math.atan2(y, x)
-
-    if x > 0.0:
-        az = np.pi / 2 - az
-    else:
-        az = 3 * np.pi / 2 - az
-
-    az = az * 180 / np.pi
-
-    if az < 0.0:
-        az = 360 + az
-
-    if az > 360:
-        az = az - 360
-
-    print(f"Converted Cartesian to spherical: x={x}, y={y}, z={z} -> range={r}, azimuth={az}, elevation={el}")
-    return r, az, el
-
-
-def form_measurement_groups(measurements, max_time_diff=0.050):
-    measurement_groups = []
-    current_group = []
-    base_time = measurements[0][3]
-
-    for measurement in measurements:
-        if measurement[3] - base_time <= max_time_diff:
-            current_group.append(measurement)
-        else:
-            measurement_groups.append(current_group)
-            current_group = [measurement]
-            base_time = measurement[3]
-
-    if current_group:
-        measurement_groups.append(current_group)
-
-    return measurement_groups
-
-
-def form_clusters_via_association(tracks, reports, kalman_filter):
-    association_list = []
-    cov_inv = np.linalg.inv(kalman_filter.Pp[:3, :3])  # 3x3 covariance matrix for position only
-    chi2_threshold = kalman_filter.gate_threshold
-
-    for i, track in enumerate(tracks):
-        for j, report in enumerate(reports):
-            distance = mahalanobis_distance(track, report, cov_inv)
-            if distance < chi2_threshold:
-                association_list.append((i, j))
-
-    clusters = []
-    while association_list:
-        cluster_tracks = set()
-        cluster_reports = set()
-        stack = [association_list.pop(0)]
-
-        while stack:
-            track_idx, report_idx = stack.pop()
-            cluster_tracks.add(track_idx)
-            cluster_reports.add(report_idx)
-            new_assoc = [(t, r) for t, r in association_list if t == track_idx or r == report_idx]
-            for assoc in new_assoc:
-                if assoc not in stack:
-                    stack.append(assoc)
-            association_list = [assoc for assoc in association_list if assoc not in new_assoc]
-
-        clusters.append((list(cluster_tracks), [reports[r] for r in cluster_reports]))
-
-    return clusters
-
-
-def mahalanobis_distance(track, report, cov_inv):
-    residual = np.array(report) - np.array(track)
-    distance = np.dot(np.dot(residual.T, cov_inv), residual)
-    return distance
-
-
-def select_best_report(cluster_tracks, cluster_reports, kalman_filter):
-    cov_inv = np.linalg.inv(kalman_filter.Pp[:3, :3])
-
-    best_report = None
-    best_track_idx = None
-    max_weight = -np.inf
-
-    for i, track in enumerate(cluster_tracks):
-        for j, report in enumerate(cluster_reports):
-            residual = np.array(report) - np.array(track)
-            weight = np.exp(-0.5 * np.dot(np.dot(residual.T, cov_inv), residual))
-            if weight > max_weight:
-                max_weight = weight
-                best_report = report
-                best_track_idx = i
-
-    return best_track_idx, best_report
-
-
-def select_initiation_mode(mode):
-    if mode == '3-state':
-        return 3
-    elif mode == '5-state':
-        return 5
-    elif mode == '7-state':
-        return 7
-    else:
-        raise ValueError("Invalid mode selected.")
+log = get_logger('main')
 
+# Production default is INFO with no ring buffer; see tracklog for the TRACKER_LOG* switches
+configure_from_env()
 
-def doppler_correlation(doppler_1, doppler_2, doppler_threshold):
-    return abs(doppler_1 - doppler_2) < doppler_threshold
 
+CONSOLE_LEVELS = ['DEBUG', 'INFO', 'WARNING', 'ERROR']
 
-def correlation_check(track, measurement, doppler_threshold, range_threshold):
-    last_measurement = track['measurements'][-1][0]
-    last_cartesian = sph2cart(last_measurement[0], last_measurement[1], last_measurement[2])
-    measurement_cartesian = sph2cart(measurement[0], measurement[1], measurement[2])
-    distance = np.linalg.norm(np.array(measurement_cartesian) - np.array(last_cartesian))
-
-    doppler_correlated = doppler_correlation(measurement[4], last_measurement[4], doppler_threshold)
-    range_satisfied = distance < range_threshold
-
-    return doppler_correlated and range_satisfied
-
-
-def initialize_filter_state(kalman_filter, x, y, z, vx, vy, vz, time):
-    kalman_filter.initialize_filter_state(x, y, z, vx, vy, vz, time)
-
-
-def perform_jpda(tracks, reports, kalman_filter):
-    clusters = form_clusters_via_association(tracks, reports, kalman_filter)
-    best_reports = []
-    hypotheses = []
-    probabilities = []
-
-    for cluster_tracks, cluster_reports in clusters:
-        # Generate hypotheses for each cluster
-        cluster_hypotheses = []
-        cluster_probabilities = []
-        for track in cluster_tracks:
-            for report in cluster_reports:
-                # Calculate the probability of the hypothesis
-                cov_inv = np.linalg.inv(kalman_filter.Pp[:3, :3])
-                residual = np.array(report) - np.array(track)
-                probability = np.exp(-0.5 * np.dot(np.dot(residual.T, cov_inv), residual))
-                cluster_hypotheses.append((track, report))
-                cluster_probabilities.append(probability)
-
-        # Normalize probabilities
-        total_probability = sum(cluster_probabilities)
-        cluster_probabilities = [p / total_probability for p in cluster_probabilities]
-
-        # Select the best hypothesis based on the highest probability
-        best_hypothesis_index = np.argmax(cluster_probabilities)
-        best_track, best_report = cluster_hypotheses[best_hypothesis_index]
-
-        best_reports.append((best_track, best_report))
-        hypotheses.append(cluster_hypotheses)
-        probabilities.append(cluster_probabilities)
-
-    # Log clusters, hypotheses, and probabilities
-    print("JPDA Clusters:", clusters)
-    print("JPDA Hypotheses:", hypotheses)
-    print("JPDA Probabilities:", probabilities)
-    print("JPDA Best Reports:", best_reports)
-
-    return clusters, best_reports, hypotheses, probabilities
-
-def perform_munkres(tracks, reports, kalman_filter):
-    cost_matrix = []
-    cov_inv = np.linalg.inv(kalman_filter.Pp[:3, :3])
-
-    for track in tracks:
-        track_costs = []
-        for report in reports:
-            distance = mahalanobis_distance(track, report, cov_inv)
-            track_costs.append(distance)
-        cost_matrix.append(track_costs)
-
-    row_ind, col_ind = linear_sum_assignment(cost_matrix)
-    best_reports = [(row, reports[col]) for row, col in zip(row_ind, col_ind)]
-
-    # Log cost matrix and assignments
-    print("Munkres Cost Matrix:", cost_matrix)
-    print("Munkres Assignments:", list(zip(row_ind, col_ind)))
-    print("Munkres Best Reports:", best_reports)
-
-    return best_reports
-
-
-def check_track_timeout(tracks, current_time, poss_timeout=20.0, firm_tent_timeout=50.0):
-    tracks_to_remove = []
-    for track_id, track in enumerate(tracks):
-        last_measurement_time = track['measurements'][-1][0][3]  # Assuming the time is at index 3
-        time_since_last_measurement = current_time - last_measurement_time
-
-        if track['current_state'] == 'Poss1' and time_since_last_measurement > poss_timeout:
-            tracks_to_remove.append(track_id)
-        elif track['current_state'] in ['Tentative1', 'Firm'] and time_since_last_measurement > firm_tent_timeout:
-            tracks_to_remove.append(track_id)
-
-    return tracks_to_remove
-
-
-def plot_measurements(tracks, ax, plot_type, selected_track_ids=None):
-    ax.clear()
-    for track in tracks:
-        if selected_track_ids is not None and track['track_id'] not in selected_track_ids:
-            continue
-
-        times = [m[0][3] for m in track['measurements']]
-        measurements_x = [(m[0][:3])[0] for m in track['measurements']]
-        measurements_y = [(m[0][:3])[1] for m in track['measurements']]
-        measurements_z = [(m[0][:3])[2] for m in track['measurements']]
-
-        # Plot Sf values starting from the third measurement
-        if len(track['Sf']) > 2:
-            Sf_x = [state[0] for state in track['Sf'][2:]]
-            Sf_y = [state[1] for state in track['Sf'][2:]]
-            Sf_z = [state[2] for state in track['Sf'][2:]]
-            Sf_times = times[2:]
-        else:
-            Sf_x, Sf_y, Sf_z, Sf_times = [], [], [], []
-
-        if plot_type == "Range vs Time":
-            ax.scatter(times, measurements_x, label=f'Track {track["track_id"]} Measurement X', marker='o')
-            ax.scatter(Sf_times, Sf_x, label=f'Track {track["track_id"]} Sf X', linestyle='--')
-            ax.set_ylabel('X Coordinate')
-        elif plot_type == "Azimuth vs Time":
-            ax.scatter(times, measurements_y, label=f'Track {track["track_id"]} Measurement Y', marker='o')
-            ax.scatter(Sf_times, Sf_y, label=f'Track {track["track_id"]} Sf Y', linestyle='--')
-            ax.set_ylabel('Y Coordinate')
-        elif plot_type == "Elevation vs Time":
-            ax.scatter(times, measurements_z, label=f'Track {track["track_id"]} Measurement Z', marker='o')
-            ax.scatter(Sf_times, Sf_z, label=f'Track {track["track_id"]} Sf Z', linestyle='--')
-            ax.set_ylabel('Z Coordinate')
-
-    ax.set_xlabel('Time')
-    ax.set_title(f'Tracks {plot_type}')
-    ax.legend()
-
-    # Add interactive data tips
-    cursor = mplcursors.cursor(hover=True)
-
-    @cursor.connect("add")
-    def on_add(sel):
-        index = sel.target.index
-        track_id = tracks[index // len(tracks[0]['measurements'])]['track_id']
-        measurement = tracks[index // len(tracks[0]['measurements'])]['measurements'][index % len(tracks[0]['measurements'])]
-        time = measurement[0][3]
-        sp = tracks[index // len(tracks[0]['measurements'])]['Sp']
-        sf = tracks[index // len(tracks[0]['measurements'])]['Sf']
-        plant_noise = tracks[index // len(tracks[0]['measurements'])]['Pf'][0, 0]  # Example of accessing plant noise
-
-        sel.annotation.set(text=f"Track ID: {track_id}\nMeasurement: {measurement}\nTime: {time}\nSp: {sp}\nSf: {sf}\nPlant Noise: {plant_noise}")
-
-def log_to_csv(log_file_path, data):
-    with open(log_file_path, 'a', newline='') as csvfile:
-        writer = csv.DictWriter(csvfile, fieldnames=data.keys())
-        writer.writerow(data)
-
-
-def main(measurements, track_mode, filter_option, association_type):
-    log_file_path = 'detailed_log.csv'
-
-    # Initialize CSV log file
-    with open(log_file_path, 'w', newline='') as csvfile:
-        fieldnames = ['Time', 'Measurement X', 'Measurement Y', 'Measurement Z', 'Current State',
-                      'Correlation Output', 'Associated Track ID', 'Associated Position X',
-                      'Associated Position Y', 'Associated Position Z', 'Association Type',
-                      'Clusters Formed', 'Hypotheses Generated', 'Probability of Hypothesis',
-                      'Best Report Selected']
-        writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-        writer.writeheader()
-
-    if filter_option == "CV":
-        kalman_filter = CVFilter()
-    elif filter_option == "CA":
-        kalman_filter = CAFilter()
-    else:
-        raise ValueError("Invalid filter option selected.")
-
-    measurement_groups = form_measurement_groups(measurements, max_time_diff=0.050)
-
-    tracks = []
-    track_id_list = []
-    filter_states = []
-
-    doppler_threshold = 100
-    range_threshold = 100
-    firm_threshold = select_initiation_mode(track_mode)
-    association_method = association_type  # 'JPDA' or 'Munkres'
-
-    # Initialize variables outside the loop
-    miss_counts = {}
-    hit_counts = {}
-    firm_ids = set()
-    state_map = {}
-    state_transition_times = {}
-    progression_states = {
-        3: ['Poss1', 'Tentative1', 'Firm'],
-        5: ['Poss1', 'Poss2', 'Tentative1', 'Tentative2', 'Firm'],
-        7: ['Poss1', 'Poss2', 'Tentative1', 'Tentative2', 'Tentative3', 'Firm']
-    }[firm_threshold]
-
-    last_check_time = 0
-    check_interval = 0.0005  # 0.5 ms
-
-    for group_idx, group in enumerate(measurement_groups):
-        print(f"Processing measurement group {group_idx + 1}...")
-
-        current_time = group[0][3]  # Assuming the time is at index 3 of each measurement
-
-        # Periodic checking
-        if current_time - last_check_time >= check_interval:
-            tracks_to_remove = check_track_timeout(tracks, current_time)
-            for track_id in reversed(tracks_to_remove):
-                print(f"Removing track {track_id} due to timeout")
-                del tracks[track_id]
-                track_id_list[track_id]['state'] = 'free'
-                if track_id in firm_ids:
-                    firm_ids.remove(track_id)
-                if track_id in state_map:
-                    del state_map[track_id]
-                if track_id in hit_counts:
-                    del hit_counts[track_id]
-                if track_id in miss_counts:
-                    del miss_counts[track_id]
-            last_check_time = current_time
-
-        if len(group) == 1:  # Single measurement
-            measurement = group[0]
-            assigned = False
-            for track_id, track in enumerate(tracks):                
-                if correlation_check(track, measurement, doppler_threshold, range_threshold):
-                    current_state = state_map.get(track_id, None)
-                    if current_state == 'Poss1':
-                        initialize_filter_state(kalman_filter, *sph2cart(*measurement[:3]), 0, 0, 0, measurement[3])
-                    elif current_state == 'Tentative1':
-                        last_measurement = track['measurements'][-1][0]
-                        dt = measurement[3] - last_measurement[3]
-                        vx = (sph2cart(*measurement[:3])[0] - sph2cart(*last_measurement[:3])[0]) / dt
-                        vy = (sph2cart(*measurement[:3])[1] - sph2cart(*last_measurement[:3])[1]) / dt
-                        vz = (sph2cart(*measurement[:3])[2] - sph2cart(*last_measurement[:3])[2]) / dt
-                        initialize_filter_state(kalman_filter, *sph2cart(*measurement[:3]), vx, vy, vz, measurement[3])
-                    elif current_state == 'Firm':
-                        kalman_filter.predict_step(measurement[3])
-                        kalman_filter.update_step(np.array((measurement[:3])).reshape(3, 1))
-
-                    track['measurements'].append((measurement, current_state))
-                    track['Sf'].append(kalman_filter.Sf.copy())
-                    track['Sp'].append(kalman_filter.Sp.copy())
-                    track['Pp'].append(kalman_filter.Pp.copy())
-                    track['Pf'].append(kalman_filter.Pf.copy())
-                    hit_counts[track_id] = hit_counts.get(track_id, 0) + 1
-                    assigned = True
-
-                    # Log data to CSV
-                    log_data = {
-                        'Time': measurement[3],
-                        'Measurement X': measurement[5],
-                        'Measurement Y': measurement[6],
-                        'Measurement Z': measurement[7],
-                        'Current State': current_state,
-                        'Correlation Output': 'Yes',
-                        'Associated Track ID': track_id,
-                        'Associated Position X': track['Sf'][-1][0, 0],
-                        'Associated Position Y': track['Sf'][-1][1, 0],
-                        'Associated Position Z': track['Sf'][-1][2, 0],
-                        'Association Type': 'Single',
-                        'Clusters Formed': '',
-                        'Hypotheses Generated': '',
-                        'Probability of Hypothesis': '',
-                        'Best Report Selected': ''
-                    }
-                    log_to_csv(log_file_path, log_data)
-                    break
-
-            if not assigned:
-                new_track_id = next((i for i, t in enumerate(track_id_list) if t['state'] == 'free'), None)
-                if new_track_id is None:
-                    new_track_id = len(track_id_list)
-                    track_id_list.append({'id': new_track_id, 'state': 'occupied'})
-                else:
-                    track_id_list[new_track_id]['state'] = 'occupied'
-
-                tracks.append({
-                    'track_id': new_track_id,
-                    'measurements': [(measurement, 'Poss1')],
-                    'current_state': 'Poss1',
-                    'Sf': [kalman_filter.Sf.copy()],
-                    'Sp': [kalman_filter.Sp.copy()],
-                    'Pp': [kalman_filter.Pp.copy()],
-                    'Pf': [kalman_filter.Pf.copy()]
-                })
-                state_map[new_track_id] = 'Poss1'
-                state_transition_times[new_track_id] = {'Poss1': current_time}
-                hit_counts[new_track_id] = 1
-                initialize_filter_state(kalman_filter, *sph2cart(*measurement[:3]), 0, 0, 0, measurement[3])
-
-                # Log data to CSV
-                log_data = {
-                    'Time': measurement[3],
-                    'Measurement X': measurement[5],
-                    'Measurement Y': measurement[6],
-                    'Measurement Z': measurement[7],
-                    'Current State': 'Poss1',
-                    'Correlation Output': 'No',
-                    'Associated Track ID': new_track_id,
-                    'Associated Position X': '',
-                    'Associated Position Y': '',
-                    'Associated Position Z': '',
-                    'Association Type': 'New',
-                    'Clusters Formed': '',
-                    'Hypotheses Generated': '',
-                    'Probability of Hypothesis': '',
-                    'Best Report Selected': ''
-                }
-                log_to_csv(log_file_path, log_data)
-
-        else:  # Multiple measurements
-            reports = [sph2cart(*m[:3]) for m in group]
-            if association_method == 'JPDA':
-                clusters, best_reports, hypotheses, probabilities = perform_jpda(
-                    [track['measurements'][-1][0][:3] for track in tracks], reports, kalman_filter
-                )
-            elif association_method == 'Munkres':
-                best_reports = perform_munkres([track['measurements'][-1][0][:3] for track in tracks], reports, kalman_filter)
-
-            for track_id, best_report in best_reports:
-                print("check the best reports",)
-                current_state = state_map.get(track_id, None)
-                if current_state == 'Poss1':
-                    initialize_filter_state(kalman_filter, *best_report, vx, vy, vz, group[0][3])
-                elif current_state == 'Tentative1':
-                    last_measurement = tracks[track_id]['measurements'][-1][0]
-                    dt = group[0][3] - last_measurement[3]
-                    vx = (best_report[0] - sph2cart(*last_measurement[:3])[0]) / dt
-                    vy = (best_report[1] - sph2cart(*last_measurement[:3])[1]) / dt
-                    vz = (best_report[2] - sph2cart(*last_measurement[:3])[2]) / dt
-                    initialize_filter_state(kalman_filter, *best_report, vx, vy, vz, group[0][3])
-                elif current_state == 'Firm':
-                    kalman_filter.predict_step(group[0][3])
-                    kalman_filter.update_step(np.array(best_report).reshape(3, 1))
-
-                tracks[track_id]['measurements'].append((cart2sph(*best_report) + (group[0][3], group[0][4]), current_state))
-                tracks[track_id]['Sf'].append(kalman_filter.Sf.copy())
-                tracks[track_id]['Sp'].append(kalman_filter.Sp.copy())
-                tracks[track_id]['Pp'].append(kalman_filter.Pp.copy())
-                tracks[track_id]['Pf'].append(kalman_filter.Pf.copy())
-                hit_counts[track_id] = hit_counts.get(track_id, 0) + 1
-
-                # Log data to CSV
-                log_data = {
-                    'Time': group[0][3],
-                    'Measurement X': best_report[0],
-                    'Measurement Y': best_report[1],
-                    'Measurement Z': best_report[2],
-                    'Current State': current_state,
-                    'Correlation Output': 'Yes',
-                    'Associated Track ID': track_id,
-                    'Associated Position X': tracks[track_id]['Sf'][-1][0, 0],
-                    'Associated Position Y': tracks[track_id]['Sf'][-1][1, 0],
-                    'Associated Position Z': tracks[track_id]['Sf'][-1][2, 0],
-                    'Association Type': association_method,
-                    'Hypotheses Generated': '',
-                    'Probability of Hypothesis': '',
-                    'Best Report Selected': best_report
-                }
-                log_to_csv(log_file_path, log_data)
-
-            # Handle unassigned measurements
-            assigned_reports = set(best_report for _, best_report in best_reports)
-            for report in reports:
-                if tuple(report) not in assigned_reports:
-                    new_track_id = next((i for i, t in enumerate(track_id_list) if t['state'] == 'free'), None)
-                    if new_track_id is None:
-                        new_track_id = len(track_id_list)
-                        track_id_list.append({'id': new_track_id, 'state': 'occupied'})
-                    else:
-                        track_id_list[new_track_id]['state'] = 'occupied'
-
-                    tracks.append({
-                        'track_id': new_track_id,
-                        'measurements': [(cart2sph(*report) + (group[0][3], group[0][4]), 'Poss1')],
-                        'current_state': 'Poss1',
-                        'Sf': [kalman_filter.Sf.copy()],
-                        'Sp': [kalman_filter.Sp.copy()],
-                        'Pp': [kalman_filter.Pp.copy()],
-                        'Pf': [kalman_filter.Pf.copy()]
-                    })
-                    state_map[new_track_id] = 'Poss1'
-                    state_transition_times[new_track_id] = {'Poss1': current_time}
-                    hit_counts[new_track_id] = 1
-                    initialize_filter_state(kalman_filter, *report, 0, 0, 0, group[0][3])
-
-                    # Log data to CSV
-                    log_data = {
-                        'Time': group[0][3],
-                        'Measurement X': report[0],
-                        'Measurement Y': report[1],
-                        'Measurement Z': report[2],
-                        'Current State': 'Poss1',
-                        'Correlation Output': 'No',
-                        'Associated Track ID': new_track_id,
-                        'Associated Position X': '',
-                        'Associated Position Y': '',
-                        'Associated Position Z': '',
-                        'Association Type': 'New',
-                        'Hypotheses Generated': '',
-                        'Probability of Hypothesis': '',
-                        'Best Report Selected': ''
-                    }
-                    log_to_csv(log_file_path, log_data)
-
-        # Update states based on hit counts
-        for track_id, track in enumerate(tracks):
-            current_state = state_map.get(track_id,None)
-            if current_state is not None:
-                current_state_index = progression_states.index(current_state)
-                if hit_counts[track_id] >= firm_threshold and current_state != 'Firm':
-                    state_map[track_id] = 'Firm'
-                    firm_ids.add(track_id)
-                    state_transition_times.setdefault(track_id, {})['Firm'] = current_time
-                elif current_state_index < len(progression_states) - 1:
-                    next_state = progression_states[current_state_index + 1]
-                    if hit_counts[track_id] >= current_state_index + 1 and state_map[track_id] != next_state:
-                        state_map[track_id] = next_state
-                        state_transition_times.setdefault(track_id, {})[next_state] = current_time
-                track['current_state'] = state_map[track_id]
-
-    # Prepare data for CSV
-    csv_data = []
-    for track_id, track in enumerate(tracks):
-        print(f"Track {track_id}:")
-        print(f"  Current State: {track['current_state']}")
-        print(f"  State Transition Times:")
-        for state, time in state_transition_times.get(track_id, {}).items():
-            print(f"    {state}: {time}")
-        print("  Measurement History:")
-        for state in progression_states:
-            measurements = [m for m, s in track['measurements'] if s == state][:3]
-            print(f"    {state}: {measurements}")
-        print(f"  Track Status: {track_id_list[track_id]['state']}")
-        print(f"  SF: {track['Sf']}")
-        print(f"  SP: {track['Sp']}")
-        print(f"  PF: {track['Pf']}")
-        print(f"  PP: {track['Pp']}")
-        print()
-
-        # Prepare data for CSV
-        csv_data.append({
-            'Track ID': track_id,
-            'Current State': track['current_state'],
-            'Poss1 Time': state_transition_times.get(track_id, {}).get('Poss1', ''),
-            'Tentative1 Time': state_transition_times.get(track_id, {}).get('Tentative1', ''),
-            'Firm Time': state_transition_times.get(track_id, {}).get('Firm', ''),
-            'Poss1 Measurements': str([m for m, s in track['measurements'] if s == 'Poss1'][:3]),
-            'Tentative1 Measurements': str([m for m, s in track['measurements'] if s == 'Tentative1'][:3]),
-            'Firm Measurements': str([m for m, s in track['measurements'] if s == 'Firm'][:3]),
-            'Track Status': track_id_list[track_id]['state'],
-            'SF': [sf.tolist() for sf in track['Sf']],
-            'SP': [sp.tolist() for sp in track['Sp']],
-            'PF': [pf.tolist() for pf in track['Pf']],
-            'PP': [pp.tolist() for pp in track['Pp']]
-        })
-
-    # Write to CSV
-    csv_file_path = 'track_summary.csv'
-    with open(csv_file_path, 'w', newline='') as csvfile:
-        fieldnames = ['Track ID', 'Current State', 'Poss1 Time', 'Tentative1 Time', 'Firm Time',
-                      'Poss1 Measurements', 'Tentative1 Measurements', 'Firm Measurements',
-                      'Track Status', 'SF', 'SP', 'PF', 'PP']
-        writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-        writer.writeheader()
-        for row in csv_data:
-            writer.writerow(row)
-
-    print(f"Track summary has been written to {csv_file_path}")
-
-    # Add this line at the end of the function
-    return tracks
 
+# Console sink that replaces stdout: writes from any thread are queued and the
+# QTextEdit is updated from a QTimer on the GUI thread, in one append per tick
+class ConsoleSink(QObject):
+    def __init__(self, text_edit, max_lines=5000, flush_interval_ms=100, max_pending=200000):
+        super().__init__(text_edit)
+        self.text_edit = text_edit
+        self.max_lines = max_lines
+        self.min_level = logging.DEBUG
+        self.paused = False
+        self.dropped = 0
+        self._lock = threading.Lock()
+        self._pending = collections.deque()
+        self._max_pending = max_pending
+        self._partial = ''
+        # Lines currently on screen, kept so a level change can re-filter them
+        self._history = collections.deque(maxlen=max_lines)
+        self.text_edit.document().setMaximumBlockCount(max_lines)
+
+        self.timer = QTimer(self)
+        self.timer.timeout.connect(self.flush_pending)
+        self.timer.start(flush_interval_ms)
+
+    # stdout interface: print() hands over fragments, so complete lines are cut here
+    def write(self, text):
+        with self._lock:
+            text = self._partial + text
+            lines = text.split('\n')
+            self._partial = lines.pop()
+            for line in lines:
+                self._queue(logging.INFO, line)
+
+    def flush(self):
+        pass  # The GUI timer does the flushing
+
+    # tracklog console sink interface
+    def emit(self, levelno, text):
+        with self._lock:
+            self._queue(levelno, text)
+
+    def _queue(self, levelno, text):
+        if len(self._pending) >= self._max_pending:
+            self._pending.popleft()
+            self.dropped += 1
+        self._pending.append((levelno, text))
+
+    def flush_pending(self):
+        if self.paused:
+            return
+        with self._lock:
+            if not self._pending:
+                return
+            pending, self._pending = self._pending, collections.deque()
+
+        # Only the newest max_lines can survive the block limit anyway
+        if len(pending) > self.max_lines:
+            pending = list(pending)[-self.max_lines:]
+        self._history.extend(pending)
+        lines = [text for levelno, text in pending if levelno >= self.min_level]
+        if lines:
+            self.text_edit.append('\n'.join(lines))
+
+    def set_paused(self, paused):
+        self.paused = paused
+        if not paused:
+            self.flush_pending()
+
+    def set_min_level(self, levelno):
+        self.min_level = levelno
+        self.text_edit.setPlainText('\n'.join(text for level, text in self._history if level >= levelno))
+        self.text_edit.moveCursor(QTextCursor.End)
+
+    def set_max_lines(self, max_lines):
+        self.max_lines = max_lines
+        self._history = collections.deque(self._history, maxlen=max_lines)
+        self.text_edit.document().setMaximumBlockCount(max_lines)
+
+    def clear(self):
+        with self._lock:
+            self._pending.clear()
+        self._history.clear()
+        self.text_edit.clear()
+
+
+# Runs tracker.main over a recording off the GUI thread. Progress goes out through signals and
+# partial tracks through a shared-memory snapshot, both at most once per frame interval; a
+# cancel request is seen between scans, and the tracks so far are still summarised
+class ProcessingWorker(QThread):
+    progress = pyqtSignal(int, int, int, int, float)  # Measurements done, total, scans, active tracks, measurements/s
+    done = pyqtSignal(object, bool)  # Tracks, cancelled
+    failed = pyqtSignal(str)
+
+    def __init__(self, input_file, track_mode, filter_option, association_type, start_time, end_time,
+                 publisher=None, snapshot_writer=None, frame_interval=0.1, cluster_workers=0, parent=None):
+        super().__init__(parent)
+        self.input_file = input_file
+        self.tracker_args = (track_mode, filter_option, association_type)
+        self.start_time = start_time
+        self.end_time = end_time
+        self.publisher = publisher
+        self.cluster_workers = cluster_workers
+        self.snapshot_writer = snapshot_writer
+        self.frame_interval = frame_interval
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
+
+    def run(self):
+        try:
+            measurements = read_measurements(self.input_file, self.start_time, self.end_time)
+            self.total = len(measurements)
+            self.measurements_done = self.scans = self.active_tracks = 0
+            self.started = self.last_emit = time.monotonic()
+            tracks = main(measurements, *self.tracker_args, publisher=self.publisher, on_scan=self.on_scan,
+                          cluster_workers=self.cluster_workers)
+        except Exception as e:
+            log.exception("Processing failed")
+            self.failed.emit(f"{type(e).__name__}: {e}")
+            return
+        self.emit_progress()
+        self.done.emit(tracks, self.cancelled)
+
+    def on_scan(self, tracker, group):
+        # Called by the tracker after every scan, on this thread
+        self.measurements_done += len(group)
+        self.scans = tracker.scan_count
+        self.active_tracks = len(tracker.tracks)
+        now = time.monotonic()
+        if now - self.last_emit >= self.frame_interval:
+            self.last_emit = now
+            if self.snapshot_writer is not None:
+                self.snapshot_writer.publish(tracker.tracks, tracker.scan_time)
+            self.emit_progress()
+        return not self.cancelled
+
+    def emit_progress(self):
+        elapsed = time.monotonic() - self.started
+        self.progress.emit(self.measurements_done, self.total, self.scans, self.active_tracks,
+                           self.measurements_done / elapsed if elapsed > 0 else 0.0)
 
 
 class SystemConfigDialog(QDialog):
@@ -830,8 +286,18 @@ class KalmanFilterGUI(QWidget):
         self.initUI()
         self.control_panel_collapsed = False  # Start with the panel expanded
         self.udp_thread = None
-        self.udp_socket = None
+        self.udp_ingest = None
+        self.tracker = None
         self.running = False
+        self.processing_worker = None
+
+        # Live mode: the tracker thread publishes fixed-size snapshots into shared memory and
+        # the GUI maps them from a timer, at most max_frame_rate times per second
+        self.snapshot_writer = None
+        self.snapshot_reader = None
+        self.redraw_timer = QTimer(self)
+        self.redraw_timer.timeout.connect(self.redraw_live)
+        self.set_max_frame_rate(self.max_frame_rate_spin.value())
 
     def initUI(self):
         self.setWindowTitle('Kalman Filter GUI')
@@ -894,7 +360,7 @@ class KalmanFilterGUI(QWidget):
                 border-radius: 4px;
                 padding: 5px;
             }
-            QTableWidget {
+            QTableView {
                 background-color: #333333;
                 color: white;
                 border: 1px solid #555555;
@@ -972,17 +438,98 @@ class KalmanFilterGUI(QWidget):
         control_layout.addWidget(self.plot_type_label)
         control_layout.addWidget(self.plot_type_combo)
 
+        # Time window (empty fields mean the start/end of the recording)
+        self.time_window_group = QGroupBox("Time Window (s)")
+        time_window_layout = QHBoxLayout()
+        self.start_time_edit = QLineEdit()
+        self.start_time_edit.setPlaceholderText("Start")
+        time_window_layout.addWidget(self.start_time_edit)
+        self.end_time_edit = QLineEdit()
+        self.end_time_edit.setPlaceholderText("End")
+        time_window_layout.addWidget(self.end_time_edit)
+        self.time_window_group.setLayout(time_window_layout)
+        control_layout.addWidget(self.time_window_group)
+
         # Process button
         self.process_button = QPushButton("Process")
         self.process_button.setIcon(QIcon("process.png"))
         self.process_button.clicked.connect(self.process_data)
-        control_layout.addWidget(self.process_button)
+        process_layout = QHBoxLayout()
+        process_layout.addWidget(self.process_button)
+        self.cancel_button = QPushButton("Cancel")
+        self.cancel_button.setEnabled(False)
+        self.cancel_button.clicked.connect(self.cancel_processing)
+        process_layout.addWidget(self.cancel_button)
+        control_layout.addLayout(process_layout)
+
+        # Progress of a recording being processed in the background
+        self.process_progress = QProgressBar()
+        self.process_progress.setRange(0, 1)
+        self.process_progress.setValue(0)
+        control_layout.addWidget(self.process_progress)
+        self.process_status_label = QLabel("")
+        control_layout.addWidget(self.process_status_label)
+
+        # Live sensors: one UDP port per radar, merged in time order
+        self.udp_group = QGroupBox("UDP Sensors")
+        udp_layout = QHBoxLayout()
+        self.udp_ports_edit = QLineEdit("5005")
+        self.udp_ports_edit.setToolTip("Comma-separated ports, one per sensor (sensor ids 0, 1, ...)")
+        udp_layout.addWidget(self.udp_ports_edit)
+        udp_layout.addWidget(QLabel("Max Lateness (s)"))
+        self.max_lateness_edit = QLineEdit("0.2")
+        udp_layout.addWidget(self.max_lateness_edit)
+        self.udp_group.setLayout(udp_layout)
+        control_layout.addWidget(self.udp_group)
+
+        # Binary track updates for downstream consumers, e.g. track_consumer.py
+        track_output_layout = QHBoxLayout()
+        track_output_layout.addWidget(QLabel("Track Output"))
+        self.track_output_edit = QLineEdit()
+        self.track_output_edit.setPlaceholderText("host:port (off if empty)")
+        track_output_layout.addWidget(self.track_output_edit)
+        control_layout.addLayout(track_output_layout)
 
         # Receive UDP button
         self.receive_udp_button = QPushButton("Receive UDP")
         self.receive_udp_button.setIcon(QIcon("network.png"))
         self.receive_udp_button.clicked.connect(self.start_udp_server)
-        control_layout.addWidget(self.receive_udp_button)
+        udp_button_layout = QHBoxLayout()
+        udp_button_layout.addWidget(self.receive_udp_button)
+        self.stop_udp_button = QPushButton("Stop UDP")
+        self.stop_udp_button.setEnabled(False)
+        self.stop_udp_button.clicked.connect(self.stop_udp_server)
+        udp_button_layout.addWidget(self.stop_udp_button)
+        control_layout.addLayout(udp_button_layout)
+
+        # Live redraw limit
+        live_rate_layout = QHBoxLayout()
+        live_rate_layout.addWidget(QLabel("Live Redraw (Hz)"))
+        self.max_frame_rate_spin = QSpinBox()
+        self.max_frame_rate_spin.setRange(1, 60)
+        self.max_frame_rate_spin.setValue(10)
+        self.max_frame_rate_spin.valueChanged.connect(self.set_max_frame_rate)
+        live_rate_layout.addWidget(self.max_frame_rate_spin)
+        control_layout.addLayout(live_rate_layout)
+
+        # Above this many plotted tracks each series is one collection coloured by track id
+        legend_layout = QHBoxLayout()
+        legend_layout.addWidget(QLabel("Per-Track Legend (max tracks)"))
+        self.collection_threshold_spin = QSpinBox()
+        self.collection_threshold_spin.setRange(0, 10000)
+        self.collection_threshold_spin.setValue(50)
+        self.collection_threshold_spin.valueChanged.connect(self.set_collection_threshold)
+        legend_layout.addWidget(self.collection_threshold_spin)
+        control_layout.addLayout(legend_layout)
+
+        # Processes for large JPDA clusters; 0 solves every cluster in the tracker's own thread
+        cluster_layout = QHBoxLayout()
+        cluster_layout.addWidget(QLabel("JPDA Cluster Workers"))
+        self.cluster_workers_spin = QSpinBox()
+        self.cluster_workers_spin.setRange(0, 64)
+        self.cluster_workers_spin.setValue(0)
+        cluster_layout.addWidget(self.cluster_workers_spin)
+        control_layout.addLayout(cluster_layout)
 
         # Right side: Output and Plot (with Tabs)
         right_layout = QVBoxLayout()
@@ -1008,6 +555,27 @@ class KalmanFilterGUI(QWidget):
         self.output_tab.setLayout(QVBoxLayout())
         self.output_tab.layout().addWidget(self.output_display)
 
+        # Console controls: pause, level filter and line limit
+        console_controls = QHBoxLayout()
+        self.pause_output_checkbox = QCheckBox("Pause")
+        self.pause_output_checkbox.stateChanged.connect(lambda state: self.console.set_paused(state == Qt.Checked))
+        console_controls.addWidget(self.pause_output_checkbox)
+        console_controls.addWidget(QLabel("Level"))
+        self.output_level_combo = QComboBox()
+        self.output_level_combo.addItems(CONSOLE_LEVELS)
+        self.output_level_combo.setCurrentText('INFO')
+        self.output_level_combo.currentTextChanged.connect(self.set_output_level)
+        console_controls.addWidget(self.output_level_combo)
+        console_controls.addWidget(QLabel("Max Lines"))
+        self.output_max_lines_spin = QSpinBox()
+        self.output_max_lines_spin.setRange(100, 1000000)
+        self.output_max_lines_spin.setSingleStep(1000)
+        self.output_max_lines_spin.setValue(5000)
+        self.output_max_lines_spin.valueChanged.connect(lambda value: self.console.set_max_lines(value))
+        console_controls.addWidget(self.output_max_lines_spin)
+        console_controls.addStretch()
+        self.output_tab.layout().addLayout(console_controls)
+
         # Plot Setup
         self.canvas = FigureCanvas(plt.Figure())
         self.plot_tab.setLayout(QVBoxLayout())
@@ -1015,6 +583,7 @@ class KalmanFilterGUI(QWidget):
 
         # Add navigation toolbar once
         self.toolbar = NavigationToolbar(self.canvas, self)
+        self.plot_renderer = TrackPlotRenderer(self.canvas, collection_threshold=self.collection_threshold_spin.value())
         self.plot_tab.layout().addWidget(self.toolbar)
 
         # Add Clear Plot and Clear Output buttons
@@ -1026,6 +595,11 @@ class KalmanFilterGUI(QWidget):
         self.clear_output_button.clicked.connect(self.clear_output)
         self.output_tab.layout().addWidget(self.clear_output_button)
 
+        # Post-mortem view of the in-memory debug ring (enabled with TRACKER_LOG_RING)
+        self.show_debug_log_button = QPushButton("Show Debug Log")
+        self.show_debug_log_button.clicked.connect(self.show_debug_log)
+        self.output_tab.layout().addWidget(self.show_debug_log_button)
+
         # Track Info Setup
         self.track_info_layout = QVBoxLayout()
         self.track_info_tab.setLayout(self.track_info_layout)
@@ -1039,9 +613,22 @@ class KalmanFilterGUI(QWidget):
         self.load_track_summary_button.clicked.connect(lambda: self.load_csv('track_summary.csv'))
         self.track_info_layout.addWidget(self.load_track_summary_button)
 
-        # Table to display CSV data
-        self.csv_table = QTableWidget()
+        # Only rows of these tracks are shown; empty shows every row
+        track_filter_layout = QHBoxLayout()
+        track_filter_layout.addWidget(QLabel("Filter Track IDs"))
+        self.track_filter_edit = QLineEdit()
+        self.track_filter_edit.setPlaceholderText("e.g. 3, 7")
+        self.track_filter_edit.editingFinished.connect(self.apply_track_filter)
+        track_filter_layout.addWidget(self.track_filter_edit)
+        self.track_info_layout.addLayout(track_filter_layout)
+
+        # Table to display CSV data; the model reads only the rows in view
+        self.csv_model = None
+        self.csv_table = QTableView()
         self.csv_table.setStyleSheet("background-color: black; color: red;")  # Set text color to white
+        self.csv_table.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+        self.csv_table.horizontalHeader().setSortIndicator(-1, Qt.AscendingOrder)
+        self.csv_table.setSortingEnabled(True)
         self.track_info_layout.addWidget(self.csv_table)
 
         # Track ID Selection
@@ -1061,8 +648,11 @@ class KalmanFilterGUI(QWidget):
 
         main_layout.addWidget(right_widget)
 
-        # Redirect stdout to the output display
-        sys.stdout = OutputStream(self.output_display)
+        # Redirect stdout and tracker logging to the output display
+        self.console = ConsoleSink(self.output_display, max_lines=self.output_max_lines_spin.value())
+        self.console.set_min_level(logging.getLevelName(self.output_level_combo.currentText()))
+        sys.stdout = self.console
+        set_console_sink(self.console)
 
         # Set main layout
         self.setLayout(main_layout)
@@ -1094,7 +684,7 @@ class KalmanFilterGUI(QWidget):
     def select_file(self):
         options = QFileDialog.Options()
         file_name, _ = QFileDialog.getOpenFileName(
-            self, "Select Input File", "", "CSV Files (*.csv);;All Files (*)", options=options
+            self, "Select Input File", "", "CSV Files (*.csv);;Measurement Store (*.npy);;All Files (*)", options=options
         )
         if file_name:
             self.input_file = file_name
@@ -1110,26 +700,107 @@ class KalmanFilterGUI(QWidget):
             print("Please select an input file.")
             return
 
+        if self.processing_worker is not None or self.udp_thread is not None:
+            print("Processing or the UDP server is already running.")
+            return
+
+        try:
+            start_time, end_time = self.get_time_window()
+        except ValueError:
+            print("Invalid time window.")
+            return
+
         print(
-            f"Processing with:\nInput File: {input_file}\nTrack Mode: {track_mode}\nFilter Option: {filter_option}\nAssociation Type: {association_type}"
+            f"Processing with:\nInput File: {input_file}\nTrack Mode: {track_mode}\nFilter Option: {filter_option}\nAssociation Type: {association_type}\nTime Window: {start_time} - {end_time}"
         )
 
-        measurements = read_measurements_from_csv(input_file)
-        self.tracks = main(
-            measurements, track_mode, filter_option, association_type
-        )  # Process data with selected parameters
+        # The tracker runs on a worker thread; partial tracks are drawn from its snapshots as they arrive,
+        # with headroom so new samples can be blitted without rescaling
+        self.tracks = []
+        self.plot_renderer.reset()
+        self.plot_renderer.headroom = 0.25
+        self.snapshot_writer = SnapshotWriter()
+        self.snapshot_reader = SnapshotReader(self.snapshot_writer.name)
+        self.processing_worker = ProcessingWorker(
+            input_file, track_mode, filter_option, association_type, start_time, end_time,
+            publisher=self.create_track_publisher(), snapshot_writer=self.snapshot_writer,
+            frame_interval=self.frame_interval, cluster_workers=self.cluster_workers_spin.value(), parent=self
+        )
+        self.processing_worker.progress.connect(self.show_processing_progress)
+        self.processing_worker.done.connect(self.processing_done)
+        self.processing_worker.failed.connect(self.processing_failed)
+        self.processing_worker.finished.connect(self.processing_stopped)
+        self.process_button.setEnabled(False)
+        self.cancel_button.setEnabled(True)
+        self.process_progress.setRange(0, 0)  # Busy until the recording is loaded
+        self.process_status_label.setText("Loading recording...")
+        self.processing_worker.start()
+        self.redraw_timer.start()
+
+    def cancel_processing(self):
+        if self.processing_worker is not None:
+            self.processing_worker.cancel()
+            self.cancel_button.setEnabled(False)
+            self.process_status_label.setText("Cancelling...")
+
+    def show_processing_progress(self, done, total, scans, active_tracks, rate):
+        self.process_progress.setRange(0, max(total, 1))
+        self.process_progress.setValue(done)
+        self.process_status_label.setText(
+            f"{scans} scans, {active_tracks} tracks, {done}/{total} measurements ({rate:,.0f}/s)"
+        )
 
-        if self.tracks is None:
+    def processing_done(self, tracks, cancelled):
+        self.redraw_timer.stop()
+        self.tracks = tracks
+        if cancelled:
+            print(f"Processing cancelled; {len(self.tracks)} tracks so far.")
+        if not self.tracks:
             print("No tracks were generated.")
         else:
             print(f"Number of tracks: {len(self.tracks)}")
 
-            # Update the plot after processing
-            self.update_plot()
-
             # Update track selection checkboxes
             self.update_track_selection()
 
+            # Redraw from the full histories; the snapshots only carried each track's recent samples
+            self.plot_renderer.reset()
+            self.plot_renderer.headroom = 0.0
+            self.update_plot()
+
+    def processing_failed(self, message):
+        self.redraw_timer.stop()
+        print(f"Processing failed: {message}")
+        self.process_status_label.setText("Failed")
+
+    def processing_stopped(self):
+        # QThread.finished: the worker's run() has returned, whichever way it ended. closeEvent
+        # calls this directly as well, so the queued signal may find it already done
+        if self.processing_worker is None:
+            return
+        self.redraw_timer.stop()
+        print(f"Track snapshot stats: {self.snapshot_writer.stats()}")
+        self.snapshot_reader.close()
+        self.snapshot_writer.close()
+        self.snapshot_reader = self.snapshot_writer = None
+        self.processing_worker = None
+        self.process_button.setEnabled(True)
+        self.cancel_button.setEnabled(False)
+
+    def create_track_publisher(self):
+        address = self.track_output_edit.text().strip()
+        if not address:
+            return None
+        host, port = address.rsplit(':', 1)
+        return TrackPublisher(host, int(port))
+
+    def get_time_window(self):
+        start_text = self.start_time_edit.text().strip()
+        end_text = self.end_time_edit.text().strip()
+        start_time = float(start_text) if start_text else None
+        end_time = float(end_text) if end_text else None
+        return start_time, end_time
+
     def update_plot(self):
         if not self.tracks:
             print("No tracks to plot.")
@@ -1141,97 +812,8 @@ class KalmanFilterGUI(QWidget):
 
         plot_type = self.plot_type_combo.currentText()
 
-        self.canvas.figure.clear()  # Clear the canvas before plotting
-        ax = self.canvas.figure.subplots()
-
-        if plot_type == "All Modes":
-            self.plot_all_modes(self.tracks, ax)
-        elif plot_type == "PPI":
-            self.plot_ppi(self.tracks, ax)
-        elif plot_type == "RHI":
-            self.plot_rhi(self.tracks, ax)
-        else:
-            plot_measurements(self.tracks, ax, plot_type, self.selected_track_ids)
-
-        # Enable interactive data tips
-        cursor = mplcursors.cursor(hover=True)
-
-        @cursor.connect("add")
-        def on_add(sel):
-            index = sel.target.index
-            track_id = self.tracks[index // len(self.tracks[0]['measurements'])]['track_id']
-            measurement = self.tracks[index // len(self.tracks[0]['measurements'])]['measurements'][index % len(self.tracks[0]['measurements'])]
-            time = measurement[0][3]
-            sp = self.tracks[index // len(self.tracks[0]['measurements'])]['Sp']
-            sf = self.tracks[index // len(self.tracks[0]['measurements'])]['Sf']
-            plant_noise = 20
-
-            sel.annotation.set(text=f"Track ID: {track_id}\nMeasurement: {measurement}\nTime: {time}\nSp: {sp}\nSf: {sf}\nPlant Noise: {plant_noise}")
-
-        self.canvas.draw()
-
-    def plot_all_modes(self, tracks, ax):
-        # Create a 2x2 grid for subplots within the existing canvas
-        self.canvas.figure.clear()
-        axes = self.canvas.figure.subplots(2, 2)
-
-        # Plot Range vs Time
-        plot_measurements(tracks, axes[0, 0], "Range vs Time", self.selected_track_ids)
-        axes[0, 0].set_title("Range vs Time")
-
-        # Plot Azimuth vs Time
-        plot_measurements(tracks, axes[0, 1], "Azimuth vs Time", self.selected_track_ids)
-        axes[0, 1].set_title("Azimuth vs Time")
-
-        # Plot PPI
-        self.plot_ppi(tracks, axes[1, 0])
-        axes[1, 0].set_title("PPI Plot")
-
-        # Plot RHI
-        self.plot_rhi(tracks, axes[1, 1])
-        axes[1, 1].set_title("RHI Plot")
-
-        # Adjust layout
-        self.canvas.figure.tight_layout()
-        self.canvas.draw()
-
-    def plot_ppi(self, tracks, ax):
-        ax.clear()
-        for track in tracks:
-            if track['track_id'] not in self.selected_track_ids:
-                continue
-
-            measurements = track["measurements"]
-            x_coords = [sph2cart(*m[0][:3])[0] for m in measurements]
-            y_coords = [sph2cart(*m[0][:3])[1] for m in measurements]
-
-            # PPI plot (x vs y)
-            ax.plot(x_coords, y_coords, label=f"Track {track['track_id']} PPI", marker="o")
-
-        ax.set_xlabel("X Coordinate")
-        ax.set_ylabel("Y Coordinate")
-        ax.set_title("PPI Plot (360°)")
-        ax.legend()
-
-    def plot_rhi(self, tracks, ax):
-        ax.clear()
-        for track in tracks:
-            if track['track_id'] not in self.selected_track_ids:
-                continue
-
-            measurements = track["measurements"]
-            x_coords = [sph2cart(*m[0][:3])[0] for m in measurements]
-            z_coords = [sph2cart(*m[0][:3])[2] for m in measurements]
-
-            # RHI plot (x vs z)
-            ax.plot(
-                x_coords, z_coords, label=f"Track {track['track_id']} RHI", linestyle="--"
-            )
-
-        ax.set_xlabel("X Coordinate")
-        ax.set_ylabel("Z Coordinate")
-        ax.set_title("RHI Plot")
-        ax.legend()
+        # Artists persist between calls; hover data tips come from the renderer's picking index
+        self.plot_renderer.update(self.tracks, self.selected_track_ids, plot_type)
 
     def show_config_dialog(self):
         dialog = SystemConfigDialog(self)
@@ -1249,33 +831,59 @@ class KalmanFilterGUI(QWidget):
         self.ct_filter_button.setChecked(self.filter_mode == "CT")
 
     def clear_plot(self):
-        self.canvas.figure.clear()
+        self.plot_renderer.reset()
         self.canvas.draw()
 
+    def set_output_level(self, level):
+        # The tracker loggers are switched too, otherwise DEBUG would only re-filter lines already shown
+        set_console_level(level)
+        self.console.set_min_level(logging.getLevelName(level))
+
     def clear_output(self):
-        self.output_display.clear()
+        self.console.clear()
+
+    def show_debug_log(self):
+        lines = dump_ring()
+        if not lines:
+            print("Debug ring buffer is empty or disabled (set TRACKER_LOG_RING to enable it).")
+            return
+        print("\n".join(lines))
 
     def load_csv(self, file_path):
+        if self.tracker is not None:
+            self.tracker.flush()  # Show the live session's rows logged so far
         try:
-            with open(file_path, 'r') as file:
-                reader = csv.reader(file)
-                headers = next(reader)
-                self.csv_table.setColumnCount(len(headers))
-                self.csv_table.setHorizontalHeaderLabels(headers)
-
-                # Clear existing rows
-                self.csv_table.setRowCount(0)
-
-                # Add rows from CSV
-                for row_data in reader:
-                    row = self.csv_table.rowCount()
-                    self.csv_table.insertRow(row)
-                    for column, data in enumerate(row_data):
-                        self.csv_table.setItem(row, column, QTableWidgetItem(data))
+            model = CsvTableModel(file_path)
         except Exception as e:
             print(f"Error loading CSV file: {e}")
+            return
+        self.csv_table.horizontalHeader().setSortIndicator(-1, Qt.AscendingOrder)
+        self.csv_table.setModel(model)
+        if self.csv_model is not None:
+            self.csv_model.close()
+        self.csv_model = model
+        self.apply_track_filter()
+
+    def apply_track_filter(self):
+        if self.csv_model is None:
+            return
+        text = self.track_filter_edit.text().strip()
+        try:
+            track_ids = [int(track_id) for track_id in text.replace(',', ' ').split()] if text else None
+        except ValueError:
+            print("Invalid track ID filter.")
+            return
+        self.csv_model.set_track_filter(track_ids)
 
     def update_track_selection(self):
+        # Rebuild the checkboxes only when the set of tracks changed, keeping unchecked tracks unchecked
+        track_ids = [track['track_id'] for track in self.tracks]
+        if track_ids == getattr(self, 'track_checkbox_ids', None):
+            return
+        unchecked = {int(checkbox.text().split()[-1]) for checkbox in getattr(self, 'track_checkboxes', [])
+                     if not checkbox.isChecked()}
+        self.track_checkbox_ids = track_ids
+
         # Clear existing checkboxes
         for i in reversed(range(self.track_selection_layout_inner.count())):
             widget = self.track_selection_layout_inner.itemAt(i).widget()
@@ -1292,10 +900,11 @@ class KalmanFilterGUI(QWidget):
         self.track_checkboxes = []
         for track in self.tracks:
             checkbox = QCheckBox(f"Track ID {track['track_id']}")
-            checkbox.setChecked(True)
+            checkbox.setChecked(track['track_id'] not in unchecked)
             checkbox.stateChanged.connect(self.update_selected_tracks)
             self.track_selection_layout_inner.addWidget(checkbox)
             self.track_checkboxes.append(checkbox)
+        self.selected_track_ids = {track_id for track_id in track_ids if track_id not in unchecked}
 
     def toggle_select_all_tracks(self, state):
         # Update all track checkboxes based on the "Select All" checkbox state
@@ -1313,53 +922,126 @@ class KalmanFilterGUI(QWidget):
         self.update_plot()
 
     def start_udp_server(self):
-        if self.udp_thread is None:
+        if self.processing_worker is not None:
+            print("Wait for processing to finish before starting the UDP server.")
+        elif self.udp_thread is None:
+            # One tracker for the whole live session, so tracks persist across datagrams
+            self.tracker = Tracker(
+                self.track_mode_combo.currentText(), self.filter_mode, "JPDA" if self.jpda_radio.isChecked() else "Munkres",
+                publisher=self.create_track_publisher(), cluster_workers=self.cluster_workers_spin.value()
+            )
+            ports = [int(port) for port in self.udp_ports_edit.text().split(',') if port.strip()]
+            sensors = {port: sensor_id for sensor_id, port in enumerate(ports)}
+            # Sockets, parsing and reordering run in their own process and fill a shared-memory ring
+            self.udp_ingest = RingIngestProcess(sensors, max_lateness=float(self.max_lateness_edit.text()))
+            self.udp_ingest.start()
+            self.snapshot_writer = SnapshotWriter()
+            self.snapshot_reader = SnapshotReader(self.snapshot_writer.name)
+            # Leave room around the data so live frames can be blitted without rescaling
+            self.plot_renderer.reset()
+            self.plot_renderer.headroom = 0.25
             self.running = True
             self.udp_thread = threading.Thread(target=self.receive_udp_data)
             self.udp_thread.start()
-            print("UDP server started.")
+            self.redraw_timer.start()
+            self.receive_udp_button.setEnabled(False)
+            self.stop_udp_button.setEnabled(True)
+            print(f"UDP server started on ports {', '.join(map(str, ports))}, "
+                  f"track snapshots in shared memory '{self.snapshot_writer.name}'.")
         else:
             print("UDP server is already running.")
 
     def receive_udp_data(self):
-        self.udp_socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-        self.udp_socket.bind(("0.0.0.0", 5005))  # Bind to all interfaces on port 5005
-
+        # Consumer side: the ring holds complete scans from all sensors in time order.
+        # This thread never touches widgets; it publishes a snapshot at most once per frame.
+        # Publishing costs the same however long the tracks' histories grow
+        last_publish = 0.0
+        changed = False
         while self.running:
-            data, addr = self.udp_socket.recvfrom(1024)  # Buffer size is 1024 bytes
-            print(f"Received message: {data} from {addr}")
-            measurements = self.parse_udp_data(data)
-            self.tracks = main(
-                measurements, self.track_mode_combo.currentText(), self.filter_mode, "JPDA" if self.jpda_radio.isChecked() else "Munkres"
-            )
+            if self.track_from_ring(timeout=0.2):
+                changed = True
+            now = time.monotonic()
+            if changed and now - last_publish >= self.frame_interval:
+                self.snapshot_writer.publish(self.tracker.tracks, self.tracker.scan_time)
+                last_publish = now
+                changed = False
+
+    def track_from_ring(self, timeout):
+        records = self.udp_ingest.read(timeout=timeout)
+        if records is None:
+            return False
+        log.debug("Tracking %d measurements", len(records))
+        self.tracker.process(records.tolist())
+        self.udp_ingest.release(len(records))
+        return True
+
+    def redraw_live(self):
+        # Runs in the GUI thread; only the newest snapshot is drawn, and only if it is new
+        snapshot = self.snapshot_reader.read()
+        if snapshot is None:
+            return
+        self.tracks = tracks_from_snapshot(snapshot)
+        self.update_track_selection()
+        self.update_plot()
+
+    def set_collection_threshold(self, threshold):
+        self.plot_renderer.collection_threshold = threshold
+        if self.tracks:
             self.update_plot()
-            self.update_track_selection()
 
-    def parse_udp_data(self, data):
-        # Example parsing function, adjust according to your data format
-        measurements = []
-        lines = data.decode().split('\n')
-        for line in lines:
-            if line.strip():
-                parts = line.split(',')
-                mr = float(parts[0])
-                ma = float(parts[1])
-                me = float(parts[2])
-                mt = float(parts[3])
-                md = float(parts[4])
-                x, y, z = sph2cart(ma, me, mr)
-                measurements.append((mr, ma, me, mt, md, x, y, z))
-        return measurements
+    def set_max_frame_rate(self, rate):
+        self.frame_interval = 1.0 / rate
+        self.redraw_timer.setInterval(int(1000 / rate))
 
     def stop_udp_server(self):
         self.running = False
-        if self.udp_socket:
-            self.udp_socket.close()
+        if self.udp_ingest is not None:
+            self.udp_ingest.stop()
         if self.udp_thread:
             self.udp_thread.join()
             self.udp_thread = None
+        self.redraw_timer.stop()
+        if self.udp_ingest is not None and self.tracker is not None:
+            # Track what the receiver process flushed into the ring on its way out
+            self.track_from_ring(timeout=0)
+        if self.snapshot_writer is not None:
+            print(f"Track snapshot stats: {self.snapshot_writer.stats()}")
+            self.snapshot_reader.close()
+            self.snapshot_writer.close()
+            self.snapshot_reader = self.snapshot_writer = None
+        if self.tracker is not None:
+            # The tracker thread has ended, so draw its full final state directly, including any
+            # samples that never made it into a snapshot
+            self.tracks = self.tracker.tracks
+            self.update_track_selection()
+            self.plot_renderer.reset()
+            self.plot_renderer.headroom = 0.0
+            self.update_plot()
+        if self.udp_ingest is not None:
+            print(f"UDP ingest stats: {self.udp_ingest.stats()}")
+            self.udp_ingest.close()
+            self.udp_ingest = None
+        if self.tracker is not None:
+            if self.tracker.publisher is not None:
+                print(f"Track output stats: {self.tracker.publisher.stats()}")
+            self.tracker.close()
+            self.tracker.write_summary()
+            self.tracker = None
+        self.receive_udp_button.setEnabled(True)
+        self.stop_udp_button.setEnabled(False)
         print("UDP server stopped.")
 
+    def closeEvent(self, event):
+        # Let a background run stop at its next scan rather than destroying a running thread
+        if self.processing_worker is not None:
+            self.processing_worker.cancel()
+            self.processing_worker.wait()
+            self.processing_stopped()  # The queued finished signal may never be delivered after this
+        # Stop the live session so its ingest process, shared memory and log are shut down cleanly
+        if self.udp_thread is not None:
+            self.stop_udp_server()
+        super().closeEvent(event)
+
 class NavigationToolbar(NavigationToolbar2QT):
     pass  # Use pass if there are no additional methods or attributes
 
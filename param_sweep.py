@@ -0,0 +1,136 @@
+import argparse
+import csv
+import itertools
+import os
+import sys
+import time
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import shared_memory
+
+from recording import MEASUREMENT_DTYPE, read_measurement_records
+from tracker import Tracker
+
+# Parameter sweep: the recording is parsed once into shared memory, every worker
+# maps it, and each grid point runs a fresh Tracker over it with no file output.
+
+SWEEP_PARAMETERS = ['track_mode', 'filter', 'association', 'plant_noise', 'doppler_threshold', 'range_threshold',
+                    'group_window']
+METRIC_FIELDS = ['status', 'scans', 'tracks_created', 'final_tracks', 'firm_tracks', 'confirmed_tracks',
+                 'confirmation_latency_mean', 'confirmation_latency_median', 'runtime_s', 'measurements_per_s', 'error']
+
+_measurements = None  # Worker side view on the shared recording
+_shm = None
+
+
+def load_shared(path, start_time=None, end_time=None):
+    """Read a recording once and copy it into a new shared memory segment; returns (shm, count)."""
+    records = read_measurement_records(path, start_time, end_time)
+    shm = shared_memory.SharedMemory(create=True, size=max(records.nbytes, 1))
+    np.ndarray(len(records), dtype=MEASUREMENT_DTYPE, buffer=shm.buf)[:] = records
+    return shm, len(records)
+
+
+def _attach(name, count):
+    # Pool initializer: map the recording once per worker process
+    global _measurements, _shm
+    _shm = shared_memory.SharedMemory(name=name)
+    _measurements = np.ndarray(count, dtype=MEASUREMENT_DTYPE, buffer=_shm.buf)
+
+
+def parameter_grid(values):
+    """Cartesian product of {parameter: [values]} as a list of dicts, in SWEEP_PARAMETERS order."""
+    names = [name for name in SWEEP_PARAMETERS if name in values]
+    return [dict(zip(names, combination)) for combination in itertools.product(*(values[name] for name in names))]
+
+
+def run_configuration(config):
+    result = dict(config)
+    start = time.perf_counter()
+    try:
+        tracker = Tracker(config['track_mode'], config['filter'], config['association'], log_file_path=None,
+                          doppler_threshold=config['doppler_threshold'], range_threshold=config['range_threshold'])
+        tracker.kalman_filter.plant_noise = config['plant_noise']
+        tracker.process(_measurements.tolist(), max_time_diff=config['group_window'])
+    except Exception as e:
+        result.update({'status': 'error', 'error': f'{type(e).__name__}: {e}', 'runtime_s': time.perf_counter() - start})
+        return result
+    runtime = time.perf_counter() - start
+
+    latencies = np.array(tracker.confirmation_latencies)
+    result.update({
+        'status': 'ok',
+        'scans': tracker.scan_count,
+        'tracks_created': tracker.tracks_created,
+        'final_tracks': len(tracker.tracks),
+        'firm_tracks': sum(track['current_state'] == 'Firm' for track in tracker.tracks),
+        'confirmed_tracks': len(latencies),
+        'confirmation_latency_mean': float(latencies.mean()) if len(latencies) else '',
+        'confirmation_latency_median': float(np.median(latencies)) if len(latencies) else '',
+        'runtime_s': runtime,
+        'measurements_per_s': len(_measurements) / runtime if runtime > 0 else 0.0,
+    })
+    return result
+
+
+def run_sweep(path, values, workers=None, start_time=None, end_time=None):
+    """Run every grid point over one shared copy of the recording; returns the result rows in grid order."""
+    grid = parameter_grid(values)
+    shm, count = load_shared(path, start_time, end_time)
+    results = [None] * len(grid)
+    try:
+        with ProcessPoolExecutor(max_workers=workers or os.cpu_count() or 1,
+                                 initializer=_attach, initargs=(shm.name, count)) as pool:
+            futures = {pool.submit(run_configuration, config): i for i, config in enumerate(grid)}
+            for done, future in enumerate(as_completed(futures), 1):
+                results[futures[future]] = future.result()
+                print(f"\r{done}/{len(grid)} configurations", end='', file=sys.stderr)
+        print(file=sys.stderr)
+    finally:
+        shm.close()
+        shm.unlink()
+    return results
+
+
+def write_results(file_path, results):
+    with open(file_path, 'w', newline='') as csvfile:
+        writer = csv.DictWriter(csvfile, fieldnames=SWEEP_PARAMETERS + METRIC_FIELDS, restval='')
+        writer.writeheader()
+        writer.writerows(results)
+
+
+def _values(text, kind):
+    return [kind(value) for value in text.split(',')]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Sweep tracker parameters over one recording.")
+    parser.add_argument('file_path', help="CSV recording or .npy measurement store")
+    parser.add_argument('--track-mode', default='3-state', help="Comma-separated values, e.g. 3-state,5-state")
+    parser.add_argument('--filter', choices=['CV'], default='CV')
+    parser.add_argument('--association', default='JPDA', help="e.g. JPDA,Munkres")
+    parser.add_argument('--plant-noise', default='20')
+    parser.add_argument('--doppler-threshold', default='100')
+    parser.add_argument('--range-threshold', default='100')
+    parser.add_argument('--group-window', default='0.050', help="Scan grouping window(s) in seconds")
+    parser.add_argument('--start', type=float, default=None, help="Start of the time window (s)")
+    parser.add_argument('--end', type=float, default=None, help="End of the time window (s)")
+    parser.add_argument('--workers', type=int, default=None, help="Worker processes (default: all cores)")
+    parser.add_argument('--out', default='sweep_results.csv')
+    args = parser.parse_args()
+
+    values = {
+        'track_mode': _values(args.track_mode, str),
+        'filter': _values(args.filter, str),
+        'association': _values(args.association, str),
+        'plant_noise': _values(args.plant_noise, float),
+        'doppler_threshold': _values(args.doppler_threshold, float),
+        'range_threshold': _values(args.range_threshold, float),
+        'group_window': _values(args.group_window, float),
+    }
+    start = time.perf_counter()
+    results = run_sweep(args.file_path, values, args.workers, args.start, args.end)
+    write_results(args.out, results)
+    failed = sum(result['status'] != 'ok' for result in results)
+    print(f"{len(results)} configurations in {time.perf_counter() - start:.1f} s ({failed} failed), "
+          f"results in {args.out}")
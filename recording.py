@@ -0,0 +1,216 @@
+import csv
+import os
+import sys
+import numpy as np
+
+# Column positions of the measurement fields in the recording CSV
+MR_COL = 10
+MA_COL = 11
+ME_COL = 12
+MT_COL = 13
+MD_COL = 14
+
+# Record layout of the binary measurement store (.npy), same field order as the
+# measurement tuples used by main(): (mr, ma, me, mt, md, x, y, z)
+MEASUREMENT_DTYPE = np.dtype([
+    ('mr', '<f8'), ('ma', '<f8'), ('me', '<f8'), ('mt', '<f8'), ('md', '<f8'),
+    ('x', '<f8'), ('y', '<f8'), ('z', '<f8')
+])
+
+INDEX_SUFFIX = '.tidx.npz'
+INDEX_STRIDE = 1024  # One index entry every INDEX_STRIDE records
+
+
+def is_measurement_store(file_path):
+    return file_path.lower().endswith('.npy')
+
+
+def index_path_for(file_path):
+    return file_path + INDEX_SUFFIX
+
+
+def _source_signature(file_path):
+    st = os.stat(file_path)
+    return st.st_size, st.st_mtime_ns
+
+
+def build_time_index(file_path, stride=INDEX_STRIDE):
+    """Scan a recording once and write its sidecar time index.
+
+    The index holds the time of every `stride`-th record and where that record
+    starts: a byte offset for CSV recordings, a record number for the binary
+    store. Records are assumed to be in time order, as main() already assumes.
+    """
+    times = []
+    offsets = []
+    if is_measurement_store(file_path):
+        records = np.load(file_path, mmap_mode='r')
+        count = len(records)
+        if count:
+            rows = np.arange(0, count, stride)
+            times = np.asarray(records['mt'][rows], dtype=np.float64)
+            offsets = rows
+    else:
+        count = 0
+        with open(file_path, 'rb') as file:
+            offset = len(file.readline())  # Skip header
+            for line in file:
+                if line.strip():
+                    if count % stride == 0:
+                        row = next(csv.reader([line.decode()]))
+                        times.append(float(row[MT_COL]))
+                        offsets.append(offset)
+                    count += 1
+                offset += len(line)
+
+    size, mtime_ns = _source_signature(file_path)
+    with open(index_path_for(file_path), 'wb') as file:
+        np.savez(file,
+                 times=np.asarray(times, dtype=np.float64),
+                 offsets=np.asarray(offsets, dtype=np.int64),
+                 meta=np.array([size, mtime_ns, stride, count], dtype=np.int64))
+    return load_time_index(file_path)
+
+
+def load_time_index(file_path, build=True):
+    """Return (times, offsets, record_count) for a recording.
+
+    The sidecar index is rebuilt when it is missing or older than the recording.
+    """
+    index_path = index_path_for(file_path)
+    if os.path.exists(index_path):
+        with np.load(index_path) as index:
+            meta = index['meta']
+            if tuple(meta[:2]) == _source_signature(file_path):
+                return index['times'], index['offsets'], int(meta[3])
+    if not build:
+        return None
+    return build_time_index(file_path)
+
+
+def _window_blocks(times, start_time, end_time):
+    # First index entry whose block may hold start_time, first entry past end_time
+    first = 0
+    if start_time is not None:
+        first = max(int(np.searchsorted(times, start_time, side='left')) - 1, 0)
+    last = len(times)
+    if end_time is not None:
+        last = int(np.searchsorted(times, end_time, side='right'))
+    return first, last
+
+
+def iter_csv_rows(file_path, start_time=None, end_time=None):
+    """Yield the CSV rows of a recording whose MT lies in [start_time, end_time].
+
+    With no bounds the whole file is read. Otherwise the time index is used to
+    seek straight to the first block of the window and reading stops at the
+    first row past end_time.
+    """
+    with open(file_path, 'rb') as file:
+        if start_time is None and end_time is None:
+            file.readline()  # Skip header
+        else:
+            times, offsets, _ = load_time_index(file_path)
+            if not len(times):
+                return
+            first, _ = _window_blocks(times, start_time, end_time)
+            file.seek(int(offsets[first]))
+
+        for row in csv.reader(line.decode() for line in file):
+            if not row:
+                continue
+            mt = float(row[MT_COL])
+            if start_time is not None and mt < start_time:
+                continue
+            if end_time is not None and mt > end_time:
+                break
+            yield row
+
+
+def read_measurement_store(file_path, start_time=None, end_time=None):
+    """Return the records of a binary store in [start_time, end_time] as an array."""
+    records = np.load(file_path, mmap_mode='r')
+    if start_time is not None or end_time is not None:
+        times, offsets, count = load_time_index(file_path)
+        first, last = _window_blocks(times, start_time, end_time)
+        begin = int(offsets[first]) if first < len(offsets) else count
+        stop = int(offsets[last]) if last < len(offsets) else count
+        records = records[begin:stop]
+        mask = np.ones(len(records), dtype=bool)
+        if start_time is not None:
+            mask &= records['mt'] >= start_time
+        if end_time is not None:
+            mask &= records['mt'] <= end_time
+        records = records[mask]
+    return np.array(records, dtype=MEASUREMENT_DTYPE)
+
+
+def write_measurement_store(file_path, measurements):
+    """Write measurement tuples (or a record array) to a binary store and index it."""
+    if not isinstance(measurements, np.ndarray):
+        measurements = [tuple(m) for m in measurements]
+    records = np.array(measurements, dtype=MEASUREMENT_DTYPE)
+    np.save(file_path, records)
+    build_time_index(file_path)
+    return len(records)
+
+
+def records_from_spherical(values):
+    """Build measurement records from an (n, 5) array of mr, ma, me, mt, md.
+
+    x, y, z are filled in with the same conversion as sph2cart(ma, me, mr).
+    """
+    values = np.asarray(values, dtype=np.float64).reshape(-1, 5)
+    records = np.empty(len(values), dtype=MEASUREMENT_DTYPE)
+    for i, name in enumerate(('mr', 'ma', 'me', 'mt', 'md')):
+        records[name] = values[:, i]
+    az, el = np.radians(records['ma']), np.radians(records['me'])
+    records['x'] = records['mr'] * np.cos(el) * np.sin(az)
+    records['y'] = records['mr'] * np.cos(el) * np.cos(az)
+    records['z'] = records['mr'] * np.sin(el)
+    return records
+
+
+def scan_boundaries(times, max_time_diff=0.050, scan_start=None):
+    """Indices at which a new scan starts in a run of time-ordered measurement times.
+
+    A scan starts at the first measurement more than `max_time_diff` after the
+    current scan's start. `scan_start` is the start time of a scan still open
+    before times[0], if any. This is the one grouping rule for file, live,
+    replay and sharded tracking.
+    """
+    if isinstance(times, np.ndarray):
+        times = times.tolist()
+    starts = []
+    for i, mt in enumerate(times):
+        if scan_start is None or mt - scan_start > max_time_diff:
+            starts.append(i)
+            scan_start = mt
+    return starts
+
+
+def read_measurement_records(file_path, start_time=None, end_time=None):
+    """Return a recording (CSV or binary store) as a MEASUREMENT_DTYPE array."""
+    if is_measurement_store(file_path):
+        return read_measurement_store(file_path, start_time, end_time)
+    values = [(float(row[MR_COL]), float(row[MA_COL]), float(row[ME_COL]), float(row[MT_COL]), float(row[MD_COL]))
+              for row in iter_csv_rows(file_path, start_time, end_time)]
+    return records_from_spherical(values)
+
+
+def convert_csv_to_store(csv_path, store_path):
+    return write_measurement_store(store_path, read_measurement_records(csv_path))
+
+
+if __name__ == "__main__":
+    # python recording.py index <recording>...
+    # python recording.py convert <recording.csv> <store.npy>
+    if len(sys.argv) >= 3 and sys.argv[1] == 'index':
+        for path in sys.argv[2:]:
+            times, offsets, count = build_time_index(path)
+            print(f"Indexed {path}: {count} records, {len(times)} index entries")
+    elif len(sys.argv) == 4 and sys.argv[1] == 'convert':
+        count = convert_csv_to_store(sys.argv[2], sys.argv[3])
+        print(f"Wrote {count} records to {sys.argv[3]}")
+    else:
+        print("usage: recording.py index <recording>... | convert <recording.csv> <store.npy>")
@@ -0,0 +1,225 @@
+import argparse
+import csv
+import numpy as np
+
+from recording import MR_COL, MA_COL, ME_COL, MT_COL, MD_COL, records_from_spherical, write_measurement_store
+
+MOTION_MODELS = ('cv', 'ca', 'ct')
+GEOMETRIES = ('random', 'crossing', 'formation')
+
+TRUTH_FIELDS = ['Time', 'Target ID', 'X', 'Y', 'Z', 'VX', 'VY', 'VZ', 'Motion', 'Detected']
+CSV_COLUMNS = 15  # MR..MD sit at columns 10-14 like the recordings; column 0 holds the truth target id
+
+
+class ScenarioConfig:
+    def __init__(self, targets=10, duration=60.0, scan_period=1.0, rotating=True,
+                 motion_mix=(1.0, 0.0, 0.0), geometry='random', formation_size=4, formation_spacing=200.0,
+                 range_limits=(5000.0, 50000.0), altitude_limits=(500.0, 10000.0), speed_limits=(100.0, 300.0),
+                 max_acceleration=5.0, max_turn_rate=3.0,
+                 detection_probability=0.9, clutter_rate=0.0,
+                 sigma_range=10.0, sigma_azimuth=0.1, sigma_elevation=0.1, sigma_doppler=1.0, seed=None):
+        self.targets = targets
+        self.duration = duration
+        self.scan_period = scan_period  # Antenna revolution time (s)
+        self.rotating = rotating  # Detection time follows azimuth within the scan
+        self.motion_mix = motion_mix  # Fractions of CV, CA and CT targets
+        self.geometry = geometry
+        self.formation_size = formation_size
+        self.formation_spacing = formation_spacing  # m between formation members
+        self.range_limits = range_limits
+        self.altitude_limits = altitude_limits
+        self.speed_limits = speed_limits
+        self.max_acceleration = max_acceleration  # m/s^2, CA targets
+        self.max_turn_rate = max_turn_rate  # deg/s, CT targets
+        self.detection_probability = detection_probability
+        self.clutter_rate = clutter_rate  # Mean false alarms per scan (Poisson)
+        self.sigma_range = sigma_range  # m
+        self.sigma_azimuth = sigma_azimuth  # deg
+        self.sigma_elevation = sigma_elevation  # deg
+        self.sigma_doppler = sigma_doppler  # m/s
+        self.seed = seed
+
+
+def cart2sph_array(x, y, z):
+    # Inverse of sph2cart(az, el, r) in the tracker: azimuth from north (y) towards east (x)
+    r = np.sqrt(x ** 2 + y ** 2 + z ** 2)
+    az = np.degrees(np.arctan2(x, y)) % 360.0
+    el = np.degrees(np.arcsin(np.clip(z / np.maximum(r, 1e-9), -1.0, 1.0)))
+    return r, az, el
+
+
+def _initial_states(config, rng):
+    n = config.targets
+    speed = rng.uniform(*config.speed_limits, n)
+    heading = rng.uniform(0.0, 2 * np.pi, n)
+    altitude = rng.uniform(*config.altitude_limits, n)
+
+    if config.geometry == 'crossing':
+        # Everyone passes close to one point at mid-scenario
+        center = np.array([0.0, np.mean(config.range_limits), np.mean(config.altitude_limits)])
+        velocity = np.stack([speed * np.sin(heading), speed * np.cos(heading), np.zeros(n)], axis=1)
+        position = center + rng.normal(0.0, 100.0, (n, 3)) - velocity * (config.duration / 2.0)
+        position[:, 2] = altitude
+    elif config.geometry == 'formation':
+        # Leaders placed at random, members offset behind and beside their leader
+        leaders = np.arange(n) // max(config.formation_size, 1)
+        n_groups = leaders[-1] + 1 if n else 0
+        group_range = rng.uniform(*config.range_limits, n_groups)
+        group_az = rng.uniform(0.0, 2 * np.pi, n_groups)
+        group_heading = rng.uniform(0.0, 2 * np.pi, n_groups)
+        group_speed = rng.uniform(*config.speed_limits, n_groups)
+        group_altitude = rng.uniform(*config.altitude_limits, n_groups)
+        slot = np.arange(n) % max(config.formation_size, 1)
+        side = np.where(slot % 2, 1.0, -1.0) * ((slot + 1) // 2)
+        h = group_heading[leaders]
+        position = np.stack([
+            group_range[leaders] * np.sin(group_az[leaders]) + config.formation_spacing * (side * np.cos(h) - np.abs(side) * np.sin(h)),
+            group_range[leaders] * np.cos(group_az[leaders]) + config.formation_spacing * (-side * np.sin(h) - np.abs(side) * np.cos(h)),
+            group_altitude[leaders],
+        ], axis=1)
+        velocity = np.stack([group_speed[leaders] * np.sin(h), group_speed[leaders] * np.cos(h), np.zeros(n)], axis=1)
+    else:
+        ground_range = rng.uniform(*config.range_limits, n)
+        azimuth = rng.uniform(0.0, 2 * np.pi, n)
+        position = np.stack([ground_range * np.sin(azimuth), ground_range * np.cos(azimuth), altitude], axis=1)
+        velocity = np.stack([speed * np.sin(heading), speed * np.cos(heading), np.zeros(n)], axis=1)
+
+    return position, velocity
+
+
+def generate_scenario(config):
+    """Simulate the scenario.
+
+    Returns (records, target_ids, truth): a time-ordered MEASUREMENT_DTYPE
+    array, the truth target id of each record (-1 for clutter), and one
+    TRUTH_FIELDS row per target per scan.
+    """
+    rng = np.random.default_rng(config.seed)
+    n = config.targets
+    position, velocity = _initial_states(config, rng)
+
+    mix = np.asarray(config.motion_mix, dtype=float)
+    motion = rng.choice(len(MOTION_MODELS), size=n, p=mix / mix.sum())
+    acceleration = np.zeros((n, 3))
+    is_ca = motion == MOTION_MODELS.index('ca')
+    acceleration[is_ca, :2] = rng.uniform(-config.max_acceleration, config.max_acceleration, (is_ca.sum(), 2))
+    turn_rate = np.zeros(n)
+    is_ct = motion == MOTION_MODELS.index('ct')
+    turn_rate[is_ct] = np.radians(rng.uniform(-config.max_turn_rate, config.max_turn_rate, is_ct.sum()))
+    motion_names = [MOTION_MODELS[code] for code in motion]
+
+    chunks = []
+    target_ids = []
+    truth = []
+    scans = int(np.floor(config.duration / config.scan_period))
+    dt = config.scan_period
+    for scan in range(scans):
+        scan_time = scan * dt
+        r, az, el = cart2sph_array(*position.T)
+        doppler = np.einsum('ij,ij->i', position, velocity) / np.maximum(r, 1e-9)
+        detection_time = scan_time + (az / 360.0 * dt if config.rotating else np.zeros(n))
+
+        detected = rng.random(n) < config.detection_probability
+        truth.extend(zip([scan_time] * n, range(n), *position.T.tolist(), *velocity.T.tolist(),
+                         motion_names, detected.astype(int).tolist()))
+
+        m = int(detected.sum())
+        values = np.stack([
+            r[detected] + rng.normal(0.0, config.sigma_range, m),
+            (az[detected] + rng.normal(0.0, config.sigma_azimuth, m)) % 360.0,
+            el[detected] + rng.normal(0.0, config.sigma_elevation, m),
+            detection_time[detected],
+            doppler[detected] + rng.normal(0.0, config.sigma_doppler, m),
+        ], axis=1)
+        chunks.append(values)
+        target_ids.append(np.flatnonzero(detected))
+
+        clutter = rng.poisson(config.clutter_rate) if config.clutter_rate > 0 else 0
+        if clutter:
+            c_az = rng.uniform(0.0, 360.0, clutter)
+            chunks.append(np.stack([
+                rng.uniform(*config.range_limits, clutter),
+                c_az,
+                rng.uniform(0.0, 10.0, clutter),
+                scan_time + (c_az / 360.0 * dt if config.rotating else np.zeros(clutter)),
+                rng.normal(0.0, 50.0, clutter),
+            ], axis=1))
+            target_ids.append(np.full(clutter, -1))
+
+        # Propagate to the next scan
+        if is_ct.any():
+            angle = turn_rate * dt
+            cos_a, sin_a = np.cos(angle), np.sin(angle)
+            vx, vy = velocity[:, 0].copy(), velocity[:, 1].copy()
+            velocity[:, 0] = np.where(is_ct, cos_a * vx + sin_a * vy, vx)
+            velocity[:, 1] = np.where(is_ct, -sin_a * vx + cos_a * vy, vy)
+        position += velocity * dt + 0.5 * acceleration * dt * dt
+        velocity += acceleration * dt
+
+    values = np.concatenate(chunks) if chunks else np.empty((0, 5))
+    ids = np.concatenate(target_ids) if target_ids else np.empty(0, dtype=int)
+    order = np.argsort(values[:, 3], kind='stable')
+    values, ids = values[order], ids[order]
+
+    return records_from_spherical(values), ids, truth
+
+
+def write_scenario_csv(file_path, records, target_ids):
+    header = ['TargetID'] + [f'C{i}' for i in range(1, MR_COL)] + ['MR', 'MA', 'ME', 'MT', 'MD']
+    with open(file_path, 'w', newline='') as csvfile:
+        writer = csv.writer(csvfile)
+        writer.writerow(header)
+        row = [0] * CSV_COLUMNS
+        for target_id, record in zip(target_ids.tolist(), records.tolist()):
+            row[0] = target_id
+            row[MR_COL], row[MA_COL], row[ME_COL], row[MT_COL], row[MD_COL] = record[:5]
+            writer.writerow(row)
+
+
+def write_truth_csv(file_path, truth):
+    with open(file_path, 'w', newline='') as csvfile:
+        writer = csv.writer(csvfile)
+        writer.writerow(TRUTH_FIELDS)
+        writer.writerows(truth)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate a synthetic multi-target radar scenario.")
+    parser.add_argument('--targets', type=int, default=10)
+    parser.add_argument('--duration', type=float, default=60.0, help="Scenario length (s)")
+    parser.add_argument('--scan-period', type=float, default=1.0, help="Antenna revolution time (s)")
+    parser.add_argument('--no-rotation', action='store_true', help="Report all detections of a scan at once")
+    parser.add_argument('--motion', default='1,0,0', help="Fractions of CV,CA,CT targets, e.g. 0.6,0.2,0.2")
+    parser.add_argument('--geometry', choices=GEOMETRIES, default='random')
+    parser.add_argument('--formation-size', type=int, default=4)
+    parser.add_argument('--pd', type=float, default=0.9, help="Detection probability")
+    parser.add_argument('--clutter', type=float, default=0.0, help="Mean false alarms per scan")
+    parser.add_argument('--sigma-range', type=float, default=10.0)
+    parser.add_argument('--sigma-azimuth', type=float, default=0.1)
+    parser.add_argument('--sigma-elevation', type=float, default=0.1)
+    parser.add_argument('--sigma-doppler', type=float, default=1.0)
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--out', default='scenario', help="Output prefix for <out>.csv, <out>.npy and <out>_truth.csv")
+    parser.add_argument('--udp', default=None, help="Also stream to host:port with the replay sender")
+    parser.add_argument('--speed', type=float, default=1.0, help="Replay speed for --udp, 0 = as fast as possible")
+    args = parser.parse_args()
+
+    config = ScenarioConfig(
+        targets=args.targets, duration=args.duration, scan_period=args.scan_period, rotating=not args.no_rotation,
+        motion_mix=tuple(float(v) for v in args.motion.split(',')), geometry=args.geometry,
+        formation_size=args.formation_size, detection_probability=args.pd, clutter_rate=args.clutter,
+        sigma_range=args.sigma_range, sigma_azimuth=args.sigma_azimuth, sigma_elevation=args.sigma_elevation,
+        sigma_doppler=args.sigma_doppler, seed=args.seed)
+    records, target_ids, truth = generate_scenario(config)
+
+    write_scenario_csv(f'{args.out}.csv', records, target_ids)
+    write_measurement_store(f'{args.out}.npy', records)
+    write_truth_csv(f'{args.out}_truth.csv', truth)
+    print(f"Wrote {len(records)} measurements ({int((target_ids < 0).sum())} clutter) for {args.targets} targets "
+          f"to {args.out}.csv, {args.out}.npy and {args.out}_truth.csv")
+
+    if args.udp:
+        from udpsend import replay_measurements
+        host, port = args.udp.rsplit(':', 1)
+        stats = replay_measurements(records, host, int(port), speed=args.speed)
+        print(f"Streamed {stats.get('measurements_sent', 0)} measurements to {args.udp}")
@@ -0,0 +1,278 @@
+import argparse
+import csv
+import json
+import multiprocessing
+import time
+import numpy as np
+
+from recording import MEASUREMENT_DTYPE, read_measurement_records, scan_boundaries
+from tracker import Tracker, sph2cart
+from tracklog import configure_from_env, get_logger
+
+log = get_logger('shard')
+
+# Per-track summary a sector worker returns after each epoch
+SECTOR_TRACK_DTYPE = np.dtype([
+    ('track_id', '<i4'), ('born', '<f8'), ('state', 'U10'), ('samples', '<i4'), ('last_time', '<f8'),
+    ('azimuth', '<f8'), ('x', '<f8'), ('y', '<f8'), ('z', '<f8'),
+])
+GLOBAL_TRACK_FIELDS = ['Global ID', 'Sector', 'Local ID', 'Current State', 'Samples', 'Last Time', 'X', 'Y', 'Z']
+
+
+def angular_offset(azimuth, center):
+    # Signed difference in degrees, in [-180, 180)
+    return (np.asarray(azimuth) - center + 180.0) % 360.0 - 180.0
+
+
+class Sector:
+    def __init__(self, index, count, margin):
+        self.index = index
+        self.half_width = 180.0 / count
+        self.center = (index + 0.5) * 360.0 / count
+        self.margin = margin
+
+    def covers(self, azimuth):
+        """Azimuths this sector's worker receives: its own sector plus the overlap margins."""
+        return np.abs(angular_offset(azimuth, self.center)) <= self.half_width + self.margin
+
+    def owns(self, azimuth):
+        offset = angular_offset(azimuth, self.center)
+        return (offset >= -self.half_width) & (offset < self.half_width)
+
+
+def summarize_tracks(tracker):
+    rows = []
+    for track in tracker.tracks:
+        last = track['measurements'][-1][0]
+        x, y, z = sph2cart(last[1], last[2], last[0])
+        born = tracker.state_transition_times.get(track['track_id'], {}).get('Poss1', 0.0)
+        rows.append((track['track_id'], born, track['current_state'], len(track['measurements']), last[3],
+                     last[1] % 360.0, x, y, z))
+    return np.array(rows, dtype=SECTOR_TRACK_DTYPE)
+
+
+def _sector_worker(conn, tracker_args, tracker_options):
+    # One Tracker per sector; each message is the sector's measurements for one epoch
+    configure_from_env()
+    tracker = Tracker(*tracker_args, **tracker_options)
+    conn.send('ready')
+    try:
+        while True:
+            records = conn.recv()
+            if records is None:
+                break
+            start = time.perf_counter()
+            if len(records):
+                tracker.process(records.tolist())
+            conn.send((summarize_tracks(tracker), time.perf_counter() - start))
+    finally:
+        tracker.close()
+        conn.close()
+
+
+class ShardedTracker:
+    """Tracks in parallel by azimuth sector, one Tracker process per sector.
+
+    Measurements are routed to every sector whose range, widened by `margin`
+    degrees on each side, contains their azimuth, so a target near a boundary
+    is tracked by both neighbours. Measurements are sent in epochs of
+    `sync_interval` seconds of recording time; after each epoch the coordinator
+    takes each sector's tracks, keeps a track in a margin only if the owning
+    neighbour has nothing within `handover_distance` of it, and gives the kept
+    tracks global ids. A new local track that appears where another sector's
+    track just was inherits that global id, which is the handover.
+    """
+
+    def __init__(self, track_mode, filter_option, association_type, sectors=4, margin=5.0, sync_interval=1.0,
+                 handover_distance=1000.0, max_time_diff=0.050, **tracker_options):
+        self.sectors = [Sector(i, sectors, margin) for i in range(sectors)]
+        self.sync_interval = sync_interval
+        self.handover_distance = handover_distance
+        self.max_time_diff = max_time_diff
+        tracker_options.setdefault('log_file_path', None)
+
+        context = multiprocessing.get_context('spawn')
+        daemon = not tracker_options.get('cluster_workers')  # Daemonic processes cannot start a cluster pool
+        self._connections = []
+        self._workers = []
+        for sector in self.sectors:
+            parent, child = context.Pipe()
+            worker = context.Process(target=_sector_worker, name=f'Sector{sector.index}', daemon=daemon,
+                                     args=(child, (track_mode, filter_option, association_type), tracker_options))
+            worker.start()
+            child.close()
+            self._connections.append(parent)
+            self._workers.append(worker)
+        for connection in self._connections:
+            connection.recv()  # Wait for the imports, so they don't count against the first epoch
+
+        self.global_tracks = []  # Kept tracks after the last epoch, as dicts
+        self._global_ids = {}  # (sector, local track id, born) -> global id
+        self._owners = {}  # global id -> the key currently reporting it
+        self._next_global_id = 0
+        self.epochs = 0
+        self.measurements_routed = np.zeros(sectors, dtype=np.int64)
+        self.sector_busy_s = np.zeros(sectors)
+        self.handovers = 0
+        self.duplicates_suppressed = 0
+
+    def process(self, records):
+        """Track time-ordered MEASUREMENT_DTYPE records; returns the global track list."""
+        records = np.asarray(records, dtype=MEASUREMENT_DTYPE)
+        if not len(records):
+            return self.global_tracks
+        coverage = np.stack([sector.covers(records['ma'] % 360.0) for sector in self.sectors])
+        for start, stop in self._epochs(records['mt']):
+            for k, connection in enumerate(self._connections):
+                selected = records[start:stop][coverage[k, start:stop]]
+                self.measurements_routed[k] += len(selected)
+                connection.send(selected)
+            # All sectors work on the epoch at the same time; gather in sector order
+            replies = [connection.recv() for connection in self._connections]
+            for k, (_, busy) in enumerate(replies):
+                self.sector_busy_s[k] += busy
+            self._resolve([summary for summary, _ in replies])
+            self.epochs += 1
+        return self.global_tracks
+
+    def _epochs(self, times):
+        # Cut only at scan starts (the tracker's grouping rule) so no scan is split between epochs
+        bounds = [0]
+        epoch_start = None
+        for i in scan_boundaries(times, self.max_time_diff):
+            mt = float(times[i])
+            if epoch_start is None:
+                epoch_start = mt
+            elif mt - epoch_start >= self.sync_interval:
+                bounds.append(i)
+                epoch_start = mt
+        bounds.append(len(times))
+        return list(zip(bounds[:-1], bounds[1:]))
+
+    def _resolve(self, summaries):
+        owned = [self.sectors[k].owns(summary['azimuth']) for k, summary in enumerate(summaries)]
+        positions = [np.stack([summary['x'], summary['y'], summary['z']], axis=1) for summary in summaries]
+
+        kept = []
+        for k, summary in enumerate(summaries):
+            for i in range(len(summary)):
+                if not owned[k][i]:
+                    # In the margin: the owning neighbour's track wins if it has one here
+                    owner = next(j for j, sector in enumerate(self.sectors)
+                                 if sector.owns(summary['azimuth'][i]))
+                    candidates = positions[owner][owned[owner]]
+                    if len(candidates) and np.min(np.linalg.norm(candidates - positions[k][i], axis=1)) \
+                            <= self.handover_distance:
+                        self.duplicates_suppressed += 1
+                        continue
+                kept.append((k, summary[i]))
+
+        previous = {track['Global ID']: track for track in self.global_tracks}
+        claimed = set()
+        global_tracks = []
+        new = []
+        for k, row in kept:
+            key = (k, int(row['track_id']), float(row['born']))
+            global_id = self._global_ids.get(key)
+            if global_id is None:
+                new.append((key, k, row))
+                continue
+            if self._owners[global_id] != key:
+                continue  # Handed over; the old sector's copy lingers until it times out
+            claimed.add(global_id)
+            global_tracks.append(self._global_row(global_id, k, row))
+
+        for key, k, row in new:
+            # A track that another sector had at this position last epoch is being handed over
+            position = np.array([row['x'], row['y'], row['z']])
+            best, best_distance = None, self.handover_distance
+            for global_id, track in previous.items():
+                if global_id in claimed or track['Sector'] == k:
+                    continue
+                distance = np.linalg.norm(np.array([track['X'], track['Y'], track['Z']]) - position)
+                if distance <= best_distance:
+                    best, best_distance = global_id, distance
+            if best is not None:
+                self.handovers += 1
+                log.debug("Track %d handed over from sector %d to sector %d", best, previous[best]['Sector'], k)
+                global_id = best
+            else:
+                global_id = self._next_global_id
+                self._next_global_id += 1
+            claimed.add(global_id)
+            self._global_ids[key] = global_id
+            self._owners[global_id] = key
+            global_tracks.append(self._global_row(global_id, k, row))
+
+        global_tracks.sort(key=lambda track: track['Global ID'])
+        self.global_tracks = global_tracks
+
+    @staticmethod
+    def _global_row(global_id, sector, row):
+        return {
+            'Global ID': global_id, 'Sector': sector, 'Local ID': int(row['track_id']),
+            'Current State': str(row['state']), 'Samples': int(row['samples']), 'Last Time': float(row['last_time']),
+            'X': float(row['x']), 'Y': float(row['y']), 'Z': float(row['z']),
+        }
+
+    def stats(self):
+        return {
+            'sectors': len(self.sectors),
+            'epochs': self.epochs,
+            'global_tracks': len(self.global_tracks),
+            'global_ids_issued': self._next_global_id,
+            'handovers': self.handovers,
+            'duplicates_suppressed': self.duplicates_suppressed,
+            'measurements_routed': self.measurements_routed.tolist(),
+            'sector_busy_s': self.sector_busy_s.tolist(),
+        }
+
+    def close(self):
+        for connection in self._connections:
+            connection.send(None)
+        for worker in self._workers:
+            worker.join()
+        for connection in self._connections:
+            connection.close()
+        self._connections = []
+        self._workers = []
+
+
+def write_global_tracks(file_path, tracks):
+    with open(file_path, 'w', newline='') as csvfile:
+        writer = csv.DictWriter(csvfile, fieldnames=GLOBAL_TRACK_FIELDS)
+        writer.writeheader()
+        writer.writerows(tracks)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Track a recording with one tracker process per azimuth sector.")
+    parser.add_argument('file_path', help="CSV recording or .npy measurement store")
+    parser.add_argument('--sectors', type=int, default=multiprocessing.cpu_count())
+    parser.add_argument('--margin', type=float, default=5.0, help="Overlap on each side of a sector (deg)")
+    parser.add_argument('--sync-interval', type=float, default=1.0, help="Recording seconds between coordinator syncs")
+    parser.add_argument('--handover-distance', type=float, default=1000.0, help="m")
+    parser.add_argument('--track-mode', choices=['3-state', '5-state', '7-state'], default='3-state')
+    parser.add_argument('--filter', choices=['CV'], default='CV')
+    parser.add_argument('--association', choices=['JPDA', 'Munkres'], default='JPDA')
+    parser.add_argument('--cluster-workers', type=int, default=0,
+                        help="Processes per sector for large JPDA clusters (default: solve inline)")
+    parser.add_argument('--out', default='sharded_tracks.csv')
+    args = parser.parse_args()
+
+    configure_from_env()
+    records = read_measurement_records(args.file_path)
+    sharded = ShardedTracker(args.track_mode, args.filter, args.association, sectors=args.sectors,
+                             margin=args.margin, sync_interval=args.sync_interval,
+                             handover_distance=args.handover_distance, cluster_workers=args.cluster_workers)
+    start = time.perf_counter()
+    try:
+        tracks = sharded.process(records)
+    finally:
+        sharded.close()
+    elapsed = time.perf_counter() - start
+    write_global_tracks(args.out, tracks)
+    stats = sharded.stats()
+    stats.update({'measurements': len(records), 'elapsed_s': elapsed,
+                  'measurements_per_s': len(records) / elapsed if elapsed > 0 else 0.0})
+    print(json.dumps(stats, indent=2))
@@ -0,0 +1,208 @@
+import multiprocessing
+import time
+import numpy as np
+from multiprocessing import shared_memory
+
+from recording import MEASUREMENT_DTYPE
+
+# Control block at the start of the segment, in uint64 slots. The producer only
+# writes HEAD and its counters, the consumer only TAIL, so no lock is needed;
+# the two indices sit on separate cache lines.
+HEAD = 0
+TAIL = 8
+DROPPED_BATCHES = 16
+DROPPED_MEASUREMENTS = 17
+LATE_MEASUREMENTS = 18
+DATAGRAMS_RECEIVED = 19
+MEASUREMENTS_RECEIVED = 20
+PRODUCER_DONE = 21
+CONTROL_SLOTS = 32
+CONTROL_SIZE = CONTROL_SLOTS * 8
+
+DEFAULT_CAPACITY = 1 << 18  # Measurements, 16 MB
+
+
+class MeasurementRing:
+    """Lock-free single-producer/single-consumer ring of measurement records in shared memory.
+
+    HEAD and TAIL count records ever written and consumed; the producer copies
+    records in and only then publishes them by advancing HEAD, the consumer
+    reads them in place and frees them by advancing TAIL. A batch is written
+    whole or not at all, so scans written in one write() are never split.
+    """
+
+    def __init__(self, shm, capacity, owner):
+        self.shm = shm
+        self.capacity = capacity
+        self.owner = owner
+        self._control = np.ndarray(CONTROL_SLOTS, dtype=np.uint64, buffer=shm.buf)
+        self.records = np.ndarray(capacity, dtype=MEASUREMENT_DTYPE, buffer=shm.buf, offset=CONTROL_SIZE)
+
+    @classmethod
+    def create(cls, capacity=DEFAULT_CAPACITY):
+        shm = shared_memory.SharedMemory(create=True, size=CONTROL_SIZE + capacity * MEASUREMENT_DTYPE.itemsize)
+        ring = cls(shm, capacity, owner=True)
+        ring._control[:] = 0
+        return ring
+
+    @classmethod
+    def attach(cls, name, capacity):
+        return cls(shared_memory.SharedMemory(name=name), capacity, owner=False)
+
+    @property
+    def name(self):
+        return self.shm.name
+
+    def __len__(self):
+        return int(self._control[HEAD]) - int(self._control[TAIL])
+
+    # Producer side
+    def write(self, records):
+        """Append records; returns False (and counts the drop) if they do not fit."""
+        n = len(records)
+        head = int(self._control[HEAD])
+        if n > self.capacity - (head - int(self._control[TAIL])):
+            self._control[DROPPED_BATCHES] += 1
+            self._control[DROPPED_MEASUREMENTS] += n
+            return False
+        start = head % self.capacity
+        first = min(n, self.capacity - start)
+        self.records[start:start + first] = records[:first]
+        if first < n:
+            self.records[:n - first] = records[first:]
+        self._control[HEAD] = head + n
+        return True
+
+    def set_counter(self, slot, value):
+        self._control[slot] = value
+
+    # Consumer side
+    def peek(self):
+        """Everything written and not yet released, or None.
+
+        Returns a view on the shared segment, valid until release(); only a read
+        that wraps around the end of the ring is copied.
+        """
+        tail = int(self._control[TAIL])
+        n = int(self._control[HEAD]) - tail
+        if not n:
+            return None
+        start = tail % self.capacity
+        if start + n <= self.capacity:
+            return self.records[start:start + n]
+        return np.concatenate((self.records[start:], self.records[:start + n - self.capacity]))
+
+    def release(self, n):
+        self._control[TAIL] = int(self._control[TAIL]) + n
+
+    def counter(self, slot):
+        return int(self._control[slot])
+
+    def close(self):
+        # Drop our views before closing the mapping
+        self._control = None
+        self.records = None
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+
+def _ingest_process_main(ring_name, capacity, sensors, ingest_options, ready_event, stop_event):
+    # Runs in the receiver process: UDP sockets, parsing and reordering, then complete scans into the ring
+    from ingest import MultiSensorIngest
+
+    ring = MeasurementRing.attach(ring_name, capacity)
+    ingest = MultiSensorIngest(sensors, **ingest_options)
+    ingest.start()
+    ready_event.set()
+
+    def publish(scans):
+        if scans is not None:
+            ring.write(scans[1])
+        stats = ingest.stats()
+        ring.set_counter(LATE_MEASUREMENTS, stats['late_measurements'])
+        ring.set_counter(DATAGRAMS_RECEIVED, stats['datagrams_received'])
+        ring.set_counter(MEASUREMENTS_RECEIVED, stats['measurements_received'])
+
+    try:
+        while not stop_event.is_set():
+            publish(ingest.get_scans(timeout=0.1))
+    finally:
+        ingest.stop()
+        publish(ingest.buffer.flush())
+        ring.set_counter(PRODUCER_DONE, 1)
+        ring.close()
+
+
+class RingIngestProcess:
+    """Multi-sensor UDP ingest in its own process, feeding the tracker through a MeasurementRing.
+
+    Reading sockets, parsing and reordering never wait on the tracker's or the
+    GUI's GIL. The consumer calls read() for the time-ordered scans written so
+    far and release() once it is done with them.
+    """
+
+    def __init__(self, sensors, capacity=DEFAULT_CAPACITY, poll_interval=0.001, **ingest_options):
+        self.sensors = dict(sensors)
+        self.capacity = capacity
+        self.poll_interval = poll_interval
+        self.ingest_options = ingest_options
+        self.ring = None
+        self._process = None
+        self._context = multiprocessing.get_context('spawn')  # Never fork a process holding Qt
+        self._ready = self._context.Event()
+        self._stop = self._context.Event()
+
+    def start(self, timeout=60.0):
+        """Start the receiver process and wait until its sockets are bound."""
+        self.ring = MeasurementRing.create(self.capacity)
+        self._ready.clear()
+        self._stop.clear()
+        self._process = self._context.Process(
+            target=_ingest_process_main, name='RingIngest',
+            args=(self.ring.name, self.capacity, self.sensors, self.ingest_options, self._ready, self._stop),
+            daemon=True)
+        self._process.start()
+        while not self._ready.wait(0.1):
+            if not self._process.is_alive() or timeout <= 0:
+                self.stop()
+                self.close()
+                raise RuntimeError("UDP receiver process failed to start")
+            timeout -= 0.1
+
+    def read(self, timeout=None):
+        """Return the pending records (a view on shared memory), or None after `timeout` seconds."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            records = self.ring.peek()
+            if records is not None:
+                return records
+            if deadline is not None and time.monotonic() >= deadline:
+                return None
+            time.sleep(self.poll_interval)
+
+    def release(self, n):
+        self.ring.release(n)
+
+    def stop(self):
+        # The receiver process flushes its reorder buffer into the ring before exiting
+        self._stop.set()
+        if self._process is not None:
+            self._process.join()
+            self._process = None
+
+    def close(self):
+        if self.ring is not None:
+            self.ring.close()
+            self.ring = None
+
+    def stats(self):
+        ring = self.ring
+        return {
+            'datagrams_received': ring.counter(DATAGRAMS_RECEIVED),
+            'measurements_received': ring.counter(MEASUREMENTS_RECEIVED),
+            'late_measurements': ring.counter(LATE_MEASUREMENTS),
+            'ring_dropped_batches': ring.counter(DROPPED_BATCHES),
+            'ring_dropped_measurements': ring.counter(DROPPED_MEASUREMENTS),
+            'ring_pending': len(ring),
+        }
@@ -0,0 +1,183 @@
+import numpy as np
+from multiprocessing import shared_memory
+
+from track_store import MEASUREMENT_FIELDS, TRACK_STATES, state_code
+from tracklog import get_logger
+
+log = get_logger('snapshot')
+
+# Control block, uint64 slots. The layout parameters are stored here so a
+# reader in another process only needs the segment name.
+LAYOUT_VERSION = 1
+VERSION = 0
+MAX_TRACKS = 1
+HISTORY = 2
+CURRENT = 3  # Index of the buffer holding the latest complete snapshot
+PUBLISHED = 4  # Snapshots published so far
+CONTROL_SLOTS = 8
+CONTROL_SIZE = CONTROL_SLOTS * 8
+
+DEFAULT_MAX_TRACKS = 1024
+DEFAULT_HISTORY = 64  # Most recent samples kept per track
+
+HEADER_FIELDS = ('sequence', 'scan_time', 'count', 'truncated')
+TRACK_FIELDS = ('track_id', 'state', 'samples', 'history_len', 'position', 'velocity',
+                'history_measurements', 'history_state', 'history_filtered')
+
+
+def snapshot_dtype(max_tracks, history):
+    """One snapshot buffer: fixed-size per-track arrays, filled up to `count`."""
+    return np.dtype([
+        ('sequence', '<u8'),  # Odd while the writer is filling the buffer
+        ('scan_time', '<f8'),
+        ('count', '<u4'),
+        ('truncated', '<u4'),  # Active tracks that did not fit
+        ('track_id', '<i4', (max_tracks,)),
+        ('state', 'u1', (max_tracks,)),
+        ('samples', '<u4', (max_tracks,)),
+        ('history_len', '<u2', (max_tracks,)),
+        ('position', '<f8', (max_tracks, 3)),
+        ('velocity', '<f8', (max_tracks, 3)),
+        ('history_measurements', '<f8', (max_tracks, history, MEASUREMENT_FIELDS)),
+        ('history_state', 'u1', (max_tracks, history)),
+        ('history_filtered', '<f8', (max_tracks, history, 6)),
+    ])
+
+
+class _SnapshotSegment:
+    def __init__(self, shm, max_tracks, history, owner):
+        self.shm = shm
+        self.owner = owner
+        self.max_tracks = max_tracks
+        self.history = history
+        self.control = np.ndarray(CONTROL_SLOTS, dtype=np.uint64, buffer=shm.buf)
+        self.buffers = np.ndarray(2, dtype=snapshot_dtype(max_tracks, history), buffer=shm.buf, offset=CONTROL_SIZE)
+
+    @property
+    def name(self):
+        return self.shm.name
+
+    def close(self):
+        self.control = None
+        self.buffers = None
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+
+class SnapshotWriter(_SnapshotSegment):
+    """Publishes a fixed-layout picture of the active tracks into double-buffered shared memory.
+
+    Each publish() fills the buffer readers are not pointed at and then flips
+    CURRENT, so the cost depends on max_tracks and history, never on how long
+    the tracker has been running. Tracks beyond max_tracks are left out of the
+    snapshot; they are counted in stats() and logged when the overflow grows.
+    """
+
+    def __init__(self, max_tracks=DEFAULT_MAX_TRACKS, history=DEFAULT_HISTORY):
+        size = CONTROL_SIZE + 2 * snapshot_dtype(max_tracks, history).itemsize
+        super().__init__(shared_memory.SharedMemory(create=True, size=size), max_tracks, history, owner=True)
+        self.control[:] = 0
+        self.control[VERSION] = LAYOUT_VERSION
+        self.control[MAX_TRACKS] = max_tracks
+        self.control[HISTORY] = history
+        self.truncated_snapshots = 0
+        self.max_truncated = 0
+
+    def publish(self, tracks, scan_time=0.0):
+        index = 1 - int(self.control[CURRENT])
+        buffer = self.buffers[index]
+        sequence = int(buffer['sequence']) + 1
+        buffer['sequence'] = sequence  # Odd: being written
+
+        count = min(len(tracks), self.max_tracks)
+        for i, track in enumerate(tracks[:count]):
+            tail = track['measurements'][-self.history:]
+            filtered = track['Sf'][-len(tail):]
+            n = len(tail)
+            buffer['track_id'][i] = track['track_id']
+            buffer['state'][i] = state_code(track.get('current_state'))
+            buffer['samples'][i] = len(track['measurements'])
+            buffer['history_len'][i] = n
+            buffer['history_measurements'][i, :n] = [m[0][:MEASUREMENT_FIELDS] for m in tail]
+            buffer['history_state'][i, :n] = [state_code(m[1]) for m in tail]
+            buffer['history_filtered'][i, :len(filtered)] = np.asarray(filtered)[:, :, 0]
+            buffer['position'][i] = track['Sf'][-1][:3, 0]
+            buffer['velocity'][i] = track['Sf'][-1][3:6, 0]
+        buffer['count'] = count
+        buffer['truncated'] = truncated = len(tracks) - count
+        if truncated:
+            self.truncated_snapshots += 1
+            if truncated > self.max_truncated:
+                log.warning("Snapshot holds %d tracks; %d active tracks left out", self.max_tracks, truncated)
+                self.max_truncated = truncated
+        buffer['scan_time'] = scan_time
+
+        buffer['sequence'] = sequence + 1  # Even: complete
+        self.control[CURRENT] = index
+        self.control[PUBLISHED] += 1
+
+    def stats(self):
+        return {
+            'snapshots_published': int(self.control[PUBLISHED]),
+            'truncated_snapshots': self.truncated_snapshots,
+            'max_tracks_left_out': self.max_truncated,
+        }
+
+
+class SnapshotReader(_SnapshotSegment):
+    """Maps a SnapshotWriter's segment by name, from this or any other process."""
+
+    def __init__(self, name):
+        shm = shared_memory.SharedMemory(name=name)
+        control = np.ndarray(CONTROL_SLOTS, dtype=np.uint64, buffer=shm.buf)
+        if int(control[VERSION]) != LAYOUT_VERSION:
+            shm.close()
+            raise ValueError(f"unsupported snapshot layout {int(control[VERSION])}")
+        max_tracks, history = int(control[MAX_TRACKS]), int(control[HISTORY])
+        del control
+        super().__init__(shm, max_tracks, history, owner=False)
+        self.last_published = 0
+
+    def read(self, only_new=True):
+        """Return a private copy of the latest snapshot, or None if nothing new was published.
+
+        The snapshot is a dict of the header values and the per-track arrays cut
+        to the `count` tracks in use, so a frame copies only what is published.
+        If the writer lapped the buffer while it was being copied the read is
+        retried.
+        """
+        while True:
+            published = int(self.control[PUBLISHED])
+            if not published or (only_new and published == self.last_published):
+                return None
+            buffer = self.buffers[int(self.control[CURRENT])]
+            sequence = int(buffer['sequence'])
+            count = min(int(buffer['count']), self.max_tracks)
+            snapshot = {name: buffer[name].item() for name in HEADER_FIELDS}
+            snapshot.update((name, buffer[name][:count].copy()) for name in TRACK_FIELDS)
+            if sequence % 2 == 0 and int(buffer['sequence']) == sequence:
+                snapshot['count'] = count
+                self.last_published = published
+                return snapshot
+
+
+def tracks_from_snapshot(snapshot):
+    """Track dicts over the history tail of a snapshot, in the shape the GUI plots expect."""
+    tracks = []
+    for i in range(int(snapshot['count'])):
+        n = int(snapshot['history_len'][i])
+        measurements = snapshot['history_measurements'][i, :n]
+        states = snapshot['history_state'][i, :n].tolist()
+        filtered = snapshot['history_filtered'][i, :n]
+        tracks.append({
+            'track_id': int(snapshot['track_id'][i]),
+            'current_state': TRACK_STATES[snapshot['state'][i]],
+            'samples': int(snapshot['samples'][i]),
+            'measurements': [(tuple(row), TRACK_STATES[state]) for row, state in zip(measurements.tolist(), states)],
+            'Sf': [state[:, None] for state in filtered],
+            'Sp': [],
+            'Pp': [],
+            'Pf': [],
+        })
+    return tracks
@@ -0,0 +1,63 @@
+import argparse
+import socket
+
+from track_store import TRACK_STATES
+from track_stream import EVENT_DROPPED, EVENT_NAMES, SEQUENCE_MODULO, TrackStreamError, decode_track_datagram
+
+# Reference consumer for the tracker's binary track output stream (see track_stream.py).
+# Keeps the current picture of all tracks up to date from the per-scan deltas.
+
+
+def apply_updates(picture, updates):
+    for update in updates:
+        track_id = int(update['track_id'])
+        if update['event'] == EVENT_DROPPED:
+            picture.pop(track_id, None)
+        else:
+            picture[track_id] = update.copy()
+
+
+def consume(port, host='0.0.0.0', quiet=False):
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.bind((host, port))
+    buffer = bytearray(65535)
+    picture = {}
+    expected = {}
+    lost = 0
+    print(f"Listening for track updates on {host}:{port}")
+    try:
+        while True:
+            size = sock.recv_into(buffer)
+            try:
+                source_id, sequence, scan_time, updates = decode_track_datagram(memoryview(buffer)[:size])
+            except TrackStreamError as e:
+                print(f"Bad datagram: {e}")
+                continue
+            if source_id in expected and sequence != expected[source_id]:
+                lost += (sequence - expected[source_id]) % SEQUENCE_MODULO
+                print(f"Lost datagrams from source {source_id}, total {lost}")
+            expected[source_id] = (sequence + 1) % SEQUENCE_MODULO
+
+            apply_updates(picture, updates)
+            if quiet:
+                continue
+            print(f"Scan {scan_time:.3f}: {len(updates)} updates, {len(picture)} tracks")
+            for update in updates:
+                print(f"  {EVENT_NAMES.get(int(update['event']), '?'):8s} track {update['track_id']:4d} "
+                      f"{TRACK_STATES[update['state']] if update['state'] < len(TRACK_STATES) else '?':10s} "
+                      f"pos=({update['x']:.1f}, {update['y']:.1f}, {update['z']:.1f}) "
+                      f"vel=({update['vx']:.1f}, {update['vy']:.1f}, {update['vz']:.1f})")
+    except KeyboardInterrupt:
+        pass
+    finally:
+        sock.close()
+    return picture
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Print the tracker's binary track update stream.")
+    parser.add_argument('--host', default='0.0.0.0')
+    parser.add_argument('--port', type=int, default=5010)
+    parser.add_argument('--quiet', action='store_true', help="Only report lost datagrams")
+    args = parser.parse_args()
+    consume(args.port, args.host, args.quiet)
@@ -0,0 +1,559 @@
+import matplotlib
+import numpy as np
+from matplotlib.cm import ScalarMappable
+from matplotlib.colors import Normalize
+from matplotlib.lines import Line2D
+from scipy.spatial import cKDTree
+
+from tracker import sph2cart
+
+# Time plots show one measurement column (and the matching Sf component) against time
+TIME_PLOTS = {"Range vs Time": 0, "Azimuth vs Time": 1, "Elevation vs Time": 2}
+TIME_PLOT_LABELS = {0: 'X Coordinate', 1: 'Y Coordinate', 2: 'Z Coordinate'}
+ALL_MODES = ["Range vs Time", "Azimuth vs Time", "PPI", "RHI"]
+SF_START = 2  # Sf is plotted from the third sample on
+
+
+class MinMaxPyramid:
+    """Min/max decimation levels of one time series.
+
+    Level k keeps the samples holding the smallest and the largest value of
+    every block of 2**k samples, so a level drawn at about one block per pixel
+    column is indistinguishable from the full series. Built in O(n) numpy
+    passes; x must be sorted (sample times are).
+    """
+
+    def __init__(self, x, y, samples):
+        self.x = x
+        self.y = y
+        self.samples = samples
+        self.size = len(x)
+        self.levels = [np.arange(self.size)]
+        low = high = self.levels[0]
+        while len(low) > 1:
+            pairs = len(low) // 2 * 2
+            next_low = np.where(y[low[1:pairs:2]] < y[low[:pairs:2]], low[1:pairs:2], low[:pairs:2])
+            next_high = np.where(y[high[1:pairs:2]] > y[high[:pairs:2]], high[1:pairs:2], high[:pairs:2])
+            if pairs < len(low):  # An odd last block moves up as it is
+                next_low = np.append(next_low, low[-1])
+                next_high = np.append(next_high, high[-1])
+            low, high = next_low, next_high
+            # The first and last samples are kept so every level spans the whole series
+            self.levels.append(np.unique(np.concatenate((low, high, [0, self.size - 1]))))
+
+    def view(self, x0, x1, max_points):
+        """(x, y, samples) of the finest level in [x0, x1] (plus one either side) that fits in max_points."""
+        lo, hi = np.searchsorted(self.x, [x0, x1])
+        lo, hi = max(lo - 1, 0), min(hi + 1, self.size)
+        level = 0
+        while level + 1 < len(self.levels) and 2 * (hi - lo) >> level > max_points:
+            level += 1
+        indices = self.levels[level]
+        indices = indices[np.searchsorted(indices, lo):np.searchsorted(indices, hi)]
+        return self.x[indices], self.y[indices], self.samples[indices]
+
+
+class PlotHistory:
+    """Plot data of one track, grown in place as new samples arrive."""
+
+    def __init__(self, track_id):
+        self.track_id = track_id
+        self.samples = 0  # Samples of the track accounted for, including any that were never received
+        self.size = 0
+        self._measurements = np.empty((64, 5))
+        self._filtered = np.empty((64, 6))
+        self._cartesian = np.empty((64, 3))
+        self._pyramids = {}
+        self.source = None  # Latest track dict, for the values only it holds (Sp, Pf)
+
+    @property
+    def measurements(self):
+        return self._measurements[:self.size]
+
+    @property
+    def filtered(self):
+        return self._filtered[:self.size]
+
+    @property
+    def cartesian(self):
+        return self._cartesian[:self.size]
+
+    def extend(self, track):
+        """Append the samples of `track` not seen yet; returns how many were added.
+
+        Live snapshots only carry the tail of each track, so the history kept
+        here is the only full copy on the GUI side.
+        """
+        self.source = track
+        samples = track.get('samples', len(track['measurements']))
+        new = min(samples - self.samples, len(track['measurements']))
+        self.samples = samples
+        if new <= 0:
+            return 0
+        if self.size + new > len(self._measurements):
+            capacity = max(2 * len(self._measurements), self.size + new)
+            for name in ('_measurements', '_filtered', '_cartesian'):
+                grown = np.empty((capacity,) + getattr(self, name).shape[1:])
+                grown[:self.size] = getattr(self, name)[:self.size]
+                setattr(self, name, grown)
+        end = self.size + new
+        measurements = np.array([m[0][:5] for m in track['measurements'][-new:]], dtype=float)
+        self._measurements[self.size:end] = measurements
+        self._filtered[self.size:end] = np.asarray(track['Sf'][-new:], dtype=float)[:, :6, 0]
+        mr, ma, me = measurements[:, :3].T
+        self._cartesian[self.size:end] = np.column_stack(sph2cart(ma, me, mr))
+        self.size = end
+        return new
+
+    def pyramid(self, name, x, y, samples):
+        """Decimation pyramid of the series `name`, rebuilt only when the track has grown."""
+        pyramid = self._pyramids.get(name)
+        if pyramid is None or pyramid.size != len(x):
+            pyramid = self._pyramids[name] = MinMaxPyramid(x, y, samples)
+        return pyramid
+
+    def source_value(self, key, sample):
+        """Entry `sample` of the source track's `key` list, or None if the source does not hold it."""
+        values = self.source.get(key, []) if self.source is not None else []
+        index = sample - (self.size - len(values))
+        if self.size != self.samples or not 0 <= index < len(values):
+            return None  # Live snapshots carry no Sp/Pf, and a history with gaps cannot be aligned
+        return values[index]
+
+
+def _time_series(column):
+    def measurement(history, start):
+        return history.measurements[start:, 3], history.measurements[start:, column], np.arange(start, history.size)
+
+    def filtered(history, start):
+        start = max(start, SF_START)
+        return history.measurements[start:, 3], history.filtered[start:, column], np.arange(start, history.size)
+    return measurement, filtered
+
+
+def _ppi(history, start):
+    return history.cartesian[start:, 0], history.cartesian[start:, 1], np.arange(start, history.size)
+
+
+def _rhi(history, start):
+    return history.cartesian[start:, 0], history.cartesian[start:, 2], np.arange(start, history.size)
+
+
+def plot_series(plot_type):
+    """(name, data function, line style) of each series drawn for every track on a plot.
+
+    A data function returns the x, y and sample numbers of a track's samples from `start` on.
+    """
+    if plot_type in TIME_PLOTS:
+        coordinate = 'XYZ'[TIME_PLOTS[plot_type]]
+        measurement, filtered = _time_series(TIME_PLOTS[plot_type])
+        return [(f'Measurement {coordinate}', measurement, {'marker': 'o', 'linestyle': 'none'}),
+                (f'Sf {coordinate}', filtered, {'marker': '+', 'linestyle': 'none'})]
+    if plot_type == "PPI":
+        return [('PPI', _ppi, {'marker': 'o', 'linestyle': '-'})]
+    return [('RHI', _rhi, {'linestyle': '--'})]
+
+
+def decorate_axes(ax, plot_type):
+    if plot_type in TIME_PLOTS:
+        ax.set_xlabel('Time')
+        ax.set_ylabel(TIME_PLOT_LABELS[TIME_PLOTS[plot_type]])
+        ax.set_title(f'Tracks {plot_type}')
+    elif plot_type == "PPI":
+        ax.set_xlabel("X Coordinate")
+        ax.set_ylabel("Y Coordinate")
+        ax.set_title("PPI Plot (360°)")
+    else:
+        ax.set_xlabel("X Coordinate")
+        ax.set_ylabel("Z Coordinate")
+        ax.set_title("RHI Plot")
+
+
+def _pixel_runs(display):
+    """Mask of the line vertices to keep when consecutive vertices in the same display pixel are merged.
+
+    The first vertex of every run is kept, so a line loses under a pixel of
+    detail; NaN gaps, and the vertices next to them, always survive.
+    """
+    cells = np.floor(display)
+    keep = np.ones(len(cells), dtype=bool)
+    finite = np.isfinite(cells).all(axis=1)
+    keep[1:] = (cells[1:] != cells[:-1]).any(axis=1) | ~finite[1:] | ~finite[:-1]
+    return keep
+
+
+def _pixel_points(display):
+    """Mask keeping the last point in each display pixel; drawn as single pixels, the others would not show."""
+    cells = np.floor(display)
+    finite = np.isfinite(cells).all(axis=1)
+    keep = np.zeros(len(cells), dtype=bool)
+    if finite.any():
+        cells = cells[finite].astype(np.int64)
+        cells -= cells.min(axis=0)
+        _, last = np.unique((cells[:, 0] * (cells[:, 1].max() + 1) + cells[:, 1])[::-1], return_index=True)
+        keep[np.flatnonzero(finite)[::-1][last]] = True
+    return keep
+
+
+def _joined(xs, ys):
+    # Series of several tracks as one xy array, with a NaN row between tracks so lines do not connect them.
+    # Also returns which rows are samples rather than gaps
+    lengths = np.array([len(x) for x in xs])
+    samples_rows = np.ones(lengths.sum() + len(lengths) - 1, dtype=bool)
+    samples_rows[np.cumsum(lengths + 1)[:-1] - 1] = False
+    xy = np.full((len(samples_rows), 2), np.nan)
+    xy[samples_rows, 0] = np.concatenate(xs)
+    xy[samples_rows, 1] = np.concatenate(ys)
+    return xy, samples_rows
+
+
+class TrackPlotRenderer:
+    """Draws the track plots into one figure, keeping the artists between refreshes.
+
+    Up to `collection_threshold` plotted tracks, every track has one Line2D per
+    series with its own legend entry. Above that the tracks are coloured by id
+    through `cmap`, quantised to `levels` colours with a colour bar as the key,
+    and each series holds one Line2D per colour with all of that colour's
+    tracks separated by NaN gaps. Thousands of per-track artists and legend
+    entries take seconds to create, so this keeps a full draw to a few dozen
+    artists. Agg's cost is then in the pixels it paints, so collected series
+    drop their glyph markers: point series (the time plots) are drawn as
+    single pixels, keeping only the point drawn last in each pixel across all
+    the colours of the axes, and line series (PPI, RHI) as plain
+    `collected_linewidth` lines with consecutive vertices in the same pixel
+    merged. Both are redone for the view on every zoom, pan or resize.
+
+    The axes, labels and legend or colour bar are the static layer and are only
+    rebuilt when the plot type, the selection or the set of plotted tracks
+    changes, or when new data leaves the current limits. Otherwise a refresh
+    restores the last frame and blits just the samples added since, so it costs
+    time in the new points, not in the length of the tracks.
+
+    Time plot series longer than `lod_min_points` are drawn from a
+    MinMaxPyramid level chosen for the visible time range and the axes' width
+    in pixels; zooming or panning with the toolbar re-selects the level on the
+    next draw, so hours-long tracks stay interactive.
+
+    Hovering shows the sample under the mouse, found in a KD-tree over the
+    display coordinates of the points actually drawn, each mapped to its
+    (track id, sample number).
+    """
+
+    def __init__(self, canvas, headroom=0.0, collection_threshold=50, cmap='turbo', levels=32, collected_linewidth=0.8,
+                 points_per_pixel=2, lod_min_points=1000, pick_radius=5):
+        self.canvas = canvas
+        self.figure = canvas.figure
+        self.headroom = headroom  # Extra fraction of the data span added to the limits on a rebuild
+        self.collection_threshold = collection_threshold
+        self.key_cmap = matplotlib.colormaps[cmap].resampled(levels)
+        self.levels = levels
+        self.collected_linewidth = collected_linewidth
+        self.points_per_pixel = points_per_pixel
+        self.lod_min_points = lod_min_points  # Shorter series are always drawn in full
+        self.pick_radius = pick_radius  # Pixels
+        self.histories = {}
+        self.plot_type = None
+        self.axes = []  # (ax, plot_type, series)
+        self.groups = {}  # Group key (track id, or colour level when collected) -> plotted track ids
+        self.track_group = {}
+        self.colors = {}  # Group key -> colour
+        self.artists = {}  # (axes index, series name, group key) -> Line2D
+        self.plotted_ids = []
+        self.collected = False
+        self._stale = set()  # Groups whose artists lag behind the histories until the next full draw
+        self._background = None
+        self._pick = {}  # (axes index, series name, group key) -> (data xy, track ids, sample numbers) as drawn
+        self._trees = {}  # Axes index -> (KD-tree over display coordinates, data xy, track ids, sample numbers)
+        self._hover = None  # (axes index, track id, sample number, data xy) under the mouse
+        self.rebuilds = 0
+        self.canvas.mpl_connect('draw_event', self._on_draw)
+        self.canvas.mpl_connect('motion_notify_event', self._on_motion)
+        self.canvas.mpl_connect('resize_event', self._on_view_changed)
+
+    def reset(self):
+        """Forget all track histories, e.g. before plotting a new run."""
+        self.histories = {}
+        self.plotted_ids = []
+        self._clear()
+
+    def _clear(self):
+        self.figure.clear()
+        self.axes = []
+        self.groups = {}
+        self.track_group = {}
+        self.colors = {}
+        self.artists = {}
+        self.plot_type = None
+        self._stale = set()
+        self._background = None
+        self._pick = {}
+        self._trees = {}
+        self._hover = None
+
+    def update(self, tracks, selected_track_ids, plot_type):
+        """Bring the figure up to date with `tracks`; only selected tracks are drawn."""
+        new_samples = {}
+        rebuild = plot_type != self.plot_type
+        for track in tracks:
+            track_id = track['track_id']
+            history = self.histories.get(track_id)
+            if history is None or track.get('samples', len(track['measurements'])) < history.samples:
+                # New track, or the id now belongs to a different track
+                history = self.histories[track_id] = PlotHistory(track_id)
+                rebuild = True
+            before = history.size
+            if history.extend(track):
+                new_samples[track_id] = before
+
+        plotted_ids = [track['track_id'] for track in tracks if track['track_id'] in selected_track_ids]
+        if plotted_ids != self.plotted_ids or (len(plotted_ids) > self.collection_threshold) != self.collected:
+            rebuild = True
+        self.plotted_ids = plotted_ids
+
+        if rebuild:
+            self._rebuild(plot_type)
+        elif not self._refresh(new_samples):
+            self._rescale()
+
+    def _group_tracks(self):
+        self.collected = len(self.plotted_ids) > self.collection_threshold
+        if self.collected:
+            self.norm = Normalize(min(self.plotted_ids), max(self.plotted_ids))
+            levels = np.minimum((self.norm(self.plotted_ids) * self.levels).astype(int), self.levels - 1)
+            self.track_group = dict(zip(self.plotted_ids, levels.tolist()))
+            self.colors = {level: self.key_cmap(level) for level in set(self.track_group.values())}
+        else:
+            cycle = matplotlib.rcParams['axes.prop_cycle'].by_key()['color']
+            self.track_group = {track_id: track_id for track_id in self.plotted_ids}
+            self.colors = {track_id: cycle[i % len(cycle)] for i, track_id in enumerate(self.plotted_ids)}
+        self.groups = {}
+        for track_id, group in self.track_group.items():
+            self.groups.setdefault(group, []).append(track_id)
+
+    def _style(self, style):
+        # Glyph markers and dashes dominate Agg draw time once thousands of tracks are collected
+        if not self.collected:
+            return style
+        if style.get('linestyle', '-') == 'none':
+            return {'marker': ',', 'linestyle': 'none'}
+        return {'linestyle': '-', 'marker': 'None', 'linewidth': self.collected_linewidth}
+
+    def _rebuild(self, plot_type):
+        self._clear()
+        self.plot_type = plot_type
+        self._group_tracks()
+        plot_types = ALL_MODES if plot_type == "All Modes" else [plot_type]
+        axes = self.figure.subplots(2, 2).flat if len(plot_types) > 1 else [self.figure.subplots()]
+        for index, (ax, axes_plot_type) in enumerate(zip(axes, plot_types)):
+            series = plot_series(axes_plot_type)
+            self.axes.append((ax, axes_plot_type, series))
+            decorate_axes(ax, axes_plot_type)
+            if axes_plot_type in TIME_PLOTS or self.collected:
+                # Decimation depends on the view: time plots pick a pyramid level, collected plots merge pixels
+                ax.callbacks.connect('xlim_changed', self._on_view_changed)
+                ax.callbacks.connect('ylim_changed', self._on_view_changed)
+            for group in self.groups:
+                for name, _, style in series:
+                    label = f'_{name}' if self.collected else f'Track {group} {name}'
+                    line = Line2D([], [], color=self.colors[group], label=label, animated=True, **self._style(style))
+                    ax.add_line(line)
+                    self.artists[(index, name, group)] = line
+            if not self.collected and self.plotted_ids:
+                ax.legend()
+        if self.collected:
+            # One key for all the axes; every colour bar is a full axes to draw
+            self.figure.colorbar(ScalarMappable(self.norm, self.key_cmap), ax=[ax for ax, _, _ in self.axes],
+                                 label='Track ID')
+        if len(plot_types) > 1:
+            self.figure.tight_layout()
+        self._stale = set(self.groups)
+        self._rescale()
+        self.rebuilds += 1
+
+    def _series_data(self, index, name, data, history, full_range):
+        x, y, samples = data(history, 0)
+        ax, plot_type, _ = self.axes[index]
+        if plot_type not in TIME_PLOTS or len(x) <= self.lod_min_points:
+            return x, y, samples
+        # Long time series are drawn from the decimation level matching the view and the axes' pixel width
+        x0, x1 = (-np.inf, np.inf) if full_range else sorted(ax.get_xlim())
+        return history.pyramid(name, x, y, samples).view(x0, x1, int(self.points_per_pixel * ax.bbox.width))
+
+    def _sync_artists(self, full_range=False):
+        if not self._stale:
+            return
+        self._trees = {}
+        merge = self.collected and not full_range
+        if merge:
+            # Points are merged across every colour of an axes, so a collected view is redone as a whole
+            self._stale = set(self.groups)
+        synced = {}
+        for group in self._stale:
+            for index, (_, _, series) in enumerate(self.axes):
+                for name, data, _ in series:
+                    xs, ys, samples = zip(*(self._series_data(index, name, data, self.histories[track_id], full_range)
+                                            for track_id in self.groups[group]))
+                    xy, samples_rows = _joined(xs, ys)
+                    track_ids = np.repeat(self.groups[group], [len(x) for x in xs])
+                    synced[(index, name, group)] = (xy, samples_rows, (
+                        xy[samples_rows], track_ids, np.concatenate(samples)))
+        if merge:
+            self._merge_pixels(synced)
+        for key, (xy, _, pick) in synced.items():
+            self.artists[key].set_data(xy[:, 0], xy[:, 1])
+            # What each drawn point is, for the hover index
+            self._pick[key] = pick
+        self._stale = set()
+
+    def _merge_pixels(self, synced):
+        # The limits come from the full data, so merging only happens for the view being drawn
+        for index, (ax, _, series) in enumerate(self.axes):
+            points = {name for name, _, style in series if self._style(style)['linestyle'] == 'none'}
+            displays = {key: ax.transData.transform(synced[key][0]) for key in self.artists if key[0] == index}
+            keeps = {key: _pixel_runs(display) for key, display in displays.items() if key[1] not in points}
+            # In drawing order, so the points kept are the ones that end up on top
+            point_keys = [key for key in displays if key[1] in points]
+            if point_keys:
+                keep = _pixel_points(np.concatenate([displays[key] for key in point_keys]))
+                splits = np.cumsum([len(displays[key]) for key in point_keys])[:-1]
+                keeps.update(zip(point_keys, np.split(keep, splits)))
+            for key, keep in keeps.items():
+                xy, samples_rows, pick = synced[key]
+                drawn = keep[samples_rows]
+                synced[key] = xy[keep], samples_rows[keep], tuple(values[drawn] for values in pick)
+
+    def _on_view_changed(self, *args):
+        # Zooming, panning or resizing re-decimates on the draw that follows
+        self._stale = set(self.groups)
+
+    def _rescale(self):
+        # Limits follow the data only here, so a live plot does not rescale every frame.
+        # The limits come from the whole series; the draw then narrows the data to the view
+        self._stale = set(self.groups)
+        self._sync_artists(full_range=True)
+        self._stale = set(self.groups)
+        for ax, _, _ in self.axes:
+            ax.relim()
+            ax.autoscale_view()
+            if self.headroom:
+                for get, set_ in ((ax.get_xlim, ax.set_xlim), (ax.get_ylim, ax.set_ylim)):
+                    low, high = get()
+                    extra = (high - low) * self.headroom
+                    set_(low - extra, high + extra, auto=None)
+        self.canvas.draw()
+
+    def _on_draw(self, event):
+        # Any full draw (rebuild, resize, zoom) repaints the dynamic layer and keeps the result as the background
+        self._sync_artists()
+        for (index, _, _), artist in self.artists.items():
+            self.axes[index][0].draw_artist(artist)
+        for ax, _, _ in self.axes:
+            if ax.get_legend() is not None:
+                ax.draw_artist(ax.get_legend())  # Keep the legend above the data
+        self._background = self.canvas.copy_from_bbox(self.figure.bbox)
+        self._trees = {}  # Limits or size may have changed
+        self._hover = None
+
+    def _refresh(self, new_samples):
+        """Blit only the new samples over the last frame; returns False if a full draw is needed."""
+        new_samples = {track_id: start for track_id, start in new_samples.items() if track_id in self.track_group}
+        self._stale.update(self.track_group[track_id] for track_id in new_samples)
+        if self._background is None:
+            return False
+
+        deltas = []
+        for ax, _, series in self.axes:
+            # Data leaving the view forces a rescale, unless the user zoomed or panned (autoscale off)
+            xmin, xmax = sorted(ax.get_xlim()) if ax.get_autoscalex_on() else (-np.inf, np.inf)
+            ymin, ymax = sorted(ax.get_ylim()) if ax.get_autoscaley_on() else (-np.inf, np.inf)
+            for name, data, style in series:
+                style = self._style(style)
+                # Connected series repeat the previous point so the new segment joins up
+                connected = style.get('linestyle', '-') != 'none'
+                parts = {}
+                for track_id, start in new_samples.items():
+                    x, y, _ = data(self.histories[track_id], start - 1 if start and connected else start)
+                    if len(x):
+                        xs, ys = parts.setdefault(self.track_group[track_id], ([], []))
+                        xs.append(x)
+                        ys.append(y)
+                for group, (xs, ys) in parts.items():
+                    xy, _ = _joined(xs, ys)
+                    finite = xy[np.isfinite(xy).all(axis=1)]
+                    if len(finite) and (finite[:, 0].min() < xmin or finite[:, 0].max() > xmax or
+                                        finite[:, 1].min() < ymin or finite[:, 1].max() > ymax):
+                        return False
+                    delta = Line2D(xy[:, 0], xy[:, 1], color=self.colors[group], animated=True, **style)
+                    delta.set_figure(self.figure)
+                    delta.set_transform(ax.transData)
+                    delta.set_clip_box(ax.bbox)
+                    deltas.append((ax, delta))
+        if not deltas:
+            return True
+        self.canvas.restore_region(self._background)
+        for ax, delta in deltas:
+            ax.draw_artist(delta)
+        self._background = self.canvas.copy_from_bbox(self.figure.bbox)
+        if self._hover is not None:
+            self._draw_tooltip()
+        self.canvas.blit(self.figure.bbox)
+        return True
+
+    def _tree(self, index):
+        # Built on the first hover after a change, over the points actually drawn and in view
+        tree = self._trees.get(index)
+        if tree is None:
+            ax = self.axes[index][0]
+            parts = [part for (axes_index, _, _), part in self._pick.items() if axes_index == index]
+            xy = np.concatenate([part[0] for part in parts]) if parts else np.empty((0, 2))
+            track_ids = np.concatenate([part[1] for part in parts]) if parts else np.empty(0, dtype=int)
+            samples = np.concatenate([part[2] for part in parts]) if parts else np.empty(0, dtype=int)
+            display = ax.transData.transform(xy)
+            x0, y0, x1, y1 = ax.bbox.extents
+            keep = (np.isfinite(display).all(axis=1) & (display[:, 0] >= x0) & (display[:, 0] <= x1) &
+                    (display[:, 1] >= y0) & (display[:, 1] <= y1))
+            tree = self._trees[index] = (cKDTree(display[keep]), xy[keep], track_ids[keep], samples[keep])
+        return tree
+
+    def _on_motion(self, event):
+        hover = None
+        index = next((i for i, (ax, _, _) in enumerate(self.axes) if ax is event.inaxes), None)
+        if index is not None and self._background is not None:
+            self._sync_artists()  # Include samples blitted since the last full draw
+            tree, xy, track_ids, samples = self._tree(index)
+            if tree.n:
+                distance, i = tree.query((event.x, event.y), distance_upper_bound=self.pick_radius)
+                if np.isfinite(distance):
+                    hover = (index, int(track_ids[i]), int(samples[i]), tuple(xy[i]))
+        if hover == self._hover:
+            return
+        self._hover = hover
+        # The tooltip is drawn over the current frame and never becomes part of the background
+        self.canvas.restore_region(self._background)
+        if hover is not None:
+            self._draw_tooltip()
+        self.canvas.blit(self.figure.bbox)
+
+    def _draw_tooltip(self):
+        index, track_id, sample, xy = self._hover
+        ax = self.axes[index][0]
+        tooltip = ax.annotate(self.describe(track_id, sample), xy=xy, xytext=(10, 10), textcoords='offset points',
+                              fontsize=8, bbox={'boxstyle': 'round', 'fc': 'lightyellow', 'alpha': 0.9},
+                              annotation_clip=False, animated=True)
+        ax.draw_artist(tooltip)
+        tooltip.remove()
+
+    def describe(self, track_id, sample):
+        """Tooltip text for one sample of a track."""
+        history = self.histories[track_id]
+        mr, ma, me, mt, md = history.measurements[sample]
+        lines = [f"Track ID: {track_id}", f"Sample: {sample}",
+                 f"Measurement: r={mr:.2f} az={ma:.2f} el={me:.2f} doppler={md:.2f}", f"Time: {mt:.3f}",
+                 f"Sf: {np.array2string(history.filtered[sample], precision=2)}"]
+        sp = history.source_value('Sp', sample)
+        pf = history.source_value('Pf', sample)
+        if sp is not None:
+            lines.append(f"Sp: {np.array2string(np.ravel(sp), precision=2)}")
+        if pf is not None:
+            lines.append(f"Pf diag: {np.array2string(np.diag(pf), precision=2)}")
+        return "\n".join(lines)
@@ -0,0 +1,104 @@
+import csv
+import numpy as np
+
+SUMMARY_FIELDS = ['Track ID', 'Current State', 'Poss1 Time', 'Tentative1 Time', 'Firm Time',
+                  'Track Status', 'Samples', 'Last Time', 'Last X', 'Last Y', 'Last Z']
+
+TRACK_STATES = ['', 'Poss1', 'Poss2', 'Tentative1', 'Tentative2', 'Tentative3', 'Firm']
+
+MEASUREMENT_FIELDS = 5  # mr, ma, me, mt, md
+
+
+def state_code(state):
+    """Small integer code of a track state, shared by the saved histories, the delta stream and snapshots."""
+    return TRACK_STATES.index(state) if state in TRACK_STATES else 0
+
+
+def _time_or_nan(value):
+    return np.nan if value == '' or value is None else float(value)
+
+
+def write_track_history(file_path, tracks, summary_rows):
+    """Write the Sf/Sp/Pf/Pp and measurement histories of all tracks to one .npz.
+
+    Histories are concatenated into columnar arrays (one row per track sample)
+    and `offsets` gives the rows of the i-th track: offsets[i]:offsets[i + 1].
+    Scalar per-track columns come from the summary rows, which must be in the
+    same order as `tracks`.
+    """
+    counts = np.array([len(track['Sf']) for track in tracks], dtype=np.int64)
+    offsets = np.zeros(len(tracks) + 1, dtype=np.int64)
+    np.cumsum(counts, out=offsets[1:])
+    total = int(offsets[-1])
+
+    sf = np.empty((total, 6))
+    sp = np.empty((total, 6))
+    pf = np.empty((total, 6, 6))
+    pp = np.empty((total, 6, 6))
+    measurement_rows = []
+    state_codes = []
+
+    for i, track in enumerate(tracks):
+        rows = slice(offsets[i], offsets[i + 1])
+        sf[rows] = np.reshape(track['Sf'], (-1, 6))
+        sp[rows] = np.reshape(track['Sp'], (-1, 6))
+        pf[rows] = track['Pf']
+        pp[rows] = track['Pp']
+        history = track['measurements'][:counts[i]]
+        measurement_rows.extend(tuple(measurement[:MEASUREMENT_FIELDS]) for measurement, _ in history)
+        state_codes.extend(state_code(state) for _, state in history)
+
+    measurements = np.array(measurement_rows, dtype=np.float64).reshape(total, MEASUREMENT_FIELDS)
+    states = np.array(state_codes, dtype=np.int8)
+
+    with open(file_path, 'wb') as file:
+        np.savez(file,
+                 track_ids=np.array([row['Track ID'] for row in summary_rows], dtype=np.int64),
+                 current_state=np.array([state_code(row['Current State']) for row in summary_rows], dtype=np.int8),
+                 poss1_time=np.array([_time_or_nan(row['Poss1 Time']) for row in summary_rows]),
+                 tentative1_time=np.array([_time_or_nan(row['Tentative1 Time']) for row in summary_rows]),
+                 firm_time=np.array([_time_or_nan(row['Firm Time']) for row in summary_rows]),
+                 offsets=offsets, sf=sf, sp=sp, pf=pf, pp=pp,
+                 measurements=measurements, states=states)
+
+
+def write_track_summary(csv_path, history_path, tracks, summary_rows):
+    """Write the scalar-only CSV summary next to the binary track history."""
+    write_track_history(history_path, tracks, summary_rows)
+    with open(csv_path, 'w', newline='') as csvfile:
+        writer = csv.DictWriter(csvfile, fieldnames=SUMMARY_FIELDS, restval='', extrasaction='ignore')
+        writer.writeheader()
+        writer.writerows(summary_rows)
+
+
+class TrackHistory:
+    """Read access to a track history .npz, indexed by track id."""
+
+    def __init__(self, file_path):
+        with np.load(file_path) as data:
+            self._data = {name: data[name] for name in data.files}
+        self.track_ids = self._data['track_ids']
+        self._rows = {int(track_id): i for i, track_id in enumerate(self.track_ids)}
+
+    def __len__(self):
+        return len(self.track_ids)
+
+    def __contains__(self, track_id):
+        return track_id in self._rows
+
+    def current_state(self, track_id):
+        return TRACK_STATES[self._data['current_state'][self._rows[track_id]]]
+
+    def track(self, track_id):
+        i = self._rows[track_id]
+        rows = slice(self._data['offsets'][i], self._data['offsets'][i + 1])
+        return {
+            'track_id': track_id,
+            'current_state': self.current_state(track_id),
+            'measurements': self._data['measurements'][rows],
+            'states': [TRACK_STATES[code] for code in self._data['states'][rows]],
+            'Sf': self._data['sf'][rows],
+            'Sp': self._data['sp'][rows],
+            'Pf': self._data['pf'][rows],
+            'Pp': self._data['pp'][rows],
+        }
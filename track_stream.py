@@ -0,0 +1,145 @@
+"""Binary per-scan track updates for downstream consumers.
+
+Format, version 1 (all little-endian):
+
+    header   24 bytes  magic b'TRKT', version u8, flags u8, source_id u16,
+                       sequence u32, scan_time f8, count u16, reserved u16
+    updates  count * 112 bytes, TRACK_UPDATE_DTYPE
+
+Only deltas are sent: one update per track created, updated or dropped in the
+scan, and nothing at all for a scan that changed no track. A dropped update
+repeats the last state sent for that track. Sequence numbers count datagrams
+so consumers can detect loss.
+"""
+import socket
+import struct
+import numpy as np
+
+from track_store import state_code
+
+MAGIC = b'TRKT'
+VERSION = 1
+HEADER = struct.Struct('<4sBBHIdHH')
+HEADER_SIZE = HEADER.size
+MAX_UDP_PAYLOAD = 65507
+SEQUENCE_MODULO = 1 << 32
+
+EVENT_CREATED = 1
+EVENT_UPDATED = 2
+EVENT_DROPPED = 3
+EVENT_NAMES = {EVENT_CREATED: 'created', EVENT_UPDATED: 'updated', EVENT_DROPPED: 'dropped'}
+
+TRACK_UPDATE_DTYPE = np.dtype([
+    ('track_id', '<u4'), ('event', 'u1'), ('state', 'u1'), ('samples', '<u2'),
+    ('time', '<f8'),  # Time of the track's last measurement
+    ('x', '<f8'), ('y', '<f8'), ('z', '<f8'), ('vx', '<f8'), ('vy', '<f8'), ('vz', '<f8'),
+    ('var_x', '<f8'), ('var_y', '<f8'), ('var_z', '<f8'), ('var_vx', '<f8'), ('var_vy', '<f8'), ('var_vz', '<f8'),
+])
+MAX_UPDATES_PER_DATAGRAM = (MAX_UDP_PAYLOAD - HEADER_SIZE) // TRACK_UPDATE_DTYPE.itemsize
+
+
+class TrackStreamError(ValueError):
+    pass
+
+
+def encode_track_datagrams(updates, first_sequence, scan_time, source_id=0):
+    """Split updates over as many datagrams as needed; returns (datagrams, next_sequence)."""
+    updates = np.ascontiguousarray(updates, dtype=TRACK_UPDATE_DTYPE)
+    datagrams = []
+    sequence = first_sequence
+    for start in range(0, len(updates), MAX_UPDATES_PER_DATAGRAM):
+        chunk = updates[start:start + MAX_UPDATES_PER_DATAGRAM]
+        header = HEADER.pack(MAGIC, VERSION, 0, source_id, sequence % SEQUENCE_MODULO, scan_time, len(chunk), 0)
+        datagrams.append(header + chunk.tobytes())
+        sequence += 1
+    return datagrams, sequence
+
+
+def decode_track_datagram(view):
+    """Decode one datagram into (source_id, sequence, scan_time, updates); updates is a view on `view`."""
+    if len(view) < HEADER_SIZE:
+        raise TrackStreamError("truncated header")
+    magic, version, flags, source_id, sequence, scan_time, count, _ = HEADER.unpack_from(view)
+    if magic != MAGIC:
+        raise TrackStreamError("bad magic")
+    if version != VERSION:
+        raise TrackStreamError(f"unsupported version {version}")
+    if len(view) < HEADER_SIZE + count * TRACK_UPDATE_DTYPE.itemsize:
+        raise TrackStreamError("truncated datagram")
+    return source_id, sequence, scan_time, np.frombuffer(view, dtype=TRACK_UPDATE_DTYPE, count=count,
+                                                         offset=HEADER_SIZE)
+
+
+def _update_row(track, event):
+    sf = track['Sf'][-1][:, 0]
+    variance = np.diagonal(track['Pf'][-1])
+    return ((track['track_id'], event, state_code(track.get('current_state')), min(len(track['Sf']), 0xFFFF),
+             track['measurements'][-1][0][3]) + tuple(sf.tolist()) + tuple(variance.tolist()))
+
+
+class TrackDeltaEncoder:
+    """Works out which tracks were created, updated or dropped since the previous scan.
+
+    A track counts as updated when it gained a sample or changed lifecycle
+    state. The track dicts themselves are remembered, so an id that is released
+    and reused within one scan shows up as a drop followed by a create.
+    """
+
+    def __init__(self):
+        self._known = {}  # track_id -> (track dict, samples, state, last row)
+
+    def deltas(self, tracks):
+        rows = []
+        seen = set()
+        for track in tracks:
+            track_id = track['track_id']
+            seen.add(track_id)
+            samples = len(track['Sf'])
+            state = track.get('current_state')
+            known = self._known.get(track_id)
+            if known is not None and known[0] is track:
+                if known[1] == samples and known[2] == state:
+                    continue
+                event = EVENT_UPDATED
+            else:
+                if known is not None:
+                    rows.append(known[3][:1] + (EVENT_DROPPED,) + known[3][2:])
+                event = EVENT_CREATED
+            row = _update_row(track, event)
+            self._known[track_id] = (track, samples, state, row)
+            rows.append(row)
+
+        for track_id in [track_id for track_id in self._known if track_id not in seen]:
+            row = self._known.pop(track_id)[3]
+            rows.append(row[:1] + (EVENT_DROPPED,) + row[2:])
+        return np.array(rows, dtype=TRACK_UPDATE_DTYPE)
+
+
+class TrackPublisher:
+    """Sends the per-scan track deltas of a Tracker to udp_ip:udp_port."""
+
+    def __init__(self, udp_ip, udp_port, source_id=0):
+        self.address = (udp_ip, udp_port)
+        self.source_id = source_id
+        self.encoder = TrackDeltaEncoder()
+        self.sequence = 0
+        self.datagrams_sent = 0
+        self.updates_sent = 0
+        self._sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+
+    def publish(self, tracks, scan_time):
+        updates = self.encoder.deltas(tracks)
+        if not len(updates):
+            return 0
+        datagrams, self.sequence = encode_track_datagrams(updates, self.sequence, scan_time, self.source_id)
+        for datagram in datagrams:
+            self._sock.sendto(datagram, self.address)
+        self.datagrams_sent += len(datagrams)
+        self.updates_sent += len(updates)
+        return len(updates)
+
+    def close(self):
+        self._sock.close()
+
+    def stats(self):
+        return {'track_datagrams_sent': self.datagrams_sent, 'track_updates_sent': self.updates_sent}
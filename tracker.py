@@ -0,0 +1,755 @@
+"""Tracking core: filters, association, track management and the batch entry point.
+
+Nothing here imports Qt or matplotlib, so it can run headless (see batch_run.py);
+nov4_1.py builds the GUI on top of it.
+"""
+import heapq
+import logging
+import math
+import multiprocessing
+import os
+import numpy as np
+from scipy.stats import chi2
+from scipy.optimize import linear_sum_assignment
+from concurrent.futures import Future, ProcessPoolExecutor
+
+from log_sink import CsvLogSink
+from recording import (MR_COL, MA_COL, ME_COL, MT_COL, MD_COL, iter_csv_rows, is_measurement_store,
+                       read_measurement_store, scan_boundaries)
+from track_store import write_track_summary
+from tracklog import get_logger
+
+log = get_logger('main')
+filter_log = get_logger('filter')
+coords_log = get_logger('coords')
+assoc_log = get_logger('assoc')
+
+
+class CVFilter:
+    def __init__(self):
+        self.Sf = np.zeros((6, 1))  # Filter state vector
+        self.Pf = np.eye(6)  # Filter state covariance matrix
+        self.Sp = np.zeros((6, 1))  # Predicted state vector
+        self.Pp = np.eye(6)  # Predicted state covariance matrix
+        self.plant_noise = 20  # Plant noise covariance
+        self.H = np.eye(3, 6)  # Measurement matrix
+        self.R = np.eye(3)  # Measurement noise covariance
+        self.Meas_Time = 0  # Measured time
+        self.prev_Time = 0
+        self.Q = np.eye(6)
+        self.Phi = np.eye(6)
+        self.Z = np.zeros((3, 1))
+        self.Z1 = np.zeros((3, 1))  # Measurement vector
+        self.Z2 = np.zeros((3, 1))
+        self.first_rep_flag = False
+        self.second_rep_flag = False
+        self.gate_threshold = 900.21  # 95% confidence interval for Chi-squared distribution with 3 degrees of freedom
+
+    def initialize_filter_state(self, x, y, z, vx, vy, vz, time):
+        filter_log.debug("Initializing filter state with x: %s, y: %s, z: %s, vx: %s, vy: %s, vz: %s, time: %s",
+                         x, y, z, vx, vy, vz, time)
+        if not self.first_rep_flag:
+            self.Z1 = np.array([[x], [y], [z]])
+            self.Sf[0] = x
+            self.Sf[1] = y
+            self.Sf[2] = z
+            filter_log.debug("Initial Sf x: %s", self.Sf[0])
+            self.Meas_Time = time
+            self.prev_Time = self.Meas_Time
+            self.first_rep_flag = True
+        elif self.first_rep_flag and not self.second_rep_flag:
+            self.Z2 = np.array([[x], [y], [z]])
+            self.prev_Time = self.Meas_Time
+            self.Meas_Time = time
+            dt = self.Meas_Time - self.prev_Time
+            self.Sf[3] = (self.Z2[0] - self.Z1[0]) / dt
+            self.Sf[4] = (self.Z2[1] - self.Z1[1]) / dt
+            self.Sf[5] = (self.Z2[2] - self.Z1[2]) / dt
+            self.second_rep_flag = True
+        else:
+            self.Z = np.array([[x], [y], [z]])
+            self.prev_Time = self.Meas_Time
+            self.Meas_Time = time
+
+    def predict_step(self, current_time):
+        dt = current_time - self.prev_Time
+        filter_log.debug("Predict step with dt: %s", dt)
+        T_2 = (dt * dt) / 2.0
+        T_3 = (dt * dt * dt) / 3.0
+        self.Phi[0, 3] = dt
+        self.Phi[1, 4] = dt
+        self.Phi[2, 5] = dt
+        self.Q[0, 0] = T_3
+        self.Q[1, 1] = T_3
+        self.Q[2, 2] = T_3
+        self.Q[0, 3] = T_2
+        self.Q[1, 4] = T_2
+        self.Q[2, 5] = T_2
+        self.Q[3, 0] = T_2
+        self.Q[4, 1] = T_2
+        self.Q[5, 2] = T_2
+        self.Q[3, 3] = dt
+        self.Q[4, 4] = dt
+        self.Q[5, 5] = dt
+        self.Q = self.Q * self.plant_noise
+        self.Sp = np.dot(self.Phi, self.Sf)
+        self.Pp = np.dot(np.dot(self.Phi, self.Pf), self.Phi.T) + self.Q
+        self.Meas_Time = current_time
+
+    def update_step(self, Z):
+        filter_log.debug("Update step with measurement Z: %s", Z)
+        Inn = Z - np.dot(self.H, self.Sp)
+        S = np.dot(self.H, np.dot(self.Pp, self.H.T)) + self.R
+        K = np.dot(np.dot(self.Pp, self.H.T), np.linalg.inv(S))
+        self.Sf = self.Sp + np.dot(K, Inn)
+        self.Pf = np.dot(np.eye(6) - np.dot(K, self.H), self.Pp)
+
+
+def read_measurements_from_csv(file_path, start_time=None, end_time=None):
+    measurements = []
+    # Rows outside [start_time, end_time] are skipped through the recording's time index
+    for row in iter_csv_rows(file_path, start_time, end_time):
+        mr = float(row[MR_COL])  # MR column
+        ma = float(row[MA_COL])  # MA column
+        me = float(row[ME_COL])  # ME column
+        mt = float(row[MT_COL])  # MT column
+        md = float(row[MD_COL])
+        x, y, z = sph2cart(ma, me, mr)  # Convert spherical to Cartesian coordinates
+        coords_log.debug("Converted spherical to Cartesian: azimuth=%s, elevation=%s, range=%s -> x=%s, y=%s, z=%s",
+                         ma, me, mr, x, y, z)
+        measurements.append((mr, ma, me, mt, md, x, y, z))
+    return measurements
+
+
+def read_measurements(file_path, start_time=None, end_time=None):
+    # Binary measurement stores (.npy) are memory-mapped, anything else is read as CSV
+    if is_measurement_store(file_path):
+        return read_measurement_store(file_path, start_time, end_time).tolist()
+    return read_measurements_from_csv(file_path, start_time, end_time)
+
+def sph2cart(az, el, r):
+    x = r * np.cos(el * np.pi / 180) * np.sin(az * np.pi / 180)
+    y = r * np.cos(el * np.pi / 180) * np.cos(az * np.pi / 180)
+    z = r * np.sin(el * np.pi / 180)
+    return x, y, z
+
+
+def cart2sph(x, y, z):
+    r = np.sqrt(x**2 + y**2 + z**2)
+    el = math.atan2(z, np.sqrt(x**2 + y**2)) * 180 / np.pi
+    az = math.atan2(y, x)
+
+    if x > 0.0:
+        az = np.pi / 2 - az
+    else:
+        az = 3 * np.pi / 2 - az
+
+    az = az * 180 / np.pi
+
+    if az < 0.0:
+        az = 360 + az
+
+    if az > 360:
+        az = az - 360
+
+    coords_log.debug("Converted Cartesian to spherical: x=%s, y=%s, z=%s -> range=%s, azimuth=%s, elevation=%s",
+                     x, y, z, r, az, el)
+    return r, az, el
+
+
+def form_measurement_groups(measurements, max_time_diff=0.050):
+    bounds = scan_boundaries([measurement[3] for measurement in measurements], max_time_diff)
+    bounds.append(len(measurements))
+    return [list(measurements[start:stop]) for start, stop in zip(bounds[:-1], bounds[1:])]
+
+
+def form_clusters_via_association(tracks, reports, kalman_filter):
+    association_list = []
+    cov_inv = np.linalg.inv(kalman_filter.Pp[:3, :3])  # 3x3 covariance matrix for position only
+    chi2_threshold = kalman_filter.gate_threshold
+
+    for i, track in enumerate(tracks):
+        for j, report in enumerate(reports):
+            distance = mahalanobis_distance(track, report, cov_inv)
+            if distance < chi2_threshold:
+                association_list.append((i, j))
+
+    clusters = []
+    while association_list:
+        cluster_tracks = set()
+        cluster_reports = set()
+        stack = [association_list.pop(0)]
+
+        while stack:
+            track_idx, report_idx = stack.pop()
+            cluster_tracks.add(track_idx)
+            cluster_reports.add(report_idx)
+            new_assoc = [(t, r) for t, r in association_list if t == track_idx or r == report_idx]
+            for assoc in new_assoc:
+                if assoc not in stack:
+                    stack.append(assoc)
+            association_list = [assoc for assoc in association_list if assoc not in new_assoc]
+
+        clusters.append((list(cluster_tracks), [reports[r] for r in cluster_reports]))
+
+    return clusters
+
+
+def mahalanobis_distance(track, report, cov_inv):
+    residual = np.array(report) - np.array(track)
+    distance = np.dot(np.dot(residual.T, cov_inv), residual)
+    return distance
+
+
+def select_best_report(cluster_tracks, cluster_reports, kalman_filter):
+    cov_inv = np.linalg.inv(kalman_filter.Pp[:3, :3])
+
+    best_report = None
+    best_track_idx = None
+    max_weight = -np.inf
+
+    for i, track in enumerate(cluster_tracks):
+        for j, report in enumerate(cluster_reports):
+            residual = np.array(report) - np.array(track)
+            weight = np.exp(-0.5 * np.dot(np.dot(residual.T, cov_inv), residual))
+            if weight > max_weight:
+                max_weight = weight
+                best_report = report
+                best_track_idx = i
+
+    return best_track_idx, best_report
+
+
+def select_initiation_mode(mode):
+    if mode == '3-state':
+        return 3
+    elif mode == '5-state':
+        return 5
+    elif mode == '7-state':
+        return 7
+    else:
+        raise ValueError("Invalid mode selected.")
+
+
+def doppler_correlation(doppler_1, doppler_2, doppler_threshold):
+    return abs(doppler_1 - doppler_2) < doppler_threshold
+
+
+def correlation_check(track, measurement, doppler_threshold, range_threshold):
+    last_measurement = track['measurements'][-1][0]
+    last_cartesian = sph2cart(last_measurement[0], last_measurement[1], last_measurement[2])
+    measurement_cartesian = sph2cart(measurement[0], measurement[1], measurement[2])
+    distance = np.linalg.norm(np.array(measurement_cartesian) - np.array(last_cartesian))
+
+    doppler_correlated = doppler_correlation(measurement[4], last_measurement[4], doppler_threshold)
+    range_satisfied = distance < range_threshold
+
+    return doppler_correlated and range_satisfied
+
+
+def initialize_filter_state(kalman_filter, x, y, z, vx, vy, vz, time):
+    kalman_filter.initialize_filter_state(x, y, z, vx, vy, vz, time)
+
+
+# Clusters with at least this many hypotheses go to the cluster pool when there is one;
+# smaller ones are cheaper to solve inline than to ship to another process
+PARALLEL_CLUSTER_HYPOTHESES = 4096
+
+
+def create_cluster_pool(workers=None):
+    """Process pool for large JPDA clusters.
+
+    The per-hypothesis work is small numpy calls driven from Python, which holds
+    the GIL, so threads would not run clusters in parallel; processes do. Spawned
+    rather than forked because the GUI process runs other threads.
+    """
+    return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'))
+
+
+def solve_jpda_cluster(cluster_tracks, cluster_reports, cov_inv):
+    # Generate hypotheses for the cluster
+    cluster_hypotheses = []
+    cluster_probabilities = []
+    for track in cluster_tracks:
+        for report in cluster_reports:
+            # Calculate the probability of the hypothesis
+            residual = np.array(report) - np.array(track)
+            probability = np.exp(-0.5 * np.dot(np.dot(residual.T, cov_inv), residual))
+            cluster_hypotheses.append((track, report))
+            cluster_probabilities.append(probability)
+
+    # Normalize probabilities
+    total_probability = sum(cluster_probabilities)
+    cluster_probabilities = [p / total_probability for p in cluster_probabilities]
+
+    # Select the best hypothesis based on the highest probability
+    best_hypothesis_index = np.argmax(cluster_probabilities)
+    return cluster_hypotheses, cluster_probabilities, cluster_hypotheses[best_hypothesis_index]
+
+
+def perform_jpda(tracks, reports, kalman_filter, executor=None):
+    clusters = form_clusters_via_association(tracks, reports, kalman_filter)
+    cov_inv = np.linalg.inv(kalman_filter.Pp[:3, :3])
+
+    # Clusters are independent: large ones are solved on the executor while the
+    # small ones run here, and results are collected in cluster order so the
+    # outcome is the same as solving them one after another
+    pending = []
+    for cluster_tracks, cluster_reports in clusters:
+        if executor is not None and len(cluster_tracks) * len(cluster_reports) >= PARALLEL_CLUSTER_HYPOTHESES:
+            pending.append(executor.submit(solve_jpda_cluster, cluster_tracks, cluster_reports, cov_inv))
+        else:
+            pending.append(solve_jpda_cluster(cluster_tracks, cluster_reports, cov_inv))
+
+    best_reports = []
+    hypotheses = []
+    probabilities = []
+    for result in pending:
+        cluster_hypotheses, cluster_probabilities, best = result.result() if isinstance(result, Future) else result
+        best_reports.append(best)
+        hypotheses.append(cluster_hypotheses)
+        probabilities.append(cluster_probabilities)
+
+    # Log clusters, hypotheses, and probabilities
+    assoc_log.debug("JPDA Clusters: %s", clusters)
+    assoc_log.debug("JPDA Hypotheses: %s", hypotheses)
+    assoc_log.debug("JPDA Probabilities: %s", probabilities)
+    assoc_log.debug("JPDA Best Reports: %s", best_reports)
+
+    return clusters, best_reports, hypotheses, probabilities
+
+def perform_munkres(tracks, reports, kalman_filter):
+    if not tracks:
+        return []  # Nothing to assign to yet, every report starts a new track
+
+    cost_matrix = []
+    cov_inv = np.linalg.inv(kalman_filter.Pp[:3, :3])
+
+    for track in tracks:
+        track_costs = []
+        for report in reports:
+            distance = mahalanobis_distance(track, report, cov_inv)
+            track_costs.append(distance)
+        cost_matrix.append(track_costs)
+
+    row_ind, col_ind = linear_sum_assignment(cost_matrix)
+    best_reports = [(row, reports[col]) for row, col in zip(row_ind, col_ind)]
+
+    # Log cost matrix and assignments
+    if assoc_log.isEnabledFor(logging.DEBUG):
+        assoc_log.debug("Munkres Cost Matrix: %s", cost_matrix)
+        assoc_log.debug("Munkres Assignments: %s", list(zip(row_ind, col_ind)))
+        assoc_log.debug("Munkres Best Reports: %s", best_reports)
+
+    return best_reports
+
+
+def check_track_timeout(tracks, current_time, poss_timeout=20.0, firm_tent_timeout=50.0):
+    tracks_to_remove = []
+    for track_id, track in enumerate(tracks):
+        last_measurement_time = track['measurements'][-1][0][3]  # Assuming the time is at index 3
+        time_since_last_measurement = current_time - last_measurement_time
+
+        if track['current_state'] == 'Poss1' and time_since_last_measurement > poss_timeout:
+            tracks_to_remove.append(track_id)
+        elif track['current_state'] in ['Tentative1', 'Firm'] and time_since_last_measurement > firm_tent_timeout:
+            tracks_to_remove.append(track_id)
+
+    return tracks_to_remove
+
+
+DETAILED_LOG_FIELDS = ['Time', 'Measurement X', 'Measurement Y', 'Measurement Z', 'Current State',
+                       'Correlation Output', 'Associated Track ID', 'Associated Position X',
+                       'Associated Position Y', 'Associated Position Z', 'Association Type',
+                       'Clusters Formed', 'Hypotheses Generated', 'Probability of Hypothesis',
+                       'Best Report Selected']
+
+
+class Tracker:
+    """Incremental tracking engine shared by file runs and live UDP runs.
+
+    All track state lives on the instance, so process() / process_scan() can be
+    fed one datagram or one recording at a time and only pay for the new data.
+    The detailed log is opened once per Tracker and written by a CsvLogSink.
+    With a track_stream.TrackPublisher the track deltas of every scan are sent
+    to downstream consumers as well; the Tracker closes it on close().
+    cluster_workers > 0 solves large JPDA clusters on a process pool of that size.
+    """
+
+    def __init__(self, track_mode, filter_option, association_type, log_file_path='detailed_log.csv',
+                 doppler_threshold=100, range_threshold=100, publisher=None, cluster_workers=0):
+        if filter_option == "CV":
+            self.kalman_filter = CVFilter()
+        elif filter_option == "CA":
+            self.kalman_filter = CAFilter()
+        else:
+            raise ValueError("Invalid filter option selected.")
+
+        self.tracks = []
+        self.track_id_list = []
+        self.free_track_ids = []  # Heap of released ids, lowest id is reused first
+
+        self.doppler_threshold = doppler_threshold
+        self.range_threshold = range_threshold
+        self.firm_threshold = select_initiation_mode(track_mode)
+        self.association_method = association_type  # 'JPDA' or 'Munkres'
+
+        self.miss_counts = {}
+        self.hit_counts = {}
+        self.firm_ids = set()
+        self.state_map = {}
+        self.state_transition_times = {}
+        self.progression_states = {
+            3: ['Poss1', 'Tentative1', 'Firm'],
+            5: ['Poss1', 'Poss2', 'Tentative1', 'Tentative2', 'Firm'],
+            7: ['Poss1', 'Poss2', 'Tentative1', 'Tentative2', 'Tentative3', 'Firm']
+        }[self.firm_threshold]
+
+        self.last_check_time = 0
+        self.check_interval = 0.0005  # 0.5 ms
+        self.scan_count = 0
+        self.scan_time = 0.0
+        self.tracks_created = 0
+        self.confirmation_latencies = []  # Poss1 to Firm time of every confirmed track
+
+        # Open the detailed log once per session; rows are written in batches by a background thread
+        self.log_sink = CsvLogSink(log_file_path, DETAILED_LOG_FIELDS) if log_file_path else None
+        self.publisher = publisher
+        self.cluster_pool = create_cluster_pool(cluster_workers) if cluster_workers else None
+
+    def allocate_track_id(self):
+        if self.free_track_ids:
+            new_track_id = heapq.heappop(self.free_track_ids)
+            self.track_id_list[new_track_id]['state'] = 'occupied'
+        else:
+            new_track_id = len(self.track_id_list)
+            self.track_id_list.append({'id': new_track_id, 'state': 'occupied'})
+        self.tracks_created += 1
+        return new_track_id
+
+    def release_track_id(self, track_id):
+        if self.track_id_list[track_id]['state'] != 'free':
+            self.track_id_list[track_id]['state'] = 'free'
+            heapq.heappush(self.free_track_ids, track_id)
+
+    def log_row(self, log_data):
+        if self.log_sink is not None:
+            self.log_sink.write(log_data)
+
+    def process(self, measurements, max_time_diff=0.050, on_scan=None):
+        """Group time-ordered measurements into scans and process each one.
+
+        `on_scan(tracker, group)` is called after every scan; returning False stops before the next one.
+        """
+        if measurements:
+            for group in form_measurement_groups(measurements, max_time_diff=max_time_diff):
+                self.process_scan(group)
+                if self.publisher is not None:
+                    self.publisher.publish(self.tracks, group[0][3])
+                if on_scan is not None and on_scan(self, group) is False:
+                    log.info("Processing stopped after %d scans.", self.scan_count)
+                    break
+        return self.tracks
+
+    def process_scan(self, group):
+        """Associate one scan (measurements within the grouping window) with the tracks."""
+        self.scan_count += 1
+        log.debug("Processing measurement group %d...", self.scan_count)
+
+        current_time = group[0][3]  # Assuming the time is at index 3 of each measurement
+        self.scan_time = current_time
+
+        # Periodic checking
+        if current_time - self.last_check_time >= self.check_interval:
+            tracks_to_remove = check_track_timeout(self.tracks, current_time)
+            for track_id in reversed(tracks_to_remove):
+                log.info("Removing track %d due to timeout", track_id)
+                del self.tracks[track_id]
+                self.release_track_id(track_id)
+                if track_id in self.firm_ids:
+                    self.firm_ids.remove(track_id)
+                if track_id in self.state_map:
+                    del self.state_map[track_id]
+                if track_id in self.hit_counts:
+                    del self.hit_counts[track_id]
+                if track_id in self.miss_counts:
+                    del self.miss_counts[track_id]
+            self.last_check_time = current_time
+
+        if len(group) == 1:  # Single measurement
+            measurement = group[0]
+            assigned = False
+            for track_id, track in enumerate(self.tracks):
+                if correlation_check(track, measurement, self.doppler_threshold, self.range_threshold):
+                    current_state = self.state_map.get(track_id, None)
+                    if current_state == 'Poss1':
+                        initialize_filter_state(self.kalman_filter, *sph2cart(*measurement[:3]), 0, 0, 0, measurement[3])
+                    elif current_state == 'Tentative1':
+                        last_measurement = track['measurements'][-1][0]
+                        dt = measurement[3] - last_measurement[3]
+                        vx = (sph2cart(*measurement[:3])[0] - sph2cart(*last_measurement[:3])[0]) / dt
+                        vy = (sph2cart(*measurement[:3])[1] - sph2cart(*last_measurement[:3])[1]) / dt
+                        vz = (sph2cart(*measurement[:3])[2] - sph2cart(*last_measurement[:3])[2]) / dt
+                        initialize_filter_state(self.kalman_filter, *sph2cart(*measurement[:3]), vx, vy, vz, measurement[3])
+                    elif current_state == 'Firm':
+                        self.kalman_filter.predict_step(measurement[3])
+                        self.kalman_filter.update_step(np.array((measurement[:3])).reshape(3, 1))
+
+                    track['measurements'].append((measurement, current_state))
+                    track['Sf'].append(self.kalman_filter.Sf.copy())
+                    track['Sp'].append(self.kalman_filter.Sp.copy())
+                    track['Pp'].append(self.kalman_filter.Pp.copy())
+                    track['Pf'].append(self.kalman_filter.Pf.copy())
+                    self.hit_counts[track_id] = self.hit_counts.get(track_id, 0) + 1
+                    assigned = True
+
+                    # Log data to CSV
+                    log_data = {
+                        'Time': measurement[3],
+                        'Measurement X': measurement[5],
+                        'Measurement Y': measurement[6],
+                        'Measurement Z': measurement[7],
+                        'Current State': current_state,
+                        'Correlation Output': 'Yes',
+                        'Associated Track ID': track_id,
+                        'Associated Position X': track['Sf'][-1][0, 0],
+                        'Associated Position Y': track['Sf'][-1][1, 0],
+                        'Associated Position Z': track['Sf'][-1][2, 0],
+                        'Association Type': 'Single',
+                        'Clusters Formed': '',
+                        'Hypotheses Generated': '',
+                        'Probability of Hypothesis': '',
+                        'Best Report Selected': ''
+                    }
+                    self.log_row(log_data)
+                    break
+
+            if not assigned:
+                new_track_id = self.allocate_track_id()
+
+                self.tracks.append({
+                    'track_id': new_track_id,
+                    'measurements': [(measurement, 'Poss1')],
+                    'current_state': 'Poss1',
+                    'Sf': [self.kalman_filter.Sf.copy()],
+                    'Sp': [self.kalman_filter.Sp.copy()],
+                    'Pp': [self.kalman_filter.Pp.copy()],
+                    'Pf': [self.kalman_filter.Pf.copy()]
+                })
+                self.state_map[new_track_id] = 'Poss1'
+                self.state_transition_times[new_track_id] = {'Poss1': current_time}
+                self.hit_counts[new_track_id] = 1
+                initialize_filter_state(self.kalman_filter, *sph2cart(*measurement[:3]), 0, 0, 0, measurement[3])
+
+                # Log data to CSV
+                log_data = {
+                    'Time': measurement[3],
+                    'Measurement X': measurement[5],
+                    'Measurement Y': measurement[6],
+                    'Measurement Z': measurement[7],
+                    'Current State': 'Poss1',
+                    'Correlation Output': 'No',
+                    'Associated Track ID': new_track_id,
+                    'Associated Position X': '',
+                    'Associated Position Y': '',
+                    'Associated Position Z': '',
+                    'Association Type': 'New',
+                    'Clusters Formed': '',
+                    'Hypotheses Generated': '',
+                    'Probability of Hypothesis': '',
+                    'Best Report Selected': ''
+                }
+                self.log_row(log_data)
+
+        else:  # Multiple measurements
+            reports = [sph2cart(*m[:3]) for m in group]
+            if self.association_method == 'JPDA':
+                clusters, best_reports, hypotheses, probabilities = perform_jpda(
+                    [track['measurements'][-1][0][:3] for track in self.tracks], reports, self.kalman_filter,
+                    executor=self.cluster_pool
+                )
+            elif self.association_method == 'Munkres':
+                best_reports = perform_munkres([track['measurements'][-1][0][:3] for track in self.tracks], reports, self.kalman_filter)
+
+            for track_id, best_report in best_reports:
+                current_state = self.state_map.get(track_id, None)
+                if current_state == 'Poss1':
+                    initialize_filter_state(self.kalman_filter, *best_report, 0, 0, 0, group[0][3])
+                elif current_state == 'Tentative1':
+                    last_measurement = self.tracks[track_id]['measurements'][-1][0]
+                    dt = group[0][3] - last_measurement[3]
+                    vx = (best_report[0] - sph2cart(*last_measurement[:3])[0]) / dt
+                    vy = (best_report[1] - sph2cart(*last_measurement[:3])[1]) / dt
+                    vz = (best_report[2] - sph2cart(*last_measurement[:3])[2]) / dt
+                    initialize_filter_state(self.kalman_filter, *best_report, vx, vy, vz, group[0][3])
+                elif current_state == 'Firm':
+                    self.kalman_filter.predict_step(group[0][3])
+                    self.kalman_filter.update_step(np.array(best_report).reshape(3, 1))
+
+                self.tracks[track_id]['measurements'].append((cart2sph(*best_report) + (group[0][3], group[0][4]), current_state))
+                self.tracks[track_id]['Sf'].append(self.kalman_filter.Sf.copy())
+                self.tracks[track_id]['Sp'].append(self.kalman_filter.Sp.copy())
+                self.tracks[track_id]['Pp'].append(self.kalman_filter.Pp.copy())
+                self.tracks[track_id]['Pf'].append(self.kalman_filter.Pf.copy())
+                self.hit_counts[track_id] = self.hit_counts.get(track_id, 0) + 1
+
+                # Log data to CSV
+                log_data = {
+                    'Time': group[0][3],
+                    'Measurement X': best_report[0],
+                    'Measurement Y': best_report[1],
+                    'Measurement Z': best_report[2],
+                    'Current State': current_state,
+                    'Correlation Output': 'Yes',
+                    'Associated Track ID': track_id,
+                    'Associated Position X': self.tracks[track_id]['Sf'][-1][0, 0],
+                    'Associated Position Y': self.tracks[track_id]['Sf'][-1][1, 0],
+                    'Associated Position Z': self.tracks[track_id]['Sf'][-1][2, 0],
+                    'Association Type': self.association_method,
+                    'Hypotheses Generated': '',
+                    'Probability of Hypothesis': '',
+                    'Best Report Selected': best_report
+                }
+                self.log_row(log_data)
+
+            # Handle unassigned measurements
+            assigned_reports = set(best_report for _, best_report in best_reports)
+            for report in reports:
+                if tuple(report) not in assigned_reports:
+                    new_track_id = self.allocate_track_id()
+
+                    self.tracks.append({
+                        'track_id': new_track_id,
+                        'measurements': [(cart2sph(*report) + (group[0][3], group[0][4]), 'Poss1')],
+                        'current_state': 'Poss1',
+                        'Sf': [self.kalman_filter.Sf.copy()],
+                        'Sp': [self.kalman_filter.Sp.copy()],
+                        'Pp': [self.kalman_filter.Pp.copy()],
+                        'Pf': [self.kalman_filter.Pf.copy()]
+                    })
+                    self.state_map[new_track_id] = 'Poss1'
+                    self.state_transition_times[new_track_id] = {'Poss1': current_time}
+                    self.hit_counts[new_track_id] = 1
+                    initialize_filter_state(self.kalman_filter, *report, 0, 0, 0, group[0][3])
+
+                    # Log data to CSV
+                    log_data = {
+                        'Time': group[0][3],
+                        'Measurement X': report[0],
+                        'Measurement Y': report[1],
+                        'Measurement Z': report[2],
+                        'Current State': 'Poss1',
+                        'Correlation Output': 'No',
+                        'Associated Track ID': new_track_id,
+                        'Associated Position X': '',
+                        'Associated Position Y': '',
+                        'Associated Position Z': '',
+                        'Association Type': 'New',
+                        'Hypotheses Generated': '',
+                        'Probability of Hypothesis': '',
+                        'Best Report Selected': ''
+                    }
+                    self.log_row(log_data)
+
+        # Update states based on hit counts
+        for track_id, track in enumerate(self.tracks):
+            current_state = self.state_map.get(track_id,None)
+            if current_state is not None:
+                current_state_index = self.progression_states.index(current_state)
+                if self.hit_counts[track_id] >= self.firm_threshold and current_state != 'Firm':
+                    self.state_map[track_id] = 'Firm'
+                    self.firm_ids.add(track_id)
+                    self.state_transition_times.setdefault(track_id, {})['Firm'] = current_time
+                    self.record_confirmation(track_id, current_time)
+                elif current_state_index < len(self.progression_states) - 1:
+                    next_state = self.progression_states[current_state_index + 1]
+                    if self.hit_counts[track_id] >= current_state_index + 1 and self.state_map[track_id] != next_state:
+                        self.state_map[track_id] = next_state
+                        self.state_transition_times.setdefault(track_id, {})[next_state] = current_time
+                        if next_state == 'Firm':
+                            self.record_confirmation(track_id, current_time)
+                track['current_state'] = self.state_map[track_id]
+
+    def record_confirmation(self, track_id, current_time):
+        initiated = self.state_transition_times.get(track_id, {}).get('Poss1', current_time)
+        self.confirmation_latencies.append(current_time - initiated)
+
+    def flush(self):
+        if self.log_sink is not None:
+            self.log_sink.flush()
+
+    def close(self):
+        if self.log_sink is not None:
+            self.log_sink.close()
+        if self.publisher is not None:
+            self.publisher.close()
+        if self.cluster_pool is not None:
+            self.cluster_pool.shutdown()
+
+    def write_summary(self, csv_file_path='track_summary.csv', history_file_path='track_history.npz'):
+        # Prepare data for the track summary
+        summary_rows = []
+        for track_id, track in enumerate(self.tracks):
+            # The per-track dump prints whole matrix histories, so it is only built when debugging
+            if log.isEnabledFor(logging.DEBUG):
+                log.debug("Track %d:", track_id)
+                log.debug("  Current State: %s", track['current_state'])
+                log.debug("  State Transition Times:")
+                for state, time in self.state_transition_times.get(track_id, {}).items():
+                    log.debug("    %s: %s", state, time)
+                log.debug("  Measurement History:")
+                for state in self.progression_states:
+                    measurements = [m for m, s in track['measurements'] if s == state][:3]
+                    log.debug("    %s: %s", state, measurements)
+                log.debug("  Track Status: %s", self.track_id_list[track_id]['state'])
+                log.debug("  SF: %s", track['Sf'])
+                log.debug("  SP: %s", track['Sp'])
+                log.debug("  PF: %s", track['Pf'])
+                log.debug("  PP: %s", track['Pp'])
+
+            # Scalar columns only; the full Sf/Sp/Pf/Pp histories go to the binary track history
+            last_state = track['Sf'][-1]
+            summary_rows.append({
+                'Track ID': track_id,
+                'Current State': track['current_state'],
+                'Poss1 Time': self.state_transition_times.get(track_id, {}).get('Poss1', ''),
+                'Tentative1 Time': self.state_transition_times.get(track_id, {}).get('Tentative1', ''),
+                'Firm Time': self.state_transition_times.get(track_id, {}).get('Firm', ''),
+                'Track Status': self.track_id_list[track_id]['state'],
+                'Samples': len(track['Sf']),
+                'Last Time': track['measurements'][-1][0][3],
+                'Last X': last_state[0, 0],
+                'Last Y': last_state[1, 0],
+                'Last Z': last_state[2, 0]
+            })
+
+        write_track_summary(csv_file_path, history_file_path, self.tracks, summary_rows)
+
+        log.info("Track summary has been written to %s and %s", csv_file_path, history_file_path)
+
+
+def main(measurements, track_mode, filter_option, association_type, start_time=None, end_time=None,
+         publisher=None, output_dir=None, on_scan=None, cluster_workers=0):
+    # A recording path is loaded here so only the requested time window is read
+    if isinstance(measurements, str):
+        measurements = read_measurements(measurements, start_time, end_time)
+    elif start_time is not None or end_time is not None:
+        measurements = [m for m in measurements
+                        if (start_time is None or m[3] >= start_time) and (end_time is None or m[3] <= end_time)]
+
+    if not measurements:
+        log.warning("No measurements in the selected time window.")
+        return []
+
+    # Outputs go to the working directory unless a separate directory is given
+    output_dir = output_dir or ''
+    tracker = Tracker(track_mode, filter_option, association_type,
+                      log_file_path=os.path.join(output_dir, 'detailed_log.csv'), publisher=publisher,
+                      cluster_workers=cluster_workers)
+    try:
+        tracker.process(measurements, on_scan=on_scan)
+    finally:
+        tracker.close()
+    tracker.write_summary(os.path.join(output_dir, 'track_summary.csv'), os.path.join(output_dir, 'track_history.npz'))
+
+    return tracker.tracks
@@ -0,0 +1,166 @@
+"""Leveled logging for the tracker.
+
+Every module logs through a child of the 'tracker' logger (tracker.filter,
+tracker.assoc, ...), so levels can be switched per module. Calls use
+%-style arguments, and logging checks the level before it formats anything,
+so a disabled level costs one method call. Call sites whose arguments are
+expensive to build also check `log.isEnabledFor(logging.DEBUG)` first.
+
+The ring buffer keeps the last N records at or above its own level for
+post-mortem inspection. It can run at DEBUG while the console stays at INFO.
+
+Configuration can also come from the environment:
+    TRACKER_LOG=DEBUG
+    TRACKER_LOG_MODULES=filter:DEBUG,assoc:WARNING
+    TRACKER_LOG_RING=10000
+    TRACKER_LOG_RING_LEVEL=DEBUG
+"""
+import collections
+import logging
+import os
+import sys
+
+ROOT_LOGGER = 'tracker'
+DEFAULT_RING_SIZE = 10000
+
+_console_handler = None
+_ring_handler = None
+_console_sink = None
+
+
+def get_logger(name):
+    return logging.getLogger(f'{ROOT_LOGGER}.{name}')
+
+
+class ConsoleHandler(logging.Handler):
+    """Writes to the console sink if one is set, else to whatever sys.stdout is at emit time."""
+
+    def emit(self, record):
+        try:
+            if _console_sink is not None:
+                _console_sink.emit(record.levelno, self.format(record))
+            else:
+                sys.stdout.write(self.format(record) + '\n')
+        except Exception:
+            self.handleError(record)
+
+
+class RingBufferHandler(logging.Handler):
+    """Keeps the last `capacity` log messages in memory.
+
+    Messages are rendered when captured because the arguments are often numpy
+    arrays that the filter later changes in place. The timestamp/level prefix
+    is only added when the ring is dumped.
+    """
+
+    def __init__(self, capacity=DEFAULT_RING_SIZE, level=logging.DEBUG):
+        super().__init__(level)
+        self.records = collections.deque(maxlen=capacity)
+
+    def emit(self, record):
+        record.msg = record.getMessage()
+        record.args = None
+        record.exc_info = None
+        self.records.append(record)
+
+    def dump(self, last=None):
+        records = list(self.records)[-last:] if last else list(self.records)
+        return [self.format(record) for record in records]
+
+    def clear(self):
+        self.records.clear()
+
+
+def _level(value):
+    if isinstance(value, int):
+        return value
+    return logging.getLevelName(str(value).upper())
+
+
+def configure(level='INFO', module_levels=None, ring_size=0, ring_level='DEBUG'):
+    """(Re)configure tracker logging.
+
+    level: console level for all tracker modules.
+    module_levels: {'filter': 'DEBUG', ...} per-module levels overriding `level`.
+    ring_size: number of records kept in memory, 0 disables the ring buffer.
+    ring_level: lowest level captured by the ring buffer.
+    """
+    global _console_handler, _ring_handler
+    root = logging.getLogger(ROOT_LOGGER)
+    root.propagate = False
+    for handler in (_console_handler, _ring_handler):
+        if handler is not None:
+            root.removeHandler(handler)
+
+    level = _level(level)
+    module_levels = {name: _level(value) for name, value in (module_levels or {}).items()}
+
+    _console_handler = ConsoleHandler(logging.NOTSET)
+    _console_handler.addFilter(_ModuleLevelFilter(level, module_levels))
+    root.addHandler(_console_handler)
+
+    # Loggers must let through whatever either handler wants, nothing less
+    effective = level
+    _ring_handler = None
+    if ring_size:
+        _ring_handler = RingBufferHandler(ring_size, _level(ring_level))
+        _ring_handler.setFormatter(logging.Formatter('%(relativeCreated)10.1f %(levelname)-7s %(name)s: %(message)s'))
+        root.addHandler(_ring_handler)
+        effective = min(effective, _ring_handler.level)
+
+    root.setLevel(effective)
+    for name in list(logging.root.manager.loggerDict):
+        if name.startswith(ROOT_LOGGER + '.'):
+            logging.getLogger(name).setLevel(logging.NOTSET)
+    # A module override is a real switch: it also decides what the ring buffer sees
+    for name, value in module_levels.items():
+        get_logger(name).setLevel(value)
+
+
+def configure_from_env():
+    module_levels = {}
+    for item in os.environ.get('TRACKER_LOG_MODULES', '').split(','):
+        if ':' in item:
+            name, value = item.split(':', 1)
+            module_levels[name.strip()] = value.strip()
+    configure(level=os.environ.get('TRACKER_LOG', 'INFO'),
+              module_levels=module_levels,
+              ring_size=int(os.environ.get('TRACKER_LOG_RING', '0')),
+              ring_level=os.environ.get('TRACKER_LOG_RING_LEVEL', 'DEBUG'))
+
+
+def set_console_level(level):
+    """Change the console level of the current configuration, keeping module overrides and the ring."""
+    if _console_handler is None:
+        configure(level)
+        return
+    level = _level(level)
+    for log_filter in _console_handler.filters:
+        if isinstance(log_filter, _ModuleLevelFilter):
+            log_filter.level = level
+    logging.getLogger(ROOT_LOGGER).setLevel(level if _ring_handler is None else min(level, _ring_handler.level))
+
+
+def set_console_sink(sink):
+    """Send console log lines to `sink.emit(levelno, text)` instead of stdout (None restores stdout)."""
+    global _console_sink
+    _console_sink = sink
+
+
+def ring_buffer():
+    return _ring_handler
+
+
+def dump_ring(last=None):
+    """Return the buffered log lines, oldest first (empty if the ring is disabled)."""
+    return _ring_handler.dump(last) if _ring_handler is not None else []
+
+
+class _ModuleLevelFilter(logging.Filter):
+    def __init__(self, level, module_levels):
+        super().__init__()
+        self.level = level
+        self.module_levels = {f'{ROOT_LOGGER}.{name}': value for name, value in module_levels.items()}
+
+    def filter(self, record):
+        return record.levelno >= self.module_levels.get(record.name, self.level)
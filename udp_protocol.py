@@ -0,0 +1,150 @@
+"""Wire formats for measurement datagrams.
+
+Binary format, version 1 (all little-endian):
+
+    header  16 bytes  magic b'TRKM', version u8, flags u8, sensor_id u16,
+                      sequence u32, count u16, reserved u16
+    records count * 64 bytes, MEASUREMENT_DTYPE (mr, ma, me, mt, md, x, y, z as f8)
+
+A datagram that does not start with the magic is treated as the legacy text
+format: one 'mr,ma,me,mt,md[,...]' line per measurement.
+"""
+import struct
+import numpy as np
+
+from recording import MEASUREMENT_DTYPE, records_from_spherical
+
+MAGIC = b'TRKM'
+VERSION = 1
+HEADER = struct.Struct('<4sBBHIHH')
+HEADER_SIZE = HEADER.size
+MAX_UDP_PAYLOAD = 65507
+MAX_RECORDS_PER_DATAGRAM = (MAX_UDP_PAYLOAD - HEADER_SIZE) // MEASUREMENT_DTYPE.itemsize
+SEQUENCE_MODULO = 1 << 32
+
+
+class ProtocolError(ValueError):
+    pass
+
+
+def encode_datagram(records, sequence, sensor_id=0):
+    """Pack up to MAX_RECORDS_PER_DATAGRAM measurement records into one datagram."""
+    records = np.ascontiguousarray(records, dtype=MEASUREMENT_DTYPE)
+    if len(records) > MAX_RECORDS_PER_DATAGRAM:
+        raise ProtocolError(f"{len(records)} records do not fit in one datagram")
+    header = HEADER.pack(MAGIC, VERSION, 0, sensor_id, sequence % SEQUENCE_MODULO, len(records), 0)
+    return header + records.tobytes()
+
+
+def encode_datagrams(records, first_sequence, sensor_id=0):
+    """Split records over as many datagrams as needed; returns (datagrams, next_sequence)."""
+    records = np.asarray(records, dtype=MEASUREMENT_DTYPE)
+    datagrams = []
+    sequence = first_sequence
+    for start in range(0, max(len(records), 1), MAX_RECORDS_PER_DATAGRAM):
+        datagrams.append(encode_datagram(records[start:start + MAX_RECORDS_PER_DATAGRAM], sequence, sensor_id))
+        sequence += 1
+    return datagrams, sequence
+
+
+def is_binary_datagram(view):
+    return len(view) >= HEADER_SIZE and bytes(view[:4]) == MAGIC
+
+
+def decode_header(view):
+    magic, version, flags, sensor_id, sequence, count, _ = HEADER.unpack_from(view)
+    if magic != MAGIC:
+        raise ProtocolError("bad magic")
+    if version != VERSION:
+        raise ProtocolError(f"unsupported version {version}")
+    if len(view) < HEADER_SIZE + count * MEASUREMENT_DTYPE.itemsize:
+        raise ProtocolError("truncated datagram")
+    return sensor_id, sequence, count
+
+
+def decode_datagram(view):
+    """Decode one binary datagram into (sensor_id, sequence, records).
+
+    The records array is a view on `view`; copy it if the buffer is reused.
+    """
+    sensor_id, sequence, count = decode_header(view)
+    return sensor_id, sequence, np.frombuffer(view, dtype=MEASUREMENT_DTYPE, count=count, offset=HEADER_SIZE)
+
+
+def parse_text_payload(payload):
+    """Parse legacy 'mr,ma,me,mt,md[,...]' lines into measurement records."""
+    lines = [line.split(b',')[:5] for line in bytes(payload).split(b'\n') if line.strip()]
+    if not lines:
+        return np.empty(0, dtype=MEASUREMENT_DTYPE)
+    return records_from_spherical(np.array(lines, dtype=np.float64))
+
+
+class SequenceTracker:
+    """Counts lost, duplicate and out-of-order datagrams per sensor from sequence numbers."""
+
+    def __init__(self):
+        self.expected = {}
+        self.received = 0
+        self.lost = 0
+        self.late = 0
+
+    def update(self, sensor_id, sequence):
+        self.received += 1
+        expected = self.expected.get(sensor_id)
+        if expected is not None:
+            gap = (sequence - expected) % SEQUENCE_MODULO
+            if gap >= SEQUENCE_MODULO // 2:
+                # Behind what we expected: a reordered or duplicated datagram
+                self.late += 1
+                self.lost = max(self.lost - 1, 0)
+                return
+            self.lost += gap
+        self.expected[sensor_id] = (sequence + 1) % SEQUENCE_MODULO
+
+    def stats(self):
+        return {'sequenced_datagrams': self.received, 'datagrams_lost': self.lost, 'datagrams_late': self.late}
+
+
+class DatagramDecoder:
+    """Receiver parse callback that accepts binary and text datagrams in the same batch.
+
+    Binary datagrams are decoded with one np.frombuffer each; text datagrams of
+    the batch are joined and parsed together. Sequence numbers are counted per
+    receiving socket's `sensor_id`, since senders all default to header id 0,
+    and only once the whole call has succeeded, so a batch the receiver retries
+    one datagram at a time is not counted twice.
+    """
+
+    def __init__(self):
+        self.sequences = SequenceTracker()
+        self.protocol_errors = 0
+
+    def __call__(self, view, spans, sensor_id=0):
+        chunks = []
+        sequences = []
+        text = []
+        for offset, size in spans:
+            datagram = view[offset:offset + size]
+            if is_binary_datagram(datagram):
+                try:
+                    _, sequence, records = decode_datagram(datagram)
+                except ProtocolError:
+                    self.protocol_errors += 1
+                    continue
+                sequences.append(sequence)
+                chunks.append(records)
+            else:
+                text.append(datagram)
+        if text:
+            chunks.append(parse_text_payload(b'\n'.join(text)))
+        for sequence in sequences:
+            self.sequences.update(sensor_id, sequence)
+        if not chunks:
+            return np.empty(0, dtype=MEASUREMENT_DTYPE)
+        # Concatenate (or copy) so nothing keeps pointing into the reused receive buffer
+        return np.concatenate(chunks) if len(chunks) > 1 else chunks[0].copy()
+
+    def stats(self):
+        stats = self.sequences.stats()
+        stats['protocol_errors'] = self.protocol_errors
+        return stats
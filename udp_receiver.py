@@ -0,0 +1,183 @@
+import asyncio
+import queue
+import socket
+import threading
+import numpy as np
+
+from recording import MEASUREMENT_DTYPE
+from tracklog import get_logger
+from udp_protocol import DatagramDecoder
+
+log = get_logger('udp')
+
+MAX_DATAGRAM_SIZE = 65535
+BATCH_BUFFER_SIZE = 4 * 1024 * 1024  # Datagrams of one wakeup are received back to back into this
+SOCKET_RECEIVE_BUFFER = 8 * 1024 * 1024
+
+# What to do with a new batch when the queue to the tracker is full
+OVERFLOW_DROP_OLDEST = 'drop_oldest'  # Keep the freshest data
+OVERFLOW_DROP_NEWEST = 'drop_newest'  # Keep what is already queued
+OVERFLOW_BLOCK = 'block'  # Stop reading; the kernel socket buffer absorbs the burst
+
+
+class UdpReceiver:
+    """asyncio UDP receiver that hands measurement batches to a consumer thread.
+
+    The event loop runs in its own thread and can listen on several ports, one
+    per sensor: `sensors` maps port to sensor id (default {port: 0}) and every
+    batch is tagged with the id of the socket it came from. On each wakeup every
+    pending datagram is read with recv_into() back to back into one preallocated
+    buffer, then the whole wakeup is parsed in one go by
+    `parse(view, spans, sensor_id)`, by default a udp_protocol.DatagramDecoder
+    accepting binary and text datagrams.
+    The resulting batch of records is put on a bounded queue. `overflow` decides
+    what happens when the queue is full; the drop counters record any loss.
+    stop() can be called from any thread and always ends the receiver cleanly.
+    """
+
+    def __init__(self, host='0.0.0.0', port=5005, parse=None, queue_size=256,
+                 overflow=OVERFLOW_DROP_OLDEST, max_batch_datagrams=4096, sensors=None):
+        self.host = host
+        self.port = port
+        self.sensors = dict(sensors) if sensors else {port: 0}
+        self.parse = parse if parse is not None else DatagramDecoder()
+        self.overflow = overflow
+        self.max_batch_datagrams = max_batch_datagrams
+        self.batches = queue.Queue(maxsize=queue_size)
+
+        self.datagrams_received = 0
+        self.measurements_received = 0
+        self.parse_errors = 0
+        self.batches_dropped = 0
+        self.measurements_dropped = 0
+
+        self._buffer = bytearray(BATCH_BUFFER_SIZE)
+        self._view = memoryview(self._buffer)
+        self._socks = []
+        self._loop = None
+        self._thread = None
+        self._ready = threading.Event()
+        self._stopping = threading.Event()
+
+    def start(self):
+        self._stopping.clear()
+        self._ready.clear()
+        for port, sensor_id in self.sensors.items():
+            sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, SOCKET_RECEIVE_BUFFER)
+            sock.bind((self.host, port))
+            sock.setblocking(False)
+            self._socks.append((sock, sensor_id))
+        ports = ','.join(str(port) for port in self.sensors)
+        self._thread = threading.Thread(target=self._run, name=f'UdpReceiver:{ports}', daemon=True)
+        self._thread.start()
+        self._ready.wait()
+
+    def stop(self):
+        self._stopping.set()
+        if self._loop is not None and self._loop.is_running():
+            self._loop.call_soon_threadsafe(self._loop.stop)
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        for sock, _ in self._socks:
+            sock.close()
+        self._socks = []
+
+    def get_batch(self, timeout=None):
+        """Return the next batch of records, or None if nothing arrived within `timeout`."""
+        item = self.get_sensor_batch(timeout)
+        return item[1] if item is not None else None
+
+    def get_sensor_batch(self, timeout=None):
+        """Return the next (sensor_id, records) pair, or None if nothing arrived within `timeout`."""
+        try:
+            return self.batches.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def stats(self):
+        stats = {
+            'datagrams_received': self.datagrams_received,
+            'measurements_received': self.measurements_received,
+            'parse_errors': self.parse_errors,
+            'batches_dropped': self.batches_dropped,
+            'measurements_dropped': self.measurements_dropped,
+            'queued_batches': self.batches.qsize(),
+        }
+        if hasattr(self.parse, 'stats'):
+            stats.update(self.parse.stats())
+        return stats
+
+    def _run(self):
+        self._loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self._loop)
+        for sock, sensor_id in self._socks:
+            self._loop.add_reader(sock.fileno(), self._on_readable, sock, sensor_id)
+        self._loop.call_soon(self._ready.set)
+        try:
+            self._loop.run_forever()
+        finally:
+            for sock, _ in self._socks:
+                self._loop.remove_reader(sock.fileno())
+            self._loop.close()
+            self._loop = None
+
+    def _on_readable(self, sock, sensor_id):
+        spans = []
+        offset = 0
+        while len(spans) < self.max_batch_datagrams and offset + MAX_DATAGRAM_SIZE <= len(self._buffer):
+            try:
+                size = sock.recv_into(self._view[offset:offset + MAX_DATAGRAM_SIZE])
+            except (BlockingIOError, InterruptedError):
+                break
+            except OSError:
+                log.exception("UDP receive failed")
+                break
+            spans.append((offset, size))
+            offset += size
+        if not spans:
+            return
+
+        self.datagrams_received += len(spans)
+        try:
+            batch = self.parse(self._view, spans, sensor_id)
+        except (ValueError, IndexError):
+            # One bad datagram must not cost the whole wakeup, so fall back to one at a time
+            chunks = []
+            for span in spans:
+                try:
+                    chunks.append(self.parse(self._view, [span], sensor_id))
+                except (ValueError, IndexError):
+                    self.parse_errors += 1
+            batch = np.concatenate(chunks) if chunks else np.empty(0, dtype=MEASUREMENT_DTYPE)
+        if len(batch):
+            self.measurements_received += len(batch)
+            self._put((sensor_id, batch))
+
+    def _put(self, item):
+        if self.overflow == OVERFLOW_BLOCK:
+            while not self._stopping.is_set():
+                try:
+                    self.batches.put(item, timeout=0.1)
+                    return
+                except queue.Full:
+                    pass
+            return
+        try:
+            self.batches.put_nowait(item)
+            return
+        except queue.Full:
+            pass
+        if self.overflow == OVERFLOW_DROP_NEWEST:
+            dropped = item
+        else:
+            try:
+                dropped = self.batches.get_nowait()
+            except queue.Empty:
+                dropped = None
+            self.batches.put_nowait(item)
+        if dropped is not None:
+            self.batches_dropped += 1
+            self.measurements_dropped += len(dropped[1])
+            log.warning("Tracker queue full, dropped %d measurements from sensor %d", len(dropped[1]), dropped[0])
@@ -1,8 +1,12 @@
+import argparse
 import csv
 import socket
 import time
 import numpy as np 
 
+from recording import MEASUREMENT_DTYPE, read_measurement_records, scan_boundaries
+from udp_protocol import MAX_UDP_PAYLOAD, encode_datagrams
+
 def sph2cart(az, el, r):
     x = r * np.cos(el * np.pi / 180) * np.sin(az * np.pi / 180)
     y = r * np.cos(el * np.pi / 180) * np.cos(az * np.pi / 180)
@@ -33,10 +37,119 @@ def send_measurements_via_udp(measurements, udp_ip, udp_port):
         print(f"Sent: {message}")
         time.sleep(0.1)  # Sleep to simulate real-time sending
 
+def split_scans(records, max_time_diff=0.050):
+    # Same grouping as the tracker, so each scan goes out as one burst
+    bounds = scan_boundaries(records['mt'], max_time_diff) + [len(records)]
+    return list(zip(bounds[:-1], bounds[1:]))
+
+
+def encode_text_scan(records):
+    # One line per measurement, split over datagrams only if the scan is too big for one
+    lines = [','.join(map(str, row)) for row in records.tolist()]
+    datagrams, current, size = [], [], 0
+    for line in lines:
+        if current and size + len(line) + 1 > MAX_UDP_PAYLOAD:
+            datagrams.append('\n'.join(current).encode())
+            current, size = [], 0
+        current.append(line)
+        size += len(line) + 1
+    if current:
+        datagrams.append('\n'.join(current).encode())
+    return datagrams
+
+
+def replay_measurements(records, udp_ip, udp_port, speed=1.0, binary=True, loops=1, sensor_id=0,
+                        max_time_diff=0.050):
+    """Replay a recording with its own timing, one datagram (or a few) per scan.
+
+    speed: 1.0 for real time, 10.0 for ten times faster, 0 for as fast as possible.
+    loops: number of passes over the recording, 0 to loop until interrupted.
+    Returns the achieved rates and the send timing jitter (lateness against schedule).
+    """
+    records = np.asarray(records, dtype=MEASUREMENT_DTYPE)
+    scans = split_scans(records, max_time_diff)
+    if not scans:
+        return {}
+    scan_times = records['mt'][[start for start, _ in scans]]
+    scan_offsets = (scan_times - scan_times[0]).tolist()
+    # Each pass starts one mean scan interval after the previous one ended (a one-scan
+    # recording repeats as separate scans). Its timestamps are shifted by the same amount,
+    # so the replayed stream stays in time order and live ingest does not drop later passes as late
+    period = scan_offsets[-1] + (scan_offsets[-1] / (len(scans) - 1) if len(scans) > 1 else 0.0)
+    period = max(period, 2 * max_time_diff)
+    pass_records = records.copy()
+
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, 4 * 1024 * 1024)
+    address = (udp_ip, udp_port)
+    sequence = 0
+    datagrams_sent = 0
+    measurements_sent = 0
+    lateness = []
+    start = time.perf_counter()
+    loop = 0
+    try:
+        while loops == 0 or loop < loops:
+            pass_records['mt'] = records['mt'] + loop * period
+            for k, (first, last) in enumerate(scans):
+                if speed > 0:
+                    target = start + (loop * period + scan_offsets[k]) / speed
+                    delay = target - time.perf_counter()
+                    if delay > 0.002:
+                        time.sleep(delay - 0.001)
+                    while time.perf_counter() < target:
+                        pass  # Spin the last millisecond for accurate pacing
+                    lateness.append(time.perf_counter() - target)
+                if binary:
+                    datagrams, sequence = encode_datagrams(pass_records[first:last], sequence, sensor_id)
+                else:
+                    datagrams = encode_text_scan(pass_records[first:last])
+                for datagram in datagrams:
+                    sock.sendto(datagram, address)
+                datagrams_sent += len(datagrams)
+                measurements_sent += last - first
+            loop += 1
+    except KeyboardInterrupt:
+        pass
+    elapsed = time.perf_counter() - start
+
+    stats = {
+        'passes': loop,
+        'scans_sent': len(lateness) if speed > 0 else loop * len(scans),
+        'datagrams_sent': datagrams_sent,
+        'measurements_sent': measurements_sent,
+        'elapsed_s': elapsed,
+        'datagram_rate': datagrams_sent / elapsed if elapsed > 0 else 0.0,
+        'measurement_rate': measurements_sent / elapsed if elapsed > 0 else 0.0,
+    }
+    if lateness:
+        lateness_ms = np.array(lateness) * 1000.0
+        stats.update({
+            'jitter_mean_ms': float(lateness_ms.mean()),
+            'jitter_p99_ms': float(np.percentile(lateness_ms, 99)),
+            'jitter_max_ms': float(lateness_ms.max()),
+        })
+    return stats
+
+
 if __name__ == "__main__":
-    file_path = 'ttk.csv'
-    udp_ip = '127.0.0.1'  # IP address of the receiver
-    udp_port = 5005  # Port number of the receiver
+    parser = argparse.ArgumentParser(description="Replay a recording to the tracker over UDP.")
+    parser.add_argument('file_path', nargs='?', default='ttk.csv', help="CSV recording or .npy measurement store")
+    parser.add_argument('--ip', default='127.0.0.1', help="IP address of the receiver")
+    parser.add_argument('--port', type=int, default=5005, help="Port number of the receiver")
+    parser.add_argument('--speed', type=float, default=1.0, help="Time multiplier, 0 sends as fast as possible")
+    parser.add_argument('--loops', type=int, default=1, help="Passes over the recording, 0 loops forever")
+    parser.add_argument('--sensor-id', type=int, default=0)
+    parser.add_argument('--text', action='store_true', help="Send comma-separated text instead of the binary format")
+    parser.add_argument('--legacy', action='store_true', help="One text measurement every 0.1 s, as the original sender")
+    args = parser.parse_args()
 
-    measurements = read_measurements_from_csv(file_path)
-    send_measurements_via_udp(measurements, udp_ip, udp_port)
+    if args.legacy:
+        measurements = read_measurements_from_csv(args.file_path)
+        send_measurements_via_udp(measurements, args.ip, args.port)
+    else:
+        records = read_measurement_records(args.file_path)
+        stats = replay_measurements(records, args.ip, args.port, speed=args.speed, binary=not args.text,
+                                    loops=args.loops, sensor_id=args.sensor_id)
+        for key, value in stats.items():
+            print(f"{key}: {value:.3f}" if isinstance(value, float) else f"{key}: {value}")